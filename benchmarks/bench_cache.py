@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Cache backend benchmark'ı
+LocMemCache, Django'nun dosya tabanlı cache'i ve paylaşılan SQLiteCache
+için get/set/incr gecikmelerini (p50/p95/p99, mikrosaniye) ölçer.
+
+Kullanım: python benchmarks/bench_cache.py [--operations 5000]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+
+import django
+
+django.setup()
+
+from django.utils.module_loading import import_string
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'filebased': 'django.core.cache.backends.filebased.FileBasedCache',
+    'sqlite': 'school.cache_backends.SQLiteCache',
+}
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+
+    def pick(q):
+        return round(samples[min(len(samples) - 1, int(q * len(samples)))] * 1e6, 1)
+
+    return {
+        'p50_us': pick(0.50),
+        'p95_us': pick(0.95),
+        'p99_us': pick(0.99),
+        'mean_us': round(statistics.mean(samples) * 1e6, 1),
+    }
+
+
+def measure(func, operations):
+    samples = []
+    for index in range(operations):
+        start = time.perf_counter()
+        func(index)
+        samples.append(time.perf_counter() - start)
+    return percentiles(samples)
+
+
+def bench(name, operations, keys, tmp):
+    backend = import_string(BACKENDS[name])
+    location = os.path.join(tmp, name if name != 'sqlite' else 'cache.sqlite3')
+    cache = backend(location if name != 'locmem' else 'bench', {
+        'OPTIONS': {'MAX_ENTRIES': keys * 2},
+    })
+    payload = {'balance': 123.45, 'currency': 'TL', 'fetched_at': time.time()}
+
+    result = {'backend': name}
+    result['set'] = measure(lambda i: cache.set(f'key:{i % keys}', payload, 300), operations)
+    result['get_hit'] = measure(lambda i: cache.get(f'key:{i % keys}'), operations)
+    result['get_miss'] = measure(lambda i: cache.get(f'missing:{i}'), operations)
+    cache.set('counter', 0, 300)
+    result['incr'] = measure(lambda i: cache.incr('counter'), operations)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cache backend get/set gecikme benchmark')
+    parser.add_argument('--operations', type=int, default=5000)
+    parser.add_argument('--keys', type=int, default=500)
+    parser.add_argument('--backends', nargs='+', default=list(BACKENDS))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [bench(name, args.operations, args.keys, tmp) for name in args.backends]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Worker açılışı import süresi benchmark'ı
+Yeni bir Python sürecinde `python -X importtime` ile Django kurulumu ve URL
+yapılandırmasının (tüm view modülleri) import süresini ölçer; en yavaş
+modülleri listeler.
+
+Gerileme koruması: açılışta yüklenmemesi gereken ağır modüller (requests,
+Pillow) import edilirse ya da toplam süre --budget-ms değerini aşarsa
+çıkış kodu 1 olur; CI ya da deploy öncesi kontrol olarak çalıştırılabilir.
+
+Kullanım: python benchmarks/bench_importtime.py [--runs 5] [--budget-ms 400]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Worker açılışında değil ilk kullanımda yüklenmesi gereken modüller
+LAZY_MODULES = ('requests', 'PIL')
+
+STARTUP_CODE = 'import django; django.setup(); import core.urls'
+
+
+def profile_once():
+    """Tek açılışın import profili: {modül: (kendi süresi, toplam süre)} mikrosaniye"""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE='core.settings')
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', STARTUP_CODE],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True
+    )
+
+    modules = {}
+    total = 0
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or '|' not in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        if not self_us.strip().isdigit():
+            continue  # Başlık satırı
+        self_us, cumulative_us = int(self_us), int(cumulative_us)
+        modules[name.strip()] = (self_us, cumulative_us)
+        # En üst seviyedeki importların toplamı açılış süresidir
+        if not name.startswith('  '):
+            total += cumulative_us
+    return total, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Worker açılışı import süresi benchmark')
+    parser.add_argument('--runs', type=int, default=5, help='Medyanı alınacak ölçüm sayısı')
+    parser.add_argument('--top', type=int, default=15, help='Listelenecek en yavaş modül sayısı')
+    parser.add_argument('--budget-ms', type=float, default=400, help='Toplam import süresi üst sınırı')
+    args = parser.parse_args()
+
+    # İlk çalıştırma .pyc dosyalarını üretir; ölçüme katılmaz
+    profile_once()
+    runs = [profile_once() for _ in range(args.runs)]
+
+    total_ms = statistics.median(total for total, _ in runs) / 1000
+    _, modules = runs[-1]
+    slowest = sorted(
+        (name for name in modules if name.startswith(('school', 'core'))),
+        key=lambda name: modules[name][1], reverse=True
+    )[:args.top]
+    loaded_lazy = [name for name in LAZY_MODULES if name in modules]
+
+    result = {
+        'total_ms': round(total_ms, 1),
+        'budget_ms': args.budget_ms,
+        'module_count': len(modules),
+        'slowest_project_modules_ms': {
+            name: round(modules[name][1] / 1000, 2) for name in slowest
+        },
+        'lazy_modules_loaded': loaded_lazy,
+    }
+    print(json.dumps(result, indent=2))
+
+    errors = []
+    if loaded_lazy:
+        errors.append(f'Açılışta yüklenmemesi gereken modüller import edildi: {", ".join(loaded_lazy)}')
+    if total_ms > args.budget_ms:
+        errors.append(f'Import süresi {total_ms:.1f} ms, sınır {args.budget_ms:.0f} ms')
+    for error in errors:
+        print(f'HATA: {error}', file=sys.stderr)
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == '__main__':
+    main()
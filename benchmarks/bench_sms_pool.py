@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+"""
+SMS hesap havuzu benchmark'ı
+Yerel sahte (stub) NETGSM sunucularına karşı, hesap sayısı arttıkça
+gönderim hızının nasıl ölçeklendiğini ölçer. Her sahte hesap aynı anda
+sınırlı sayıda isteği kabul eder (hesap başına hız sınırı benzetimi).
+
+Kullanım: python benchmarks/bench_sms_pool.py [--messages 400] [--accounts 1 2 4]
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
+os.environ['METRICS_ENABLED'] = 'False'
+
+import django
+
+django.setup()
+
+from school.sms_service import SMSProviderPool
+
+logging.getLogger('school').setLevel(logging.ERROR)
+
+
+def start_stub(latency, concurrency, fail=False):
+    """Sahte NETGSM sunucusu başlat, (server, url) döndür"""
+    slots = threading.BoundedSemaphore(concurrency)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with slots:
+                time.sleep(latency)
+            body = b'80' if fail else b'1234567890'
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/sms/send/get'
+
+
+def run(accounts, messages, clients, latency, concurrency, failing=0):
+    servers = []
+    configs = []
+    for index in range(accounts):
+        server, url = start_stub(latency, concurrency, fail=index < failing)
+        servers.append(server)
+        configs.append({
+            'username': f'stub{index}',
+            'password': 'stub',
+            'header': 'STUB',
+            'api_url': url,
+        })
+
+    pool = SMSProviderPool(configs)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        results = list(executor.map(
+            lambda i: pool.send_sms('5551234567', f'Benchmark {i}'),
+            range(messages)
+        ))
+    elapsed = time.perf_counter() - start
+
+    for server in servers:
+        server.shutdown()
+
+    return {
+        'accounts': accounts,
+        'failing_accounts': failing,
+        'messages': messages,
+        'sent': sum(1 for result in results if result['success']),
+        'seconds': round(elapsed, 3),
+        'messages_per_second': round(messages / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--messages', type=int, default=400)
+    parser.add_argument('--accounts', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=32, help='Eşzamanlı gönderici thread sayısı')
+    parser.add_argument('--latency', type=float, default=0.02, help='Sahte sağlayıcı yanıt süresi (sn)')
+    parser.add_argument('--concurrency', type=int, default=2, help='Hesap başına eşzamanlı istek sınırı')
+    args = parser.parse_args()
+
+    results = [
+        run(count, args.messages, args.clients, args.latency, args.concurrency)
+        for count in args.accounts
+    ]
+    # Bir hesap sürekli hata verirken failover davranışı
+    largest = max(args.accounts)
+    if largest > 1:
+        results.append(run(largest, args.messages, args.clients, args.latency, args.concurrency, failing=1))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
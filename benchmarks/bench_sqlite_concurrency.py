@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+"""
+SQLite eşzamanlılık benchmark'ı
+Birden fazla süreç ve thread'den aynı anda attendance_toggle çağırır;
+'default' ve 'concurrent' SQLite modları için saniyedeki istek sayısını
+ve "database is locked" hatalarını raporlar. Geçici bir veritabanı
+dosyası kullanır, gerçek veritabanına dokunmaz.
+
+--schools ile istekler birden fazla okula dağıtılır; --sharded eklenirse
+her okul kendi veritabanındadır (SCHOOL_DATABASES, school/sharding.py) ve
+yazma kapasitesinin okul sayısıyla artışı ölçülür.
+
+Kullanım: python benchmarks/bench_sqlite_concurrency.py [--processes 4] [--threads 8] [--requests 50]
+          python benchmarks/bench_sqlite_concurrency.py --modes concurrent --schools 4 --sharded
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUDENT_COUNT = 200
+
+
+def setup_django(db_path, mode, schools=1, sharded=False):
+    """Alt süreçte Django'yu verilen SQLite moduyla başlat"""
+    sys.path.insert(0, PROJECT_DIR)
+    os.environ['DJANGO_SETTINGS_MODULE'] = 'core.settings'
+    os.environ['DATABASE_NAME'] = db_path
+    # Boş veritabanında okul id'leri 1..N; her biri kendi dosyasında
+    os.environ['SCHOOL_DATABASES'] = ','.join(str(pk) for pk in range(1, schools + 1)) if sharded else ''
+    os.environ['SHARD_DIR'] = os.path.dirname(db_path)
+    os.environ['SQLITE_MODE'] = mode
+    os.environ['SQLITE_SERIALIZE_WRITES'] = str(mode == 'concurrent')
+    os.environ['SMS_ENABLED'] = 'False'
+    os.environ['METRICS_ENABLED'] = 'False'
+    os.environ['RATELIMIT_ENABLED'] = 'False'  # Tek IP'den yük üretilir
+    os.environ['DEBUG'] = 'False'
+
+    import django
+    django.setup()
+
+    import logging
+    logging.disable(logging.CRITICAL)
+
+
+def prepare_database(db_path, mode, schools, sharded):
+    """Şemayı oluştur ve test öğrencilerini ekle"""
+    # WAL modu dosyada kalıcıdır; üretimdeki gibi ilk bağlantıda açılmış olsun
+    setup_django(db_path, mode, schools, sharded)
+
+    from django.core.management import call_command
+    from school import sharding
+    from school.models import School, Classroom, Student
+
+    for alias in sharding.databases():
+        call_command('migrate', database=alias, verbosity=0)
+    for school_index in range(schools):
+        school = School.objects.create(name=f'Benchmark Okulu {school_index + 1}', address='-')
+        classroom = Classroom.objects.create(name='A', school=school)
+        students = Student.objects.using(sharding.db_for_school(school.pk)).bulk_create([
+            Student(
+                first_name='Öğrenci', last_name=str(index),
+                id_number=f'{10000000000 + school_index * STUDENT_COUNT + index}',
+                school=school, classroom=classroom,
+                parent_first_name='Veli', parent_last_name=str(index),
+                parent_phone_number='+905551234567',
+            )
+            for index in range(STUDENT_COUNT)
+        ])
+        sharding.record_directory(students)
+
+
+def worker(db_path, mode, schools, sharded, threads, requests_per_thread, queue):
+    """Bir süreçte birden fazla thread ile toggle isteği gönder"""
+    setup_django(db_path, mode, schools, sharded)
+
+    from django.db import connection
+    from django.test import Client
+    from school import checkin_tokens
+
+    counts = {'ok': 0, 'locked': 0, 'other_errors': 0}
+    lock = threading.Lock()
+
+    def run():
+        client = Client(HTTP_HOST='localhost')
+        for _ in range(requests_per_thread):
+            id_number = f'{10000000000 + random.randrange(schools * STUDENT_COUNT)}'
+            response = client.post(
+                '/attendance-toggle/',
+                data=json.dumps({'id_number': id_number, 'token': checkin_tokens.make_token('g')}),
+                content_type='application/json',
+            )
+            if response.status_code == 200:
+                key = 'ok'
+            elif b'locked' in response.content:
+                key = 'locked'
+            else:
+                key = 'other_errors'
+            with lock:
+                counts[key] += 1
+        connection.close()
+
+    pool = [threading.Thread(target=run) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+
+    queue.put(counts)
+
+
+def bench(mode, processes, threads, requests_per_thread, schools=1, sharded=False):
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.sqlite3')
+
+        setup = context.Process(target=prepare_database, args=(db_path, mode, schools, sharded))
+        setup.start()
+        setup.join()
+
+        queue = context.Queue()
+        procs = [
+            context.Process(target=worker, args=(db_path, mode, schools, sharded, threads, requests_per_thread, queue))
+            for _ in range(processes)
+        ]
+        start = time.perf_counter()
+        for proc in procs:
+            proc.start()
+        totals = {'ok': 0, 'locked': 0, 'other_errors': 0}
+        for _ in procs:
+            for key, value in queue.get().items():
+                totals[key] += value
+        for proc in procs:
+            proc.join()
+        elapsed = time.perf_counter() - start
+
+    total = sum(totals.values())
+    return {
+        'mode': mode,
+        'schools': schools,
+        'sharded': sharded,
+        'processes': processes,
+        'threads_per_process': threads,
+        'requests': total,
+        **totals,
+        'seconds': round(elapsed, 2),
+        'requests_per_second': round(total / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite eşzamanlı attendance_toggle benchmark')
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=50, help='Thread başına istek sayısı')
+    parser.add_argument('--modes', nargs='+', default=['default', 'concurrent'])
+    parser.add_argument('--schools', type=int, default=1, help='İsteklerin dağıtılacağı okul sayısı')
+    parser.add_argument('--sharded', action='store_true', help='Her okul kendi veritabanında')
+    args = parser.parse_args()
+
+    results = [
+        bench(mode, args.processes, args.threads, args.requests, args.schools, args.sharded)
+        for mode in args.modes
+    ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -10,8 +10,10 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import json
 import os
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -52,7 +54,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'school.profiling.ProfilingMiddleware',  # PROFILING_ENABLED kapalıyken yüklenmez
     'django.middleware.security.SecurityMiddleware',
+    'school.page_cache.PageCacheMiddleware',  # Önbellekteki sayfalar session/CSRF/auth'a girmeden döner
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -84,24 +88,90 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / os.getenv('DATABASE_NAME', 'db.sqlite3'),
+# Veritabanı motoru: 'sqlite' (varsayılan) veya 'postgresql'
+DATABASE_ENGINE = os.getenv('DATABASE_ENGINE', 'sqlite').lower()
+
+if DATABASE_ENGINE == 'postgresql':
+    # pip install "psycopg[binary,pool]" gerektirir
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv('DATABASE_NAME', 'baskenpsikoloji'),
+            'USER': os.getenv('DATABASE_USER', ''),
+            'PASSWORD': os.getenv('DATABASE_PASSWORD', ''),
+            'HOST': os.getenv('DATABASE_HOST', 'localhost'),
+            'PORT': os.getenv('DATABASE_PORT', '5432'),
+            'CONN_HEALTH_CHECKS': True,
+        }
     }
-}
 
-# For PostgreSQL (uncomment when needed):
-# DATABASES = {
-#     'default': {
-#         'ENGINE': 'django.db.backends.postgresql',
-#         'NAME': os.getenv('DATABASE_NAME', 'baskenpsikoloji'),
-#         'USER': os.getenv('DATABASE_USER', ''),
-#         'PASSWORD': os.getenv('DATABASE_PASSWORD', ''),
-#         'HOST': os.getenv('DATABASE_HOST', 'localhost'),
-#         'PORT': os.getenv('DATABASE_PORT', '5432'),
-#     }
-# }
+    if os.getenv('DATABASE_POOL', 'True').lower() == 'true':
+        # psycopg connection pool: worker başına hazır bağlantılar
+        # (Django, havuz kullanılırken CONN_MAX_AGE=0 olmasını ister)
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.getenv('DATABASE_POOL_MIN_SIZE', '2')),
+                'max_size': int(os.getenv('DATABASE_POOL_MAX_SIZE', '10')),
+                'timeout': int(os.getenv('DATABASE_POOL_TIMEOUT', '10')),
+            },
+        }
+    else:
+        # Havuz yoksa kalıcı bağlantılar
+        DATABASES['default']['CONN_MAX_AGE'] = int(os.getenv('CONN_MAX_AGE', '60'))
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / os.getenv('DATABASE_NAME', 'db.sqlite3'),
+        }
+    }
+
+# SQLite eşzamanlılık modu: 'concurrent' (WAL + busy_timeout + IMMEDIATE transaction) veya 'default'
+SQLITE_MODE = os.getenv('SQLITE_MODE', 'default' if DEBUG else 'concurrent')
+SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', '20000'))  # milisaniye
+
+if DATABASE_ENGINE == 'sqlite' and SQLITE_MODE == 'concurrent':
+    DATABASES['default']['OPTIONS'] = {
+        # Okuyucular yazıcıyı beklemez, yazıcılar kilit için bekler
+        'init_command': (
+            'PRAGMA journal_mode=WAL;'
+            'PRAGMA synchronous=NORMAL;'
+            f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT};'
+        ),
+        'timeout': SQLITE_BUSY_TIMEOUT / 1000,
+        # Yazma kilidi transaction başında alınır (okuma->yazma yükseltmesinde kilitlenme olmaz)
+        'transaction_mode': 'IMMEDIATE',
+    }
+
+# Okul başına veritabanı (school/sharding.py)
+# Biçim: "<okul id>[:<alias>],..." ör. "3,7:kampus" -> 3. okul "school_3", 7. okul "kampus"
+# veritabanında. Sınıf, öğrenci ve yoklama kayıtları okulun veritabanında; okullar,
+# kullanıcılar ve TC -> okul dizini ana veritabanında tutulur. Okul taşımak için:
+# python manage.py move_school <okul id>
+# Sadece SQLite: okul veritabanında kullanıcı tablosu yoktur; PostgreSQL ilk
+# migration'daki created_by -> auth_user kısıtını oluşturamaz (tek yazma kilidi
+# olmadığı için PostgreSQL'de ayırmaya gerek de yoktur).
+SCHOOL_DATABASES = {}
+for _entry in filter(None, (item.strip() for item in os.getenv('SCHOOL_DATABASES', '').split(','))):
+    _school_id, _, _alias = _entry.partition(':')
+    SCHOOL_DATABASES[int(_school_id)] = _alias.strip() or f'school_{int(_school_id)}'
+SHARD_DIR = Path(os.getenv('SHARD_DIR', str(BASE_DIR / 'shards')))  # SQLite okul veritabanı dosyaları
+
+if SCHOOL_DATABASES and DATABASE_ENGINE != 'sqlite':
+    raise ImproperlyConfigured('SCHOOL_DATABASES yalnızca DATABASE_ENGINE=sqlite ile kullanılabilir')
+
+for _alias in sorted(set(SCHOOL_DATABASES.values())):
+    # Ana veritabanıyla aynı ayarlar, ayrı dosya
+    DATABASES[_alias] = {**DATABASES['default'], 'NAME': SHARD_DIR / f'{_alias}.sqlite3'}
+
+DATABASE_ROUTERS = ['school.sharding.SchoolRouter']
+
+# Yoklama yazımlarını worker içinde tek sıraya al (yalnızca SQLite'ta gerekli)
+SQLITE_SERIALIZE_WRITES = os.getenv(
+    'SQLITE_SERIALIZE_WRITES',
+    str(DATABASE_ENGINE == 'sqlite' and SQLITE_MODE == 'concurrent')
+).lower() == 'true'
 
 
 # Password validation
@@ -140,6 +210,19 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic dosya adlarına içerik hash'i ekler ve .gz/.br kopyalarını üretir
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'school.storage.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Önde statik dosya sunucusu yoksa Django uzun süreli önbellek başlıklarıyla sunar
+STATIC_SERVE = os.getenv('STATIC_SERVE', 'False').lower() == 'true'
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
@@ -166,32 +249,54 @@ if not DEBUG:
 SESSION_COOKIE_AGE = int(os.getenv('SESSION_COOKIE_AGE', '86400'))  # 24 hours
 
 # Cache Configuration
+# Üretimde tüm worker'lar aynı SQLite cache dosyasını paylaşır (harici servis gerekmez)
+CACHE_BACKEND = os.getenv(
+    'CACHE_BACKEND',
+    'django.core.cache.backends.locmem.LocMemCache' if DEBUG else 'school.cache_backends.SQLiteCache'
+)
 CACHES = {
     'default': {
-        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
-        'LOCATION': 'unique-snowflake',
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': (
+            os.getenv('CACHE_LOCATION', str(BASE_DIR / 'cache.sqlite3'))
+            if CACHE_BACKEND == 'school.cache_backends.SQLiteCache'
+            else os.getenv('CACHE_LOCATION', 'unique-snowflake')
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('CACHE_MAX_ENTRIES', '10000')),
+        },
     }
 }
 
-# Logging Configuration
+# Logging
+# Kayıtlar kuyruk üzerinden arka plan thread'inde yazılır; telefon ve TC
+# kimlik numaraları çıktıda maskelenir.
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'simple' if DEBUG else 'json')  # 'json' | 'simple' | 'verbose'
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG' if DEBUG else 'INFO')
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
     'formatters': {
         'verbose': {
+            '()': 'school.log_handlers.RedactingFormatter',
             'format': '{levelname} {asctime} {module} {process:d} {thread:d} {message}',
             'style': '{',
         },
         'simple': {
+            '()': 'school.log_handlers.RedactingFormatter',
             'format': '{levelname} {message}',
             'style': '{',
         },
+        'json': {
+            '()': 'school.log_handlers.JSONFormatter',
+        },
     },
     'handlers': {
         'console': {
-            'level': 'INFO',
-            'class': 'logging.StreamHandler',
-            'formatter': 'simple',
+            'level': LOG_LEVEL,
+            'class': 'school.log_handlers.NonBlockingHandler',
+            'formatter': LOG_FORMAT,
         },
     },
     'root': {
@@ -206,7 +311,7 @@ LOGGING = {
         },
         'school': {
             'handlers': ['console'],
-            'level': 'DEBUG',
+            'level': LOG_LEVEL,
             'propagate': False,
         },
     },
@@ -218,16 +323,118 @@ QR_CODE_SIZE = int(os.getenv('QR_CODE_SIZE', '180'))
 QR_CODE_MARGIN = int(os.getenv('QR_CODE_MARGIN', '1'))
 QR_CODE_CACHE_TIMEOUT = int(os.getenv('QR_CODE_CACHE_TIMEOUT', '3600'))
 
+# Giriş-çıkış QR token'ları (school/checkin_tokens.py)
+CHECKIN_TOKEN_REQUIRED = os.getenv('CHECKIN_TOKEN_REQUIRED', 'True').lower() == 'true'  # Token'sız yoklama reddedilsin mi
+CHECKIN_TOKEN_SECRET = os.getenv('CHECKIN_TOKEN_SECRET', '')  # Boşsa SECRET_KEY'den türetilir
+CHECKIN_TOKEN_PERIOD = int(os.getenv('CHECKIN_TOKEN_PERIOD', '60'))  # QR kodu kaç saniyede bir değişir
+CHECKIN_TOKEN_MAX_AGE = int(os.getenv('CHECKIN_TOKEN_MAX_AGE', '300'))  # Okutulan kod kaç saniye geçerli
+CHECKIN_TOKEN_SCHEDULE = int(os.getenv('CHECKIN_TOKEN_SCHEDULE', '3'))  # Panele önceden verilen token sayısı
+
+# Çevrimdışı okutmaların toplu gönderimi (attendance-sync/)
+ATTENDANCE_SYNC_MAX_BATCH = int(os.getenv('ATTENDANCE_SYNC_MAX_BATCH', '200'))  # İstek başına en fazla okutma
+ATTENDANCE_SYNC_MAX_AGE = int(os.getenv('ATTENDANCE_SYNC_MAX_AGE', '86400'))  # Bundan eski okutmalar reddedilir (sn)
+ATTENDANCE_SYNC_TOKEN_GRACE = int(os.getenv('ATTENDANCE_SYNC_TOKEN_GRACE', '900'))  # Token'lı okutma CHECKIN_TOKEN_MAX_AGE'den sonra en fazla bu kadar geç gönderilebilir (sn); personel oturumlu kiosk için ATTENDANCE_SYNC_MAX_AGE geçerli
+
+# Giriş kapısı kiosk modu (kiosk/)
+KIOSK_REPEAT_SECONDS = int(os.getenv('KIOSK_REPEAT_SECONDS', '30'))  # Aynı öğrencinin tekrar okutması bu süre yok sayılır
+KIOSK_MAX_IN_FLIGHT = int(os.getenv('KIOSK_MAX_IN_FLIGHT', '3'))  # Aynı anda bekleyen en fazla gönderim isteği
+
+# Sürümlü öğrenci listesi (roster/)
+ROSTER_CACHE_TIMEOUT = int(os.getenv('ROSTER_CACHE_TIMEOUT', '86400'))  # Tam liste sürüm başına cache süresi (sn)
+ROSTER_CHANGE_RETENTION_DAYS = int(os.getenv('ROSTER_CHANGE_RETENTION_DAYS', '30'))  # Değişiklik kayıtları kaç gün tutulur
+
+# JSON API yanıtları (school/api.py)
+API_COMPRESS_MIN_SIZE = int(os.getenv('API_COMPRESS_MIN_SIZE', '1024'))  # Bu boyutu (bayt) aşan yanıtlar gzip'lenir
+
+# Kimlik doğrulamasız API'lerde istek sınırı (school/ratelimit.py)
+# Değerler '<istek>/<saniye>' biçimindedir; boş bırakılan sınır uygulanmaz.
+# Okuldaki cihazlar aynı IP'yi paylaşabildiği için IP sınırı geniş tutulur.
+RATELIMIT_ENABLED = os.getenv('RATELIMIT_ENABLED', 'True').lower() == 'true'
+RATELIMIT_IP_HEADER = os.getenv('RATELIMIT_IP_HEADER', '')  # Proxy arkasında istemci IP'sinin başlığı (ör. X-Real-IP)
+RATELIMITS = {
+    'attendance_toggle': {
+        'ip': os.getenv('RATELIMIT_TOGGLE_IP', '300/60'),
+        'device': os.getenv('RATELIMIT_TOGGLE_DEVICE', '12/60'),
+    },
+    'attendance_sync': {
+        'ip': os.getenv('RATELIMIT_SYNC_IP', '120/60'),
+        'device': os.getenv('RATELIMIT_SYNC_DEVICE', '120/60'),  # Kapıda saniyede ~1 öğrenci + tekrar denemeler
+    },
+    'student_status': {
+        'ip': os.getenv('RATELIMIT_STATUS_IP', '600/60'),
+        'device': os.getenv('RATELIMIT_STATUS_DEVICE', '30/60'),
+    },
+    'qr_code': {
+        # Her panel dakikada ~2 görüntü ister (şimdiki + sıradaki kod)
+        'ip': os.getenv('RATELIMIT_QR_IP', '120/60'),
+    },
+}
+
 # NETGSM SMS Settings
 NETGSM_USERNAME = "2526060717"
 NETGSM_PASSWORD = "5,781D8"
 NETGSM_HEADER = "2526060717"
 
+# Birden fazla SMS hesabı (JSON liste). Boşsa yukarıdaki tek NETGSM hesabı kullanılır.
+# Örnek: [{"name": "ana", "username": "...", "password": "...", "header": "...", "weight": 2},
+#         {"backend": "school.sms_service.NetGSMService", "username": "...", ...}]
+# "name" metrik etiketinde kullanılır (yoksa listedeki sırası); kullanıcı adı metriklere yazılmaz.
+SMS_PROVIDERS = json.loads(os.getenv('SMS_PROVIDERS', '[]')) or [
+    {'username': NETGSM_USERNAME, 'password': NETGSM_PASSWORD, 'header': NETGSM_HEADER, 'weight': 1},
+]
+SMS_PROVIDER_COOLDOWN = int(os.getenv('SMS_PROVIDER_COOLDOWN', '30'))  # saniye
+SMS_PROVIDER_MAX_COOLDOWN = int(os.getenv('SMS_PROVIDER_MAX_COOLDOWN', '600'))  # saniye
+
 # SMS Notification Settings
 SMS_ENABLED = os.getenv('SMS_ENABLED', 'True').lower() == 'true'
 SMS_TEST_MODE = os.getenv('SMS_TEST_MODE', 'False').lower() == 'true'
 PAGINATION_COUNT = int(os.getenv('PAGINATION_COUNT', '25'))
 
+# SMS Balance Settings
+SMS_BALANCE_CACHE_TTL = int(os.getenv('SMS_BALANCE_CACHE_TTL', '300'))  # saniye
+SMS_BALANCE_LOW_THRESHOLD = float(os.getenv('SMS_BALANCE_LOW_THRESHOLD', '50'))  # TL
+SMS_BALANCE_ALERT_INTERVAL = int(os.getenv('SMS_BALANCE_ALERT_INTERVAL', '3600'))  # saniye
+SMS_SEGMENT_COST = float(os.getenv('SMS_SEGMENT_COST', '0.10'))  # segment başına TL
+
+# SMS Retry Settings
+SMS_RETRY_MAX_ATTEMPTS = int(os.getenv('SMS_RETRY_MAX_ATTEMPTS', '6'))
+SMS_RETRY_BASE_DELAY = int(os.getenv('SMS_RETRY_BASE_DELAY', '30'))  # saniye
+SMS_RETRY_MAX_DELAY = int(os.getenv('SMS_RETRY_MAX_DELAY', '3600'))  # saniye
+SMS_RETRY_BATCH_SIZE = int(os.getenv('SMS_RETRY_BATCH_SIZE', '50'))
+SMS_RETRY_LEASE_SECONDS = int(os.getenv('SMS_RETRY_LEASE_SECONDS', '300'))
+SMS_RETRY_FAILURE_BREAKER = int(os.getenv('SMS_RETRY_FAILURE_BREAKER', '3'))  # art arda bağlantı hatası
+
+# Metrics Settings (worker'lar arası paylaşılan SQLite dosyası)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() == 'true'
+METRICS_DB_PATH = os.getenv('METRICS_DB_PATH', str(BASE_DIR / 'metrics.sqlite3'))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')  # Boşsa /metrics sadece personel girişiyle açılır
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))  # Süreç içi tampon bu aralıkla dosyaya yazılır (sn)
+METRICS_QUANTILE_WINDOW = int(os.getenv('METRICS_QUANTILE_WINDOW', '300'))  # p50/p95/p99 son 1-2 aralıktan hesaplanır (sn)
+
+# Health Check Settings (/healthz, /readyz)
+HEALTH_CACHE_TTL = float(os.getenv('HEALTH_CACHE_TTL', '5'))  # Sonuç süreç içinde bu kadar saklanır (sn)
+HEALTH_DB_THRESHOLD_MS = float(os.getenv('HEALTH_DB_THRESHOLD_MS', '100'))  # Aşılırsa "degraded"
+HEALTH_CACHE_THRESHOLD_MS = float(os.getenv('HEALTH_CACHE_THRESHOLD_MS', '50'))
+HEALTH_NETGSM_THRESHOLD_MS = float(os.getenv('HEALTH_NETGSM_THRESHOLD_MS', '3000'))
+HEALTH_NETGSM_MAX_AGE = int(os.getenv('HEALTH_NETGSM_MAX_AGE', '900'))  # Son NETGSM isteği bundan eskiyse bakiye yenilenir (sn)
+
+# Worker açılışında ısınma (school/warmup.py, WSGI dosyalarından çağrılır)
+WARMUP_ENABLED = os.getenv('WARMUP_ENABLED', 'True').lower() == 'true'
+
+# Page Cache Settings (QR paneli ve öğrenci giriş sayfası)
+PAGE_CACHE_ENABLED = os.getenv('PAGE_CACHE_ENABLED', str(not DEBUG)).lower() == 'true'
+PAGE_CACHE_TIMEOUT = int(os.getenv('PAGE_CACHE_TIMEOUT', '3600'))  # Paylaşılan cache'te (sn)
+PAGE_CACHE_MEMORY_TIMEOUT = int(os.getenv('PAGE_CACHE_MEMORY_TIMEOUT', '60'))  # Süreç belleğinde (sn)
+PAGE_CACHE_MAX_AGE = int(os.getenv('PAGE_CACHE_MAX_AGE', '60'))  # Tarayıcı Cache-Control max-age (sn)
+PAGE_CACHE_VERSION = os.getenv('PAGE_CACHE_VERSION', '')  # Boşsa şablon/manifest değişiklik zamanlarından
+
+# Request Profiling Settings (varsayılan kapalı)
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False').lower() == 'true'
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0.1'))  # Örneklenecek istek oranı
+PROFILING_SLOW_MS = float(os.getenv('PROFILING_SLOW_MS', '1000'))  # Bu süreyi aşan istekler detaylı kaydedilir
+PROFILING_STACK_INTERVAL = float(os.getenv('PROFILING_STACK_INTERVAL', '0.005'))  # Yığın örnekleme aralığı (sn)
+PROFILING_DB_PATH = os.getenv('PROFILING_DB_PATH', str(BASE_DIR / 'profiling.sqlite3'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
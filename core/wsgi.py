@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 application = get_wsgi_application()
+
+# URL'ler, şablonlar ve veritabanı ilk istekten önce hazırlanır
+from school.warmup import warmup
+
+warmup()
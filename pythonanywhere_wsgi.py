@@ -22,6 +22,10 @@ from django.core.wsgi import get_wsgi_application
 # Initialize Django
 application = get_wsgi_application()
 
+# Warm up: URL'ler, şablonlar ve veritabanı ilk istekten önce hazırlanır
+from school.warmup import warmup
+warmup()
+
 # Debug information (remove in production)
 import logging
 logging.basicConfig(level=logging.INFO)
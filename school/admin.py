@@ -1,5 +1,21 @@
-from django.contrib import admin
-from .models import School, Classroom, Student, Attendance
+import io
+
+from django import forms
+from django.contrib import admin, messages
+from django.http import HttpResponse
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+from .models import School, Classroom, Student, Attendance, SMSRetry, SMSDeadLetter
+from .importers import ImportFileError, StudentImporter, read_rows
+from . import sms_retry
+
+
+class StudentImportForm(forms.Form):
+    file = forms.FileField(label='CSV / XLSX dosyası')
+    dry_run = forms.BooleanField(label='Sadece doğrula (kaydetme)', required=False, initial=True)
+    create_classrooms = forms.BooleanField(label='Olmayan sınıfları oluştur', required=False)
 
 
 @admin.register(School)
@@ -59,9 +75,9 @@ class StudentAdmin(admin.ModelAdmin):
     list_filter = ('school', 'classroom', 'is_active', 'created_at', 'updated_at')
     search_fields = (
         'first_name', 'last_name', 'id_number', 
-        'parent_first_name', 'parent_last_name', 'parent_phone_number'
+        'parent_first_name', 'parent_last_name', 'parent_phone_number', 'parent_phone_e164'
     )
-    readonly_fields = ('created_at', 'updated_at')
+    readonly_fields = ('parent_phone_e164', 'created_at', 'updated_at')
     list_per_page = 20
     
     fieldsets = (
@@ -72,7 +88,7 @@ class StudentAdmin(admin.ModelAdmin):
             'fields': ('school', 'classroom', 'is_active')
         }),
         ('Veli Bilgileri', {
-            'fields': ('parent_first_name', 'parent_last_name', 'parent_phone_number')
+            'fields': ('parent_first_name', 'parent_last_name', 'parent_phone_number', 'parent_phone_e164')
         }),
         ('Sistem Bilgileri', {
             'fields': ('created_by', 'created_at', 'updated_at'),
@@ -92,6 +108,56 @@ class StudentAdmin(admin.ModelAdmin):
     def parent_full_name(self, obj):
         return obj.parent_full_name
     parent_full_name.short_description = 'Veli Ad Soyad'
+    
+    def get_urls(self):
+        urls = [
+            path('import/', self.admin_site.admin_view(self.import_view), name='school_student_import'),
+        ]
+        return urls + super().get_urls()
+    
+    def import_view(self, request):
+        """CSV/XLSX ile toplu öğrenci içe aktarma"""
+        if not self.has_add_permission(request):
+            return redirect('admin:school_student_changelist')
+        
+        result = None
+        form = StudentImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            upload = form.cleaned_data['file']
+            importer = StudentImporter(
+                dry_run=form.cleaned_data['dry_run'],
+                create_classrooms=form.cleaned_data['create_classrooms'],
+                user=request.user,
+            )
+            try:
+                result = importer.run(read_rows(upload.file, upload.name))
+            except ImportFileError as e:
+                form.add_error('file', str(e))
+            else:
+                if request.POST.get('report') and result.errors:
+                    stream = io.StringIO()
+                    result.write_report(stream)
+                    response = HttpResponse('\ufeff' + stream.getvalue(), content_type='text/csv; charset=utf-8')
+                    response['Content-Disposition'] = 'attachment; filename="ogrenci_import_hatalari.csv"'
+                    return response
+                level = messages.WARNING if result.errors else messages.SUCCESS
+                prefix = 'Deneme: ' if importer.dry_run else ''
+                self.message_user(
+                    request,
+                    f'{prefix}{result.total} satır işlendi; {result.created} yeni, '
+                    f'{result.updated} güncellenen, {result.failed} hatalı satır.',
+                    level
+                )
+        
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Öğrenci İçe Aktar',
+            'form': form,
+            'result': result,
+            'errors': result.errors[:200] if result else [],
+        }
+        return TemplateResponse(request, 'admin/school/student/import.html', context)
 
 
 @admin.register(Attendance)
@@ -137,3 +203,49 @@ class AttendanceAdmin(admin.ModelAdmin):
         return str(obj.student.classroom)
     student_classroom.short_description = 'Sınıf'
     student_classroom.admin_order_field = 'student__classroom__name'
+
+
+
+@admin.register(SMSRetry)
+class SMSRetryAdmin(admin.ModelAdmin):
+    list_display = (
+        'phone_number', 'student', 'attempts', 'last_error_code',
+        'next_attempt_at', 'locked_until', 'created_at'
+    )
+    list_filter = ('last_error_code', 'created_at')
+    search_fields = ('phone_number', 'student__first_name', 'student__last_name', 'student__id_number')
+    readonly_fields = ('claim_token', 'locked_until', 'created_at', 'updated_at')
+    raw_id_fields = ('student',)
+    list_select_related = ('student',)
+    list_per_page = 25
+    actions = ['retry_now']
+    
+    @admin.action(description='Seçilenleri hemen yeniden dene')
+    def retry_now(self, request, queryset):
+        count = queryset.update(next_attempt_at=timezone.now(), claim_token='', locked_until=None)
+        self.message_user(request, f'{count} SMS bir sonraki worker turunda gönderilecek.', messages.SUCCESS)
+
+
+@admin.register(SMSDeadLetter)
+class SMSDeadLetterAdmin(admin.ModelAdmin):
+    list_display = (
+        'phone_number', 'student', 'attempts', 'last_error_code',
+        'first_failed_at', 'created_at', 'replayed_at'
+    )
+    list_filter = ('last_error_code', 'created_at', 'replayed_at')
+    search_fields = ('phone_number', 'student__first_name', 'student__last_name', 'student__id_number')
+    readonly_fields = (
+        'phone_number', 'message', 'student', 'attempts', 'last_error_code',
+        'last_error', 'first_failed_at', 'created_at', 'replayed_at'
+    )
+    list_select_related = ('student',)
+    list_per_page = 25
+    actions = ['replay']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    @admin.action(description='Seçilenleri yeniden gönder')
+    def replay(self, request, queryset):
+        count = sms_retry.replay_dead_letters(queryset)
+        self.message_user(request, f'{count} SMS yeniden deneme kuyruğuna alındı.', messages.SUCCESS)
@@ -0,0 +1,101 @@
+"""
+JSON API yanıt katmanı
+attendance_toggle, student_status gibi sık çağrılan uç noktalar yanıtlarını
+buradan üretir:
+
+- orjson kuruluysa onunla, değilse boşluksuz ve UTF-8 (\\u kaçışsız) json ile
+  serileştirir
+- ?fields=current_status,student.full_name ile sadece istenen alanlar döner
+  (status, message ve hata kodu (code) her zaman korunur)
+- API_COMPRESS_MIN_SIZE baytı aşan yanıtlar, istemci destekliyorsa gzip'lenir
+
+Kullanım:
+    if api.wants(request, 'entries_today'):
+        data['entries_today'] = ...
+    return api.response(request, data)
+"""
+
+import gzip
+import json
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+try:
+    import orjson
+except ImportError:  # orjson opsiyonel; yoksa standart json kullanılır
+    orjson = None
+
+# İstemciler sonucu bu alanlardan okur; alan seçiminde atılmaz
+ALWAYS_FIELDS = ('status', 'message', 'code')
+
+_encoder = DjangoJSONEncoder()
+
+
+def dumps(data):
+    """Veriyi JSON baytlarına çevir"""
+    if orjson is not None:
+        return orjson.dumps(data, default=_encoder.default)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), cls=DjangoJSONEncoder).encode('utf-8')
+
+
+def requested_fields(request):
+    """?fields= parametresindeki alan yolları (boşsa tüm alanlar)"""
+    return [name.strip() for name in request.GET.get('fields', '').split(',') if name.strip()]
+
+
+def wants(request, name):
+    """
+    Alan (veya alt alanlarından biri) istenmiş mi
+
+    Pahalı alanlar (ör. günün kayıtları) istenmediğinde hiç hesaplanmaz.
+    """
+    fields = requested_fields(request)
+    return not fields or any(field == name or field.startswith(f'{name}.') for field in fields)
+
+
+def select_fields(data, fields):
+    """Noktalı alan yollarına göre veriyi süz (listelerde her elemana uygulanır)"""
+    # None: alanın tamamı; sözlük: sadece alt alanları
+    tree = {}
+    for path in fields:
+        *parents, last = path.split('.')
+        node = tree
+        for part in parents:
+            if part in node and node[part] is None:
+                # Üst alan tamamen istendiyse alt alan seçimi daraltmaz
+                break
+            node = node.setdefault(part, {})
+        else:
+            node[last] = None
+    return _pick(data, tree)
+
+
+def _pick(value, tree):
+    if tree is None:
+        return value
+    if isinstance(value, dict):
+        return {key: _pick(value[key], subtree) for key, subtree in tree.items() if key in value}
+    if isinstance(value, list):
+        return [_pick(item, tree) for item in value]
+    return value
+
+
+def response(request, data, status=200):
+    """JsonResponse yerine: hızlı serileştirme, alan seçimi ve sıkıştırma"""
+    fields = requested_fields(request)
+    if fields and isinstance(data, dict):
+        data = select_fields(data, [*fields, *ALWAYS_FIELDS])
+
+    content = dumps(data)
+    result = HttpResponse(content_type='application/json', status=status)
+
+    if len(content) >= settings.API_COMPRESS_MIN_SIZE and 'gzip' in request.headers.get('Accept-Encoding', ''):
+        content = gzip.compress(content, compresslevel=6, mtime=0)
+        result['Content-Encoding'] = 'gzip'
+    result.content = content
+
+    patch_vary_headers(result, ('Accept-Encoding',))
+    return result
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class SchoolConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'school'
+
+    def ready(self):
+        # Öğrenci listesi değişiklik kaydı sinyalleri
+        from . import roster  # noqa: F401
+        # TC -> okul dizini ve okul kaydı kopyası sinyalleri
+        from . import sharding  # noqa: F401
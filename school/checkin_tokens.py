@@ -0,0 +1,145 @@
+"""
+Süreli, imzalı giriş-çıkış QR token'ları
+Öğretmen panelindeki QR kodu sabit bir adres yerine her CHECKIN_TOKEN_PERIOD
+saniyede değişen bir token taşır. Token okul/sınıf kapsamını ve zaman
+penceresini içerir, HMAC-SHA256 ile imzalanır; doğrulama veritabanına ya da
+cache'e gitmeden sadece imza ve pencere kontrolüyle yapılır.
+
+Token biçimi:
+    <kapsam>.<pencere (hex)>.<imza>
+    kapsam: g (genel), s<okul id>, c<sınıf id>
+
+Kullanım:
+    token = make_token(scope_for(classroom_id=3))
+    scope = verify_token(token)     # InvalidToken fırlatabilir
+    if not scope_matches(scope, student): ...
+"""
+
+import base64
+import hashlib
+import hmac
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+SCOPE_RE = re.compile(r'^(?:g|[sc][1-9]\d{0,9})$')
+
+# İmzanın base64 uzunluğu (132 bit); kısa token daha küçük QR demek
+SIGNATURE_LENGTH = 22
+
+_key = None
+
+
+class InvalidToken(Exception):
+    """Token bozuk, imzası geçersiz veya süresi dolmuş"""
+
+
+def _signing_key():
+    """SECRET_KEY'den türetilen, sadece bu amaçla kullanılan anahtar (süreç başına bir kez)"""
+    global _key
+    if _key is None:
+        secret = settings.CHECKIN_TOKEN_SECRET or settings.SECRET_KEY
+        _key = hashlib.sha256(f'school.checkin_tokens:{secret}'.encode()).digest()
+    return _key
+
+
+def _sign(scope, window):
+    digest = hmac.new(_signing_key(), f'{scope}.{window:x}'.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest)[:SIGNATURE_LENGTH].decode()
+
+
+def scope_for(school_id=None, classroom_id=None):
+    if classroom_id:
+        return f'c{int(classroom_id)}'
+    if school_id:
+        return f's{int(school_id)}'
+    return 'g'
+
+
+def current_window(now=None):
+    return int((time.time() if now is None else now) // settings.CHECKIN_TOKEN_PERIOD)
+
+
+def make_token(scope, window=None):
+    window = current_window() if window is None else window
+    return f'{scope}.{window:x}.{_sign(scope, window)}'
+
+
+def verify_token(token, now=None, max_age=None):
+    """
+    Token'ı doğrula ve kapsamını döndür
+
+    QR okutulduktan sonra öğrencinin numarasını girmesi zaman alabileceği
+    için token CHECKIN_TOKEN_MAX_AGE saniye (ya da max_age) boyunca
+    geçerlidir. Panel sonraki token'ı önceden aldığından bir sonraki pencere
+    de kabul edilir. now sunucu zamanı olmalıdır; istemcinin bildirdiği
+    zamana göre doğrulanan token süresiz tekrar kullanılabilir.
+    """
+    if not token:
+        raise InvalidToken('Lütfen öğretmen panelindeki QR kodu okutun')
+    try:
+        scope, window_hex, signature = token.split('.')
+        window = int(window_hex, 16)
+    except (AttributeError, ValueError):
+        raise InvalidToken('Geçersiz QR kodu')
+    if not SCOPE_RE.match(scope) or len(signature) != SIGNATURE_LENGTH:
+        raise InvalidToken('Geçersiz QR kodu')
+
+    now_window = current_window(now)
+    max_age = settings.CHECKIN_TOKEN_MAX_AGE if max_age is None else max_age
+    max_windows = -(-max_age // settings.CHECKIN_TOKEN_PERIOD)
+    if not now_window - max_windows <= window <= now_window + 1:
+        raise InvalidToken('QR kodunun süresi dolmuş, lütfen tekrar okutun')
+
+    if not hmac.compare_digest(signature, _sign(scope, window)):
+        raise InvalidToken('Geçersiz QR kodu')
+
+    return {
+        'school_id': int(scope[1:]) if scope[0] == 's' else None,
+        'classroom_id': int(scope[1:]) if scope[0] == 'c' else None,
+        'window': window,
+        'valid_from': window * settings.CHECKIN_TOKEN_PERIOD,
+    }
+
+
+def scope_matches(scope, student):
+    """Öğrenci token'ın okul/sınıf kapsamında mı (sorgu yapmaz, *_id alanlarını kullanır)"""
+    if scope['classroom_id'] is not None:
+        return student.classroom_id == scope['classroom_id']
+    if scope['school_id'] is not None:
+        return student.school_id == scope['school_id']
+    return True
+
+
+def schedule(scope, count=None, now=None):
+    """
+    Şu anki ve sonraki pencerelerin token'ları
+
+    Panel listedeki son token'a gelmeden yenisini ister; böylece QR kod
+    değişimi ağ isteği beklemez. Liste pencere boyunca cache'te tutulur.
+    """
+    count = count or settings.CHECKIN_TOKEN_SCHEDULE
+    period = settings.CHECKIN_TOKEN_PERIOD
+    window = current_window(now)
+
+    key = f'checkin_tokens:{scope}:{window}:{count}'
+    tokens = cache.get(key)
+    if tokens is None:
+        tokens = [
+            {
+                'token': make_token(scope, w),
+                'valid_from': w * period,
+                'expires_at': (w + 1) * period,
+            }
+            for w in range(window, window + count)
+        ]
+        cache.set(key, tokens, period)
+
+    return {
+        'scope': scope,
+        'period': period,
+        'server_time': time.time() if now is None else now,
+        'tokens': tokens,
+    }
@@ -0,0 +1,40 @@
+"""
+Salt okunur JSON endpoint'leri için koşullu GET (ETag / If-None-Match)
+ETag ucuz bir sorguyla (ör. son kaydın id'si) hesaplanır; istemcinin
+gönderdiği ETag eşleşirse view hiç çalışmadan 304 döner. Tarayıcı ve
+kiosk istemcileri ETag'i otomatik olarak If-None-Match ile geri gönderir.
+"""
+
+from functools import wraps
+
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+# Yanıt formatı değiştiğinde eski ETag'ler geçersiz olsun diye artırılır
+ETAG_VERSION = 'v1'
+
+
+def etag_cached(etag_func):
+    """
+    View'a ETag desteği ekleyen dekoratör
+
+    etag_func(request, *args, **kwargs) bir dize döndürmelidir; None
+    dönerse (ör. kayıt bulunamadı) view normal şekilde çalışır. Yanıtlar
+    her seferinde doğrulansın diye 'private, no-cache' işaretlenir.
+    """
+    def versioned_etag(request, *args, **kwargs):
+        value = etag_func(request, *args, **kwargs)
+        # Zayıf ETag: aynı içerik gzip'li ya da düz gönderilebilir (school/api.py)
+        return f'W/"{ETAG_VERSION}-{value}"' if value is not None else None
+
+    def decorator(view):
+        conditional_view = condition(etag_func=versioned_etag)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if response.has_header('ETag'):
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,42 @@
+"""
+Veritabanı yazma yardımcıları
+SQLite tek yazıcıya izin verir; aynı worker içindeki thread'ler yoklama
+yazımlarını bir kilit üzerinden sıraya sokar, böylece "database is locked"
+hatası almak yerine sırayla beklerler. Worker'lar arası bekleme
+busy_timeout ile sağlanır.
+
+Kilit veritabanı başınadır: ayrı veritabanındaki okulların (SCHOOL_DATABASES)
+yazımları birbirini beklemez.
+"""
+
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+_write_locks = defaultdict(threading.Lock)
+_locks_guard = threading.Lock()
+
+
+def _write_lock(using):
+    with _locks_guard:
+        return _write_locks[using]
+
+
+@contextmanager
+def serialized_write(using=None):
+    """Yazma işlemini worker içi sıraya alarak tek transaction'da çalıştır"""
+    using = using or DEFAULT_DB_ALIAS
+    if not getattr(settings, 'SQLITE_SERIALIZE_WRITES', False):
+        if connections[using].vendor == 'sqlite':
+            # Varsayılan SQLite modunda autocommit davranışı korunur
+            yield
+        else:
+            with transaction.atomic(using=using):
+                yield
+        return
+
+    with _write_lock(using):
+        with transaction.atomic(using=using):
+            yield
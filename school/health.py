@@ -0,0 +1,158 @@
+"""
+Canlılık (/healthz) ve hazırlık (/readyz) kontrolleri
+Hazırlık kontrolü veritabanı gidiş-dönüş süresini, cache yazma/okuma
+süresini ve NETGSM'e yapılan son gerçek isteğin sonucunu raporlar. NETGSM
+her kontrolde çağrılmaz: SMS ve bakiye istekleri sonuçlarını cache'e
+yazar (record_netgsm), kontrol sadece bu kaydı okur. Kayıt eskidiyse
+bakiye arka planda (tekil) yenilenir.
+
+Kontroller sık çalıştığı için sonuç süreç içinde HEALTH_CACHE_TTL saniye
+saklanır; süresi dolduğunda aynı anda tek istek yeniler, diğerleri son
+sonucu döndürür.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+NETGSM_KEY = 'health:netgsm'
+
+# Veritabanı ya da cache yoksa uygulama istek karşılayamaz; SMS ise sonra tekrar denenir
+CRITICAL_CHECKS = ('database', 'cache')
+
+_lock = threading.Lock()
+_result = None
+_checked_at = 0.0
+
+
+def record_netgsm(account, reachable, latency, error=None):
+    """
+    NETGSM isteğinin sonucunu kaydet (NetGSMService çağırır)
+
+    error sadece hata türüdür; istek adresinde kullanıcı adı/şifre
+    bulunduğu için exception mesajı saklanmaz.
+    """
+    try:
+        cache.set(NETGSM_KEY, {
+            'account': account,
+            'reachable': reachable,
+            'latency_ms': round(latency * 1000, 1),
+            'error': error,
+            'at': time.time(),
+        }, None)
+    except Exception as e:
+        logger.warning("NETGSM sağlık kaydı yazılamadı: %s", e)
+
+
+def _status(latency_ms, threshold_ms):
+    return 'ok' if latency_ms <= threshold_ms else 'degraded'
+
+
+def check_database():
+    threshold = settings.HEALTH_DB_THRESHOLD_MS
+    started = time.perf_counter()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+    except Exception as e:
+        return {'status': 'fail', 'error': type(e).__name__, 'threshold_ms': threshold}
+    latency = round((time.perf_counter() - started) * 1000, 2)
+    return {'status': _status(latency, threshold), 'latency_ms': latency, 'threshold_ms': threshold}
+
+
+def check_cache():
+    threshold = settings.HEALTH_CACHE_THRESHOLD_MS
+    key = f'health:probe:{os.getpid()}'
+    value = uuid.uuid4().hex
+    started = time.perf_counter()
+    try:
+        cache.set(key, value, 60)
+        ok = cache.get(key) == value
+    except Exception as e:
+        return {'status': 'fail', 'error': type(e).__name__, 'threshold_ms': threshold}
+    latency = round((time.perf_counter() - started) * 1000, 2)
+    if not ok:
+        return {'status': 'fail', 'error': 'mismatch', 'latency_ms': latency, 'threshold_ms': threshold}
+    return {'status': _status(latency, threshold), 'latency_ms': latency, 'threshold_ms': threshold}
+
+
+def check_netgsm():
+    threshold = settings.HEALTH_NETGSM_THRESHOLD_MS
+    max_age = settings.HEALTH_NETGSM_MAX_AGE
+    record = cache.get(NETGSM_KEY)
+    age = time.time() - record['at'] if record else None
+
+    if record is None or age > max_age:
+        _refresh_netgsm()
+
+    if record is None:
+        return {'status': 'unknown', 'threshold_ms': threshold, 'max_age_seconds': max_age}
+
+    if not record['reachable']:
+        status = 'degraded'
+    else:
+        status = _status(record['latency_ms'], threshold)
+    return {
+        'status': status,
+        'reachable': record['reachable'],
+        'latency_ms': record['latency_ms'],
+        'error': record['error'],
+        'age_seconds': round(age, 1),
+        'stale': age > max_age,
+        'threshold_ms': threshold,
+        'max_age_seconds': max_age,
+    }
+
+
+def _refresh_netgsm():
+    """Bakiye sorgusunu arka planda başlat (süreçler arası tekil); sonucu record_netgsm yazar"""
+    if not getattr(settings, 'SMS_ENABLED', True):
+        return
+    try:
+        from .sms_service import sms_service
+        sms_service.netgsm.balance.refresh_async()
+    except Exception as e:
+        logger.warning("NETGSM sağlık yenilemesi başlatılamadı: %s", e)
+
+
+def run_checks():
+    checks = {
+        'database': check_database(),
+        'cache': check_cache(),
+        'netgsm': check_netgsm(),
+    }
+    if any(checks[name]['status'] == 'fail' for name in CRITICAL_CHECKS):
+        status = 'fail'
+    elif any(check['status'] in ('fail', 'degraded') for check in checks.values()):
+        status = 'degraded'
+    else:
+        status = 'ok'
+    return {'status': status, 'checked_at': time.time(), 'checks': checks}
+
+
+def readiness():
+    """Son hazırlık sonucu; süresi dolduysa tek thread yeniler, diğerleri beklemez"""
+    global _result, _checked_at
+
+    if _result is not None and time.monotonic() - _checked_at < settings.HEALTH_CACHE_TTL:
+        return _result
+
+    # İlk kontrolde sonuç yoktur; herkes sırayla bekler
+    if not _lock.acquire(blocking=_result is None):
+        return _result
+    try:
+        if _result is None or time.monotonic() - _checked_at >= settings.HEALTH_CACHE_TTL:
+            _result = run_checks()
+            _checked_at = time.monotonic()
+        return _result
+    finally:
+        _lock.release()
@@ -0,0 +1,293 @@
+"""
+Toplu öğrenci içe aktarma
+CSV veya XLSX dosyası parça parça okunur; her parça önceden yüklenmiş
+okul/sınıf/öğrenci haritalarıyla toplu olarak doğrulanır ve tek
+transaction içinde bulk_create/bulk_update ile yazılır. Hatalı satırlar
+atlanır ve satır numarasıyla raporlanır.
+"""
+
+import csv
+import io
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from . import roster, sharding
+from .models import School, Classroom, Student
+from .phones import normalize_phone_number
+
+# Dosya başlıkları (Türkçe veya alan adı) -> model alanı
+COLUMN_ALIASES = {
+    'first_name': 'first_name', 'ad': 'first_name',
+    'last_name': 'last_name', 'soyad': 'last_name',
+    'id_number': 'id_number', 'tc': 'id_number', 'tc kimlik no': 'id_number',
+    'phone_number': 'phone_number', 'telefon': 'phone_number',
+    'school': 'school', 'okul': 'school',
+    'classroom': 'classroom', 'sınıf': 'classroom', 'sinif': 'classroom',
+    'parent_first_name': 'parent_first_name', 'veli adı': 'parent_first_name', 'veli adi': 'parent_first_name',
+    'parent_last_name': 'parent_last_name', 'veli soyadı': 'parent_last_name', 'veli soyadi': 'parent_last_name',
+    'parent_phone_number': 'parent_phone_number', 'veli telefon': 'parent_phone_number',
+    'is_active': 'is_active', 'aktif': 'is_active',
+}
+
+REQUIRED_COLUMNS = (
+    'first_name', 'last_name', 'id_number', 'school', 'classroom',
+    'parent_first_name', 'parent_last_name', 'parent_phone_number',
+)
+
+UPDATE_FIELDS = [
+    'first_name', 'last_name', 'phone_number', 'school', 'classroom',
+    'parent_first_name', 'parent_last_name', 'parent_phone_number',
+    'parent_phone_e164', 'is_active',
+]
+
+# Değişiklik karşılaştırması için veritabanı sütun adları
+UPDATE_ATTNAMES = [f'{name}_id' if name in ('school', 'classroom') else name for name in UPDATE_FIELDS]
+
+PHONE_SEPARATORS = re.compile(r'[\s\-().]')
+
+FALSE_VALUES = {'0', 'false', 'hayır', 'hayir', 'h', 'no', 'pasif'}
+
+
+class ImportFileError(Exception):
+    """Dosya okunamadığında veya başlıklar eksik olduğunda"""
+
+
+@dataclass
+class ImportResult:
+    """İçe aktarma özeti"""
+    total: int = 0
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    classrooms_created: int = 0
+    errors: list = field(default_factory=list)  # (satır no, TC, mesaj)
+
+    @property
+    def failed(self):
+        return len({row for row, _, _ in self.errors})
+
+    def write_report(self, stream):
+        """Hata raporunu CSV olarak yaz"""
+        writer = csv.writer(stream)
+        writer.writerow(['satir', 'tc_kimlik_no', 'hata'])
+        writer.writerows(self.errors)
+
+
+def read_rows(file, filename):
+    """Dosyayı uzantısına göre satır satır oku: (satır no, dict) üretir"""
+    if filename.lower().endswith('.xlsx'):
+        rows = _read_xlsx(file)
+    else:
+        rows = _read_csv(file)
+
+    header = next(rows, None)
+    if header is None:
+        raise ImportFileError('Dosya boş')
+
+    columns = [COLUMN_ALIASES.get(str(name or '').strip().lower()) for name in header]
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise ImportFileError(f"Eksik sütunlar: {', '.join(missing)}")
+
+    for number, values in enumerate(rows, start=2):
+        row = {
+            column: str(value).strip() if value is not None else ''
+            for column, value in zip(columns, values)
+            if column
+        }
+        if any(row.values()):
+            yield number, row
+
+
+def _read_csv(file):
+    text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+    sample = text.read(4096)
+    text.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+    except csv.Error:
+        dialect = csv.excel
+    yield from csv.reader(text, dialect)
+
+
+def _read_xlsx(file):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError('XLSX dosyaları için openpyxl kurulu olmalı (pip install openpyxl)')
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        for values in workbook.active.iter_rows(values_only=True):
+            yield [_xlsx_value(value) for value in values]
+    finally:
+        workbook.close()
+
+
+def _xlsx_value(value):
+    # Excel TC ve telefon numaralarını sayı olarak saklayabilir (12345678901.0)
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+class StudentImporter:
+    """Öğrenci satırlarını toplu doğrulayıp yazan içe aktarıcı"""
+
+    def __init__(self, chunk_size=1000, dry_run=False, create_classrooms=False, user=None):
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.create_classrooms = create_classrooms
+        self.user = user
+
+        # Okullar ve sınıflar tek seferde yüklenir (ad ve id ile arama)
+        self.schools = {}
+        for school in School.objects.all():
+            self.schools[str(school.pk)] = school
+            self.schools[school.name.strip().lower()] = school
+
+        self.classrooms = {
+            (classroom.school_id, classroom.name.strip().lower()): classroom
+            for alias in sharding.databases()
+            for classroom in sharding.home_filter(Classroom.objects.using(alias), alias)
+        }
+
+    def run(self, rows):
+        """Satırları parça parça işle"""
+        result = ImportResult()
+        seen_ids = set()
+        rows = iter(rows)
+
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            result.total += len(chunk)
+            self._process_chunk(chunk, seen_ids, result)
+
+        return result
+
+    def _process_chunk(self, chunk, seen_ids, result):
+        # Mevcut öğrenciler okullarının veritabanından (TC -> okul dizini ile)
+        existing = sharding.students_by_id_number([row.get('id_number', '') for _, row in chunk])
+        new_classrooms = {}
+        to_create = []
+        to_update = []
+        changed_fields = set()
+
+        for number, row in chunk:
+            errors = []
+            id_number = row.get('id_number', '')
+
+            if id_number in seen_ids:
+                errors.append('TC kimlik numarası dosyada birden fazla kez geçiyor')
+
+            student = existing.get(id_number) or Student(created_by=self.user)
+            original = [getattr(student, attname) for attname in UPDATE_ATTNAMES] if student.pk else None
+            for name in ('first_name', 'last_name', 'id_number', 'phone_number',
+                         'parent_first_name', 'parent_last_name', 'parent_phone_number'):
+                setattr(student, name, row.get(name, getattr(student, name) if student.pk else ''))
+            # Tablolarda sık görülen "0532 123 45 67" gibi ayraçlar temizlenir
+            for name in ('phone_number', 'parent_phone_number'):
+                setattr(student, name, PHONE_SEPARATORS.sub('', getattr(student, name)))
+            if row.get('is_active'):
+                student.is_active = row['is_active'].lower() not in FALSE_VALUES
+
+            # Alan formatları (TC, telefon, zorunlu alanlar) model validasyonuyla
+            try:
+                student.clean_fields(exclude=['school', 'classroom', 'created_by', 'parent_phone_e164'])
+            except ValidationError as e:
+                errors.extend(
+                    f'{Student._meta.get_field(name).verbose_name}: {" ".join(messages)}'
+                    for name, messages in e.message_dict.items()
+                )
+
+            student.parent_phone_e164 = normalize_phone_number(student.parent_phone_number)
+            if not student.parent_phone_e164:
+                errors.append('Veli telefon numarası geçerli bir cep telefonu değil')
+
+            # Okul / sınıf tutarlılığı önceden yüklenmiş haritalarla
+            school = self.schools.get(row.get('school', '').lower())
+            if school is None:
+                errors.append(f"Okul bulunamadı: {row.get('school', '')}")
+            else:
+                key = (school.pk, row.get('classroom', '').lower())
+                classroom = self.classrooms.get(key) or new_classrooms.get(key)
+                if classroom is None and self.create_classrooms and row.get('classroom'):
+                    classroom = Classroom(school=school, name=row['classroom'], created_by=self.user)
+                if classroom is None:
+                    errors.append(f"Sınıf bulunamadı: {school.name} - {row.get('classroom', '')}")
+                elif student.pk and student._state.db != sharding.db_for_school(school.pk):
+                    errors.append('Öğrenci farklı veritabanındaki bir okula aktarılamaz')
+                else:
+                    student.school = school
+                    student.classroom = classroom
+
+            if errors:
+                result.errors.extend((number, id_number, message) for message in errors)
+                continue
+
+            if student.classroom.pk is None:
+                new_classrooms.setdefault(key, student.classroom)
+            seen_ids.add(id_number)
+            if not student.pk:
+                to_create.append(student)
+            else:
+                changed = {
+                    name for name, attname, value in zip(UPDATE_FIELDS, UPDATE_ATTNAMES, original)
+                    if getattr(student, attname) != value
+                }
+                if changed:
+                    to_update.append(student)
+                    changed_fields |= changed
+                else:
+                    result.unchanged += 1
+
+        if self.dry_run:
+            result.created += len(to_create)
+            result.updated += len(to_update)
+            result.classrooms_created += len(new_classrooms)
+            return
+
+        # Kayıtlar okulun veritabanına yazılır (school/sharding.py)
+        groups = defaultdict(lambda: ([], [], []))
+        for classroom in new_classrooms.values():
+            groups[sharding.db_for_school(classroom.school_id)][0].append(classroom)
+        for student in to_create:
+            groups[sharding.db_for_school(student.school_id)][1].append(student)
+        for student in to_update:
+            groups[sharding.db_for_school(student.school_id)][2].append(student)
+        # bulk_update auto_now alanlarını güncellemez; student_status ETag'i
+        # updated_at'ten üretildiği için elle işaretlenir
+        fields = [name for name in UPDATE_FIELDS if name in changed_fields] + ['updated_at']
+        now = timezone.now()
+        for student in to_update:
+            student.updated_at = now
+
+        with transaction.atomic():
+            for alias, (classrooms, creates, updates) in groups.items():
+                with transaction.atomic(using=alias):
+                    if classrooms:
+                        Classroom.objects.using(alias).bulk_create(classrooms)
+                        # bulk_create sonrası pk atanan sınıfları öğrencilere yeniden bağla
+                        for student in creates + updates:
+                            student.classroom = student.classroom
+
+                    Student.objects.using(alias).bulk_create(creates, batch_size=500)
+                    # bulk_update her alan için CASE WHEN üretir; sadece değişen alanlar yazılır
+                    if updates:
+                        Student.objects.using(alias).bulk_update(updates, fields, batch_size=500)
+            self.classrooms.update(new_classrooms)
+            result.classrooms_created += len(new_classrooms)
+            # Toplu yazımlar sinyal göndermez; kiosk listesi ve TC dizini elle güncellenir
+            roster.record_students(to_create + to_update)
+            sharding.record_directory(to_create + to_update)
+
+        result.created += len(to_create)
+        result.updated += len(to_update)
@@ -0,0 +1,165 @@
+"""
+Bloklamayan, yapılandırılmış loglama
+İstek thread'leri log kaydını yalnızca bir kuyruğa bırakır; biçimlendirme
+(JSON), kişisel veri maskeleme ve yazma işlemi arka plandaki
+QueueListener thread'inde yapılır. Kuyruk doluysa kayıt bekletilmeden
+atılır ve sayılır; atılan kayıt sayısı en fazla dakikada bir uyarı olarak
+yazılır.
+
+Ayar örneği:
+    'handlers': {
+        'console': {
+            'class': 'school.log_handlers.NonBlockingHandler',
+            'formatter': 'json',
+        },
+    }
+"""
+
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueListener
+
+# +90 / 0 önekli veya öneksiz cep telefonu numaraları (ayraçlı yazımlar dahil)
+PHONE_RE = re.compile(r'(?<![\d*])(?:\+?90[\s-]?|0)?5\d{2}[\s-]?\d{3}[\s-]?\d{2}[\s-]?\d{2}(?!\d)')
+
+# 11 haneli TC kimlik numaraları (0 ile başlamaz)
+TC_RE = re.compile(r'(?<![\d*])[1-9]\d{10}(?!\d)')
+
+
+def _mask(match):
+    """Son iki hane dışındaki rakamları gizle"""
+    digits = re.sub(r'\D', '', match.group())
+    return '*' * (len(digits) - 2) + digits[-2:]
+
+
+def redact(text):
+    """Metindeki telefon ve TC kimlik numaralarını maskele"""
+    return TC_RE.sub(_mask, PHONE_RE.sub(_mask, text))
+
+
+class RedactingFormatter(logging.Formatter):
+    """Düz metin çıktısında kişisel verileri maskeleyen formatter"""
+
+    def format(self, record):
+        return redact(super().format(record))
+
+
+class JSONFormatter(logging.Formatter):
+    """Her kaydı tek satırlık JSON olarak yazan, kişisel verileri maskeleyen formatter"""
+
+    def format(self, record):
+        data = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': redact(record.getMessage()),
+            'module': record.module,
+            'process': record.process,
+            'thread': record.threadName,
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exception'] = redact(record.exc_text)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class NonBlockingHandler(logging.Handler):
+    """
+    Kayıtları sınırlı bir kuyruğa bırakan handler
+
+    Kuyruğu arka planda bir QueueListener boşaltır ve asıl StreamHandler'a
+    yazar. dictConfig'te verilen formatter asıl handler'a aktarılır; böylece
+    JSON biçimlendirme ve maskeleme istek thread'inde çalışmaz. Süreç
+    fork edilirse (uWSGI/gunicorn) listener alt süreçte yeniden başlatılır.
+
+    logging.handlers.QueueHandler'dan türetilmez: Python 3.12+ dictConfig
+    QueueHandler alt sınıflarını özel olarak yapılandırır.
+    """
+
+    # Atılan kayıtlar için uyarı aralığı (sn)
+    DROPPED_REPORT_INTERVAL = 60
+
+    def __init__(self, stream=None, maxsize=10000):
+        super().__init__()
+        self.target = logging.StreamHandler(stream or sys.stderr)
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._reported = 0
+        self._reported_at = float('-inf')
+        self.listener = None
+        self._start_listener()
+        atexit.register(self.close)
+
+    def _start_listener(self):
+        self.queue = queue.Queue(self.maxsize)
+        self.listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+        self.listener.start()
+        self._pid = os.getpid()
+
+    def setFormatter(self, fmt):
+        # Biçimlendirme listener thread'inde asıl handler tarafından yapılır
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        """
+        Mesajı istek thread'inde birleştir (argümanlar sonradan değişebilir)
+        ama JSON'a çevirme ve maskelemeyi listener'a bırak
+        """
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        try:
+            if self._pid != os.getpid():
+                self._start_listener()
+            self.queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            self.dropped += 1
+            return
+        except Exception:
+            self.handleError(record)
+            return
+        self._report_dropped()
+
+    def _dropped_record(self):
+        return logging.LogRecord(
+            __name__, logging.WARNING, __file__, 0,
+            'Log kuyruğu dolu olduğu için %s kayıt atıldı (toplam %s)',
+            (self.dropped - self._reported, self.dropped), None,
+        )
+
+    def _report_dropped(self):
+        """Atılan kayıt sayısını kuyruğa uyarı olarak bırak (handle() kilidi altında çağrılır)"""
+        now = time.monotonic()
+        if self.dropped == self._reported or now - self._reported_at < self.DROPPED_REPORT_INTERVAL:
+            return
+        try:
+            self.queue.put_nowait(self._dropped_record())
+        except queue.Full:
+            return
+        self._reported = self.dropped
+        self._reported_at = now
+
+    def close(self):
+        if self.listener is not None and self._pid == os.getpid():
+            # Kuyrukta kalan kayıtlar yazılır
+            self.listener.stop()
+            self.listener = None
+            if self.dropped != self._reported:
+                self.target.handle(self._dropped_record())
+                self._reported = self.dropped
+        self.target.close()
+        super().close()
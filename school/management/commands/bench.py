@@ -0,0 +1,223 @@
+"""
+Giriş-çıkış sıcak yolu benchmark'ı
+Kullanım:
+    python manage.py seed_load
+    python manage.py bench --requests 200 --concurrency 8
+    python manage.py bench --url http://127.0.0.1:8000 --scenarios toggle status
+
+Varsayılan olarak Django test client ile süreç içinde çalışır (SMS
+gönderimi kapatılır, istek başına SQL sorgu sayısı ölçülür). --url
+verilirse çalışan bir sunucuya HTTP istekleri gönderilir. Sonuçlar,
+commit'ler arasında karşılaştırılabilmesi için JSON olarak yazılır.
+
+Sadece seed_load'un oluşturduğu "Yük Testi" okullarındaki öğrenciler
+kullanılır; gerçek öğrencilerin yoklaması değişmez, velilerine SMS gitmez.
+Admin senaryoları için çalıştırma süresince geçici bir yönetici oluşturulur
+ve bitişte silinir.
+
+Sunucu modunda admin senaryoları düz HTTP üzerinden oturum açar; sunucu
+CSRF_COOKIE_SECURE=False ve SESSION_COOKIE_SECURE=False ile çalışmalıdır.
+"""
+
+import json
+import random
+import secrets
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from school import checkin_tokens, sharding
+from school.management.commands.seed_load import ID_PREFIX, SCHOOL_PREFIX
+from school.models import Student
+
+BENCH_USERNAME = 'bench_admin'
+
+SCENARIOS = {
+    'toggle': ('POST', '/attendance-toggle/', False),
+    'status': ('GET', '/student-status/{id_number}/', False),
+    'admin_students': ('GET', '/admin/school/student/', True),
+    'admin_attendance': ('GET', '/admin/school/attendance/', True),
+}
+
+
+def percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Command(BaseCommand):
+    help = 'attendance_toggle, student_status ve admin listeleri için gecikme/istek hızı ölçer'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenarios', nargs='+', default=list(SCENARIOS), choices=list(SCENARIOS))
+        parser.add_argument('--requests', type=int, default=200, help='Senaryo başına istek sayısı')
+        parser.add_argument('--concurrency', type=int, default=4, help='Eşzamanlı istemci sayısı')
+        parser.add_argument('--url', default='', help='Çalışan sunucu adresi (boşsa test client)')
+        parser.add_argument('--output', default='', help='JSON sonucun yazılacağı dosya')
+
+    def handle(self, *args, **options):
+        id_numbers = self._seeded_id_numbers(limit=2000)
+        if not id_numbers:
+            raise CommandError('Yük testi verisi yok. Önce "python manage.py seed_load" çalıştırın.')
+
+        if options['url']:
+            self.stderr.write('Uyarı: sunucu modunda SMS gönderimi sunucu ayarlarına bağlıdır (SMS_ENABLED).')
+            self.stderr.write('Uyarı: tek IP\'den ölçüm için sunucuda RATELIMIT_ENABLED=False olmalıdır.')
+            self._create_admin_user(password=True)
+        else:
+            # Benchmark gerçek SMS göndermesin
+            settings.SMS_ENABLED = False
+            # Tüm istekler tek istemciden gelir; istek sınırı ölçümü bozmasın
+            settings.RATELIMIT_ENABLED = False
+            self._create_admin_user()
+
+        results = {
+            'commit': self._git_commit(),
+            'database': connection.vendor,
+            'mode': 'server' if options['url'] else 'test_client',
+            'concurrency': options['concurrency'],
+            'scenarios': {},
+        }
+
+        try:
+            for name in options['scenarios']:
+                results['scenarios'][name] = self._run_scenario(
+                    name, options['requests'], options['concurrency'], options['url'], id_numbers
+                )
+        finally:
+            self.admin_user.delete()
+
+        output = json.dumps(results, indent=2, ensure_ascii=False)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as handle:
+                handle.write(output)
+        self.stdout.write(output)
+
+    def _seeded_id_numbers(self, limit):
+        """seed_load öğrencilerinin TC numaraları (gerçek öğrenciler hariç)"""
+        id_numbers = []
+        for alias in sharding.databases():
+            students = sharding.home_filter(Student.objects.using(alias), alias).filter(
+                is_active=True,
+                id_number__startswith=ID_PREFIX,
+                school__name__startswith=SCHOOL_PREFIX,
+            )
+            id_numbers += students.values_list('id_number', flat=True)[:limit - len(id_numbers)]
+            if len(id_numbers) >= limit:
+                break
+        return id_numbers
+
+    def _create_admin_user(self, password=False):
+        """Sadece bu çalıştırma için yönetici; handle() bitişte siler"""
+        user = User(
+            username=f'{BENCH_USERNAME}_{secrets.token_hex(4)}',
+            is_staff=True, is_superuser=True,
+        )
+        if password:
+            self.admin_password = secrets.token_urlsafe(16)
+            user.set_password(self.admin_password)
+        else:
+            user.set_unusable_password()
+        user.save()
+        self.admin_user = user
+
+    def _git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                capture_output=True, text=True, cwd=settings.BASE_DIR, timeout=5
+            ).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
+
+    def _run_scenario(self, name, total, concurrency, base_url, id_numbers):
+        method, path_template, needs_admin = SCENARIOS[name]
+        local = threading.local()
+
+        def make_client():
+            if base_url:
+                import requests
+                session = requests.Session()
+                if needs_admin:
+                    self._login_session(session, base_url)
+                return session
+            client = Client(HTTP_HOST='localhost')
+            if needs_admin:
+                client.force_login(self.admin_user)
+            return client
+
+        def one_request(_):
+            client = getattr(local, 'client', None)
+            if client is None:
+                client = local.client = make_client()
+
+            id_number = random.choice(id_numbers)
+            path = path_template.format(id_number=id_number)
+            body = json.dumps({'id_number': id_number, 'token': checkin_tokens.make_token('g')})
+
+            if base_url:
+                start = time.perf_counter()
+                if method == 'POST':
+                    response = client.post(base_url + path, data=body, headers={'Content-Type': 'application/json'})
+                else:
+                    response = client.get(base_url + path)
+                elapsed = time.perf_counter() - start
+                # Oturum açılamadıysa admin giriş sayfasına yönlendirilir
+                status = 401 if '/admin/login/' in response.url else response.status_code
+                return elapsed, status, None
+
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                if method == 'POST':
+                    response = client.post(path, data=body, content_type='application/json')
+                else:
+                    response = client.get(path)
+                elapsed = time.perf_counter() - start
+            return elapsed, response.status_code, len(queries)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            samples = list(executor.map(one_request, range(total)))
+        wall = time.perf_counter() - started
+
+        latencies = [sample[0] for sample in samples]
+        query_counts = [sample[2] for sample in samples if sample[2] is not None]
+        errors = sum(1 for sample in samples if sample[1] >= 400)
+
+        def ms(value):
+            return round(value * 1000, 2) if value is not None else None
+
+        return {
+            'requests': total,
+            'errors': errors,
+            'requests_per_second': round(total / wall, 1),
+            'p50_ms': ms(percentile(latencies, 0.50)),
+            'p95_ms': ms(percentile(latencies, 0.95)),
+            'p99_ms': ms(percentile(latencies, 0.99)),
+            'max_ms': ms(max(latencies)),
+            'queries_per_request': (
+                round(sum(query_counts) / len(query_counts), 2) if query_counts else None
+            ),
+            'max_queries': max(query_counts) if query_counts else None,
+        }
+
+    def _login_session(self, session, base_url):
+        """Admin sayfaları için sunucuya oturum aç"""
+        login_url = f'{base_url}/admin/login/'
+        session.get(login_url)
+        session.post(login_url, data={
+            'username': self.admin_user.username,
+            'password': self.admin_password,
+            'csrfmiddlewaretoken': session.cookies.get('csrftoken', ''),
+            'next': '/admin/',
+        }, headers={'Referer': login_url})
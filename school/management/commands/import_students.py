@@ -0,0 +1,57 @@
+"""
+CSV/XLSX dosyasından toplu öğrenci içe aktarma
+Kullanım:
+    python manage.py import_students ogrenciler.csv [--dry-run] [--create-classrooms] [--report hatalar.csv]
+
+Beklenen sütunlar (Türkçe başlıklar da kabul edilir):
+    first_name, last_name, id_number, phone_number, school, classroom,
+    parent_first_name, parent_last_name, parent_phone_number, is_active
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from school.importers import ImportFileError, StudentImporter, read_rows
+
+
+class Command(BaseCommand):
+    help = 'CSV veya XLSX dosyasından öğrencileri toplu olarak içe aktarır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV veya XLSX dosyası')
+        parser.add_argument('--dry-run', action='store_true', help='Kaydetmeden sadece doğrula')
+        parser.add_argument('--create-classrooms', action='store_true', help='Olmayan sınıfları oluştur')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Tek transaction\'daki satır sayısı')
+        parser.add_argument('--report', default='', help='Hatalı satırların yazılacağı CSV dosyası')
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        importer = StudentImporter(
+            chunk_size=options['chunk_size'],
+            dry_run=options['dry_run'],
+            create_classrooms=options['create_classrooms'],
+        )
+
+        try:
+            with open(options['path'], 'rb') as file:
+                result = importer.run(read_rows(file, options['path']))
+        except (OSError, ImportFileError) as e:
+            raise CommandError(str(e))
+
+        for row, id_number, message in result.errors[:50]:
+            self.stdout.write(self.style.WARNING(f"Satır {row} ({id_number or '-'}): {message}"))
+        if len(result.errors) > 50:
+            self.stdout.write(self.style.WARNING(f"... ve {len(result.errors) - 50} hata daha"))
+
+        if options['report'] and result.errors:
+            with open(options['report'], 'w', encoding='utf-8-sig', newline='') as stream:
+                result.write_report(stream)
+            self.stdout.write(f"Hata raporu yazıldı: {options['report']}")
+
+        prefix = '[Deneme] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}{result.total} satır: {result.created} yeni, {result.updated} güncellenen, "
+            f"{result.unchanged} değişmeyen, {result.failed} hatalı, {result.classrooms_created} yeni sınıf "
+            f"({time.perf_counter() - started:.1f} sn)"
+        ))
@@ -0,0 +1,113 @@
+"""
+Okulun sınıf, öğrenci ve yoklama kayıtlarını kendi veritabanına taşır
+Kullanım:
+    SCHOOL_DATABASES=3 python manage.py move_school 3
+    (web uygulamasını yeni SCHOOL_DATABASES ile yeniden başlat)
+    SCHOOL_DATABASES=3 python manage.py move_school 3 --delete-source
+
+İlk çalıştırma hedef veritabanını oluşturur (migrate), kimlik sayaçlarını
+okula ayrılan aralığa alır ve kayıtları kopyalar; ana veritabanındaki
+kayıtlar silinmez. Web uygulaması yeni ayarla açılana kadar gelen yoklamalar
+ana veritabanına yazılmaya devam eder; --delete-source bunları da kopyalar,
+her kaydın hedefte olduğunu doğrular ve ana veritabanındaki kopyayı siler.
+Komut tekrar çalıştırılabilir; mevcut kayıtlar güncellenir.
+"""
+
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from school import sharding
+from school.models import Attendance, Classroom, School, Student
+
+
+class Command(BaseCommand):
+    help = 'Okulun kayıtlarını SCHOOL_DATABASES ayarındaki veritabanına taşır'
+
+    def add_arguments(self, parser):
+        parser.add_argument('school_id', type=int, help='Taşınacak okulun id numarası')
+        parser.add_argument('--batch-size', type=int, default=2000, help='Tek seferde kopyalanan kayıt sayısı')
+        parser.add_argument(
+            '--delete-source', action='store_true',
+            help='Kopyaladıktan ve doğruladıktan sonra ana veritabanındaki kayıtları sil'
+        )
+
+    def handle(self, *args, **options):
+        school_id = options['school_id']
+        target = sharding.db_for_school(school_id)
+        if target == DEFAULT_DB_ALIAS:
+            raise CommandError(f'{school_id} numaralı okul SCHOOL_DATABASES ayarında tanımlı değil')
+        try:
+            school = School.objects.using(DEFAULT_DB_ALIAS).get(pk=school_id)
+        except School.DoesNotExist:
+            raise CommandError(f'{school_id} numaralı okul bulunamadı')
+
+        self.batch_size = options['batch_size']
+        self.target = target
+
+        # SQLite dosyasının klasörü yoksa oluşturulur
+        Path(settings.DATABASES[target]['NAME']).parent.mkdir(parents=True, exist_ok=True)
+        call_command('migrate', 'school', database=target, interactive=False, verbosity=0)
+        start = sharding.reserve_ids(target)
+        sharding.replicate_school(school)
+        self.stdout.write(f'"{school.name}" -> {target} (yeni kayıt kimlikleri {start} ve sonrası)')
+
+        source = {
+            Classroom: Classroom.objects.using(DEFAULT_DB_ALIAS).filter(school_id=school_id),
+            Student: Student.objects.using(DEFAULT_DB_ALIAS).filter(school_id=school_id),
+            Attendance: Attendance.objects.using(DEFAULT_DB_ALIAS).filter(student__school_id=school_id),
+        }
+
+        # Sharding kapalıyken güncellenmeyen dizinde okulu gösteren eski kayıtlar
+        current = set(source[Student].values_list('id_number', flat=True))
+        current.update(Student.objects.using(target).filter(school_id=school_id).values_list('id_number', flat=True))
+        pruned = sharding.prune_directory(school_id, current)
+        if pruned:
+            self.stdout.write(f'Dizinden {pruned} eski kayıt silindi')
+        for model, queryset in source.items():
+            copied = self._copy(model, queryset)
+            self.stdout.write(f'{model._meta.verbose_name_plural}: {copied} kayıt kopyalandı')
+
+        if not options['delete_source']:
+            self.stdout.write(self.style.SUCCESS(
+                'Kopyalama tamamlandı. Web uygulamasını yeni ayarla yeniden başlattıktan sonra '
+                '--delete-source ile tekrar çalıştırın.'
+            ))
+            return
+
+        # Bağlı kayıtlardan başlayarak silinir; sinyaller eski kopyayı dizinden silmez
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            for model in reversed(list(source)):
+                deleted, _ = source[model].delete()
+                self.stdout.write(f'{model._meta.verbose_name_plural}: ana veritabanından silindi ({deleted})')
+        self.stdout.write(self.style.SUCCESS(f'"{school.name}" artık yalnızca {target} veritabanında'))
+
+    def _copy(self, model, queryset):
+        """Kayıtları pk sırasıyla parça parça kopyala ve her parçanın hedefte olduğunu doğrula"""
+        update_fields = [field.name for field in model._meta.concrete_fields if not field.primary_key]
+        target = model.objects.using(self.target)
+        copied = 0
+        last_pk = 0
+
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk).order_by('pk')[:self.batch_size])
+            if not batch:
+                return copied
+            last_pk = batch[-1].pk
+
+            with transaction.atomic(using=self.target):
+                if model is Attendance:
+                    # Yoklama kayıtları değişmez; hedefte olanlar atlanır
+                    target.bulk_create(batch, ignore_conflicts=True)
+                else:
+                    target.bulk_create(batch, update_conflicts=True, unique_fields=['id'], update_fields=update_fields)
+            if model is Student:
+                sharding.record_directory(batch)
+
+            pks = [obj.pk for obj in batch]
+            if target.filter(pk__in=pks).count() != len(pks):
+                raise CommandError(f'{model._meta.verbose_name_plural} kopyalanamadı ({pks[0]}-{pks[-1]})')
+            copied += len(batch)
@@ -0,0 +1,72 @@
+"""
+Mevcut öğrencilerin veli telefonlarını toplu olarak normalize et
+Kullanım: python manage.py normalize_parent_phones [--dry-run]
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from school import sharding
+from school.models import Student
+from school.phones import normalize_phone_number
+
+
+class Command(BaseCommand):
+    help = 'Veli telefonlarını E.164 formatına çevirir ve geçersiz numaraları raporlar'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Değişiklikleri kaydetmeden sadece raporla'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Tek seferde güncellenecek kayıt sayısı'
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        batch_size = options['batch_size']
+
+        changed_count = 0
+        invalid = []
+        total = 0
+
+        # Okul veritabanları sırayla taranır (school/sharding.py)
+        for alias in sharding.databases():
+            changed = []
+            students = sharding.home_filter(Student.objects.using(alias), alias).only(
+                'id', 'first_name', 'last_name', 'id_number',
+                'parent_phone_number', 'parent_phone_e164'
+            ).order_by('pk')
+
+            for student in students.iterator(chunk_size=batch_size):
+                total += 1
+                normalized = normalize_phone_number(student.parent_phone_number)
+
+                if not normalized:
+                    invalid.append(student)
+
+                if normalized != student.parent_phone_e164:
+                    student.parent_phone_e164 = normalized
+                    changed.append(student)
+
+            changed_count += len(changed)
+            if not dry_run and changed:
+                with transaction.atomic(using=alias):
+                    Student.objects.using(alias).bulk_update(changed, ['parent_phone_e164'], batch_size=batch_size)
+
+        for student in invalid:
+            self.stdout.write(self.style.WARNING(
+                f"Geçersiz veli telefonu: {student.first_name} {student.last_name} "
+                f"({student.id_number}) -> '{student.parent_phone_number}'"
+            ))
+
+        action = 'güncellenecek' if dry_run else 'güncellendi'
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} öğrenci tarandı, {changed_count} kayıt {action}, "
+            f"{len(invalid)} geçersiz numara"
+        ))
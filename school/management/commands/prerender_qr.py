@@ -0,0 +1,59 @@
+"""
+QR kod görüntülerini önceden üretip cache'e yazar
+Kullanım:
+    python manage.py prerender_qr --base-url https://baskentpsikoloji.pythonanywhere.com
+    python manage.py prerender_qr --base-url https://... --formats png svg --size 360
+
+Genel kapsam ile her aktif okul ve sınıf için sıradaki giriş-çıkış
+token'larının (checkin_tokens.schedule) görüntüleri QR_CODE_CACHE_TIMEOUT
+süresince cache'te tutulur; panel QR değişiminde görüntü üretimini
+beklemez. Token'lar döndüğü için cron ile birkaç dakikada bir çalıştırılabilir.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from school import checkin_tokens, qr, sharding
+from school.models import Classroom, School
+
+
+class Command(BaseCommand):
+    help = 'QR kod görüntülerini önceden üretip cache\'e yazar'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', required=True, help='Sitenin kök adresi (ör. https://ornek.com)')
+        parser.add_argument('--formats', nargs='+', default=['png'], choices=sorted(qr.FORMATS), help='Üretilecek formatlar')
+        parser.add_argument('--size', type=int, default=settings.QR_CODE_SIZE, help='PNG boyutu (piksel)')
+        parser.add_argument('--margin', type=int, default=settings.QR_CODE_MARGIN, help='Kenar boşluğu (modül)')
+
+    def handle(self, *args, **options):
+        base_url = options['base_url'].rstrip('/')
+        if not base_url.startswith(('http://', 'https://')):
+            raise CommandError('--base-url http:// veya https:// ile başlamalı')
+
+        checkin_url = base_url + reverse('student_checkin')
+        scopes = ['g']
+        scopes += [checkin_tokens.scope_for(school_id=pk) for pk in School.objects.filter(is_active=True).values_list('pk', flat=True)]
+        scopes += [
+            checkin_tokens.scope_for(classroom_id=pk)
+            for alias in sharding.databases()
+            for pk in sharding.home_filter(Classroom.objects.using(alias), alias).filter(is_active=True).values_list('pk', flat=True)
+        ]
+        urls = [
+            f"{checkin_url}?t={item['token']}"
+            for scope in scopes
+            for item in checkin_tokens.schedule(scope)['tokens']
+        ]
+
+        start = time.perf_counter()
+        for url in urls:
+            for fmt in options['formats']:
+                qr.get_image(url, fmt, options['size'], options['margin'])
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(urls) * len(options["formats"])} QR görüntüsü hazırlandı ({elapsed:.2f} sn)'
+        ))
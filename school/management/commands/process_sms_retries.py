@@ -0,0 +1,53 @@
+"""
+SMS yeniden deneme worker'ı
+Kullanım:
+    python manage.py process_sms_retries            # tek tur
+    python manage.py process_sms_retries --loop     # sürekli çalış (always-on task)
+"""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from school import sms_retry
+from school.sms_service import sms_service
+
+
+class Command(BaseCommand):
+    help = 'Zamanı gelen başarısız SMS gönderimlerini yeniden dener'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Kuyruğu sürekli olarak işle'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=10.0,
+            help='Turlar arası bekleme süresi (saniye)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Tek turda işlenecek en fazla mesaj sayısı'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            stats = sms_retry.process_due(sms_service.netgsm, options['batch_size'])
+
+            if any(stats.values()):
+                self.stdout.write(
+                    f"Gönderildi: {stats['sent']}, yeniden planlandı: {stats['retried']}, "
+                    f"dead-letter: {stats['dead']}, ertelendi: {stats['deferred']}"
+                )
+
+            if not options['loop']:
+                break
+
+            # Birden fazla worker aynı anda uyanmasın
+            time.sleep(options['interval'] * random.uniform(0.8, 1.2))
@@ -0,0 +1,99 @@
+"""
+İstek profillerini view bazında özetler
+Kullanım:
+    python manage.py profile_summary [--hours 24] [--view attendance_toggle]
+    python manage.py profile_summary --slowest 5
+    python manage.py profile_summary --clear
+
+Veriler PROFILING_ENABLED=True iken ProfilingMiddleware tarafından toplanır.
+"""
+
+import json
+import time
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+from school.profiling import get_store
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Command(BaseCommand):
+    help = 'Toplanan istek profillerini view bazında özetler'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=float, default=24, help='Son kaç saatin verisi')
+        parser.add_argument('--view', default='', help='Sadece bu view (ör. attendance_toggle)')
+        parser.add_argument('--slowest', type=int, default=0, help='En yavaş N isteğin detayını göster')
+        parser.add_argument('--stacks', type=int, default=5, help='Yavaş istek başına gösterilecek yığın sayısı')
+        parser.add_argument('--clear', action='store_true', help='Toplanan tüm profilleri sil')
+
+    def handle(self, *args, **options):
+        store = get_store()
+
+        if options['clear']:
+            deleted = store.clear()
+            self.stdout.write(self.style.SUCCESS(f'{deleted} profil kaydı silindi'))
+            return
+
+        since = time.time() - options['hours'] * 3600
+        rows = store.fetch(since, options['view'] or None)
+        if not rows:
+            self.stdout.write('Kayıt yok. PROFILING_ENABLED=True ile sunucuyu çalıştırın.')
+            return
+
+        self._print_summary(rows)
+
+        if options['slowest']:
+            for row in store.slowest(since, options['slowest'], options['view'] or None):
+                self._print_slow_request(row, options['stacks'])
+
+    def _print_summary(self, rows):
+        by_view = {}
+        for view, wall_ms, sql_count, sql_ms, http_count, http_ms, slow in rows:
+            by_view.setdefault(view, []).append((wall_ms, sql_count, sql_ms, http_ms, slow))
+
+        header = (
+            f"{'view':<32} {'adet':>6} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} "
+            f"{'sorgu':>6} {'SQL ms':>7} {'HTTP ms':>8} {'yavaş':>6}"
+        )
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+
+        # Toplam süreye en çok katkı yapan view'lar önce
+        ordered = sorted(by_view.items(), key=lambda item: -sum(sample[0] for sample in item[1]))
+        for view, samples in ordered:
+            count = len(samples)
+            walls = [sample[0] for sample in samples]
+            self.stdout.write(
+                f"{view[:32]:<32} {count:>6} {percentile(walls, 0.5):>8.1f} "
+                f"{percentile(walls, 0.95):>8.1f} {max(walls):>8.1f} "
+                f"{sum(sample[1] for sample in samples) / count:>6.1f} "
+                f"{sum(sample[2] for sample in samples) / count:>7.1f} "
+                f"{sum(sample[3] for sample in samples) / count:>8.1f} "
+                f"{sum(sample[4] for sample in samples):>6}"
+            )
+
+    def _print_slow_request(self, row, stack_limit):
+        created_at, view, method, path, status, wall_ms, sql_count, sql_ms, http_count, http_ms, detail = row
+        detail = json.loads(detail or '{}')
+
+        self.stdout.write('')
+        self.stdout.write(self.style.WARNING(
+            f"{datetime.fromtimestamp(created_at):%Y-%m-%d %H:%M:%S} {method} {path} ({view}) -> {status}: "
+            f"{wall_ms:.0f} ms, SQL {sql_count} sorgu / {sql_ms:.0f} ms, HTTP {http_count} / {http_ms:.0f} ms"
+        ))
+
+        queries = sorted(detail.get('queries', []), key=lambda query: -query[2])
+        for alias, sql, ms in queries[:10]:
+            self.stdout.write(f"  {ms:>8.2f} ms [{alias}] {sql[:200]}")
+
+        interval = detail.get('stack_interval_ms', 5)
+        for stack, samples in detail.get('stacks', [])[:stack_limit]:
+            # Sadece son çerçeveler: zamanın nereye gittiğini gösterir
+            tail = ' <- '.join(reversed(stack.split(';')[-6:]))
+            self.stdout.write(f"  ~{samples * interval:>6.0f} ms  {tail}")
@@ -0,0 +1,30 @@
+"""
+Eski öğrenci listesi değişiklik kayıtlarını siler
+Kullanım:
+    python manage.py prune_roster_changes [--days 30]
+
+Daha eski sürümdeki istemciler delta yerine tam listeyi alır. Günde bir
+kez zamanlanmış görev olarak çalıştırılabilir.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from school import roster
+
+
+class Command(BaseCommand):
+    help = 'Eski öğrenci listesi değişiklik kayıtlarını siler'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ROSTER_CHANGE_RETENTION_DAYS,
+            help='Bu kadar günden eski kayıtlar silinir'
+        )
+
+    def handle(self, *args, **options):
+        deleted = roster.prune(timezone.now() - timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(f'{deleted} değişiklik kaydı silindi'))
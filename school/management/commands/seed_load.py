@@ -0,0 +1,137 @@
+"""
+Yük testi verisi oluştur
+Kullanım:
+    python manage.py seed_load --schools 2 --classrooms 10 --students 30 --years 1
+
+Önceki çalıştırmanın oluşturduğu "Yük Testi" okulları (ve bağlı tüm
+kayıtlar) silinip yeniden oluşturulur. Tüm eklemeler bulk_create ile yapılır.
+"""
+
+import random
+import time
+from datetime import datetime, time as dt_time, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from school.models import School, Classroom, Student, Attendance
+from school.phones import normalize_phone_number
+
+SCHOOL_PREFIX = 'Yük Testi Okulu'
+ID_PREFIX = '9'
+
+FIRST_NAMES = ['Ahmet', 'Ayşe', 'Mehmet', 'Fatma', 'Ali', 'Zeynep', 'Mustafa', 'Elif', 'Can', 'Ece']
+LAST_NAMES = ['Yılmaz', 'Kaya', 'Demir', 'Şahin', 'Çelik', 'Yıldız', 'Aydın', 'Öztürk', 'Arslan', 'Doğan']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark için toplu okul, sınıf, öğrenci ve yoklama verisi oluşturur'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--schools', type=int, default=2, help='Okul sayısı')
+        parser.add_argument('--classrooms', type=int, default=10, help='Okul başına sınıf sayısı')
+        parser.add_argument('--students', type=int, default=30, help='Sınıf başına öğrenci sayısı')
+        parser.add_argument('--years', type=float, default=1.0, help='Kaç yıllık yoklama geçmişi')
+        parser.add_argument('--siblings', type=float, default=0.1, help='Kardeşi olan öğrenci oranı')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42, help='Tekrarlanabilir veri için rastgele tohum')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        started = time.perf_counter()
+
+        with transaction.atomic():
+            deleted, _ = School.objects.filter(name__startswith=SCHOOL_PREFIX).delete()
+            if deleted:
+                self.stdout.write(f"Önceki yük testi verisi silindi ({deleted} kayıt)")
+
+            schools = School.objects.bulk_create([
+                School(name=f'{SCHOOL_PREFIX} {index + 1}', address='Ankara')
+                for index in range(options['schools'])
+            ])
+
+            classrooms = Classroom.objects.bulk_create([
+                Classroom(name=f'{grade // 4 + 1}-{"ABCD"[grade % 4]}', school=school)
+                for school in schools
+                for grade in range(options['classrooms'])
+            ], batch_size=batch_size)
+
+            students = Student.objects.bulk_create(
+                self._build_students(classrooms, options['students'], options['siblings'], rng),
+                batch_size=batch_size
+            )
+
+        self.stdout.write(
+            f"{len(schools)} okul, {len(classrooms)} sınıf, {len(students)} öğrenci oluşturuldu"
+        )
+
+        attendance_count = self._create_attendance(students, options['years'], batch_size, rng)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{attendance_count} yoklama kaydı oluşturuldu "
+            f"({time.perf_counter() - started:.1f} sn)"
+        ))
+
+    def _build_students(self, classrooms, per_classroom, sibling_ratio, rng):
+        students = []
+        counter = 0
+        for classroom in classrooms:
+            for _ in range(per_classroom):
+                counter += 1
+                # Kardeşler aynı veli telefonunu paylaşır
+                if students and rng.random() < sibling_ratio:
+                    parent_phone = rng.choice(students).parent_phone_number
+                else:
+                    parent_phone = f'+905{rng.randrange(10 ** 9):09d}'
+
+                last_name = rng.choice(LAST_NAMES)
+                students.append(Student(
+                    first_name=rng.choice(FIRST_NAMES),
+                    last_name=last_name,
+                    id_number=f'{ID_PREFIX}{counter:010d}',
+                    school_id=classroom.school_id,
+                    classroom=classroom,
+                    parent_first_name=rng.choice(FIRST_NAMES),
+                    parent_last_name=last_name,
+                    parent_phone_number=parent_phone,
+                    # bulk_create save() çağırmaz, normalize alanı elle doldurulur
+                    parent_phone_e164=normalize_phone_number(parent_phone),
+                ))
+        return students
+
+    def _create_attendance(self, students, years, batch_size, rng):
+        """Hafta içi her gün için giriş ve çıkış kaydı oluştur"""
+        today = timezone.localdate()
+        days = [
+            today - timedelta(days=offset)
+            for offset in range(1, int(years * 365) + 1)
+            if (today - timedelta(days=offset)).weekday() < 5
+        ]
+        days.reverse()
+
+        buffer = []
+        total = 0
+        for student in students:
+            for day in days:
+                entry_at = datetime.combine(day, dt_time(7, 45)) + timedelta(minutes=rng.randrange(40))
+                exit_at = datetime.combine(day, dt_time(15, 15)) + timedelta(minutes=rng.randrange(60))
+                for entry_type, moment in (('entry', entry_at), ('exit', exit_at)):
+                    buffer.append(Attendance(
+                        student=student,
+                        entry_type=entry_type,
+                        timestamp=timezone.make_aware(moment),
+                        date=day,
+                    ))
+
+            if len(buffer) >= batch_size:
+                Attendance.objects.bulk_create(buffer, batch_size=batch_size)
+                total += len(buffer)
+                buffer = []
+
+        if buffer:
+            Attendance.objects.bulk_create(buffer, batch_size=batch_size)
+            total += len(buffer)
+
+        return total
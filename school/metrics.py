@@ -0,0 +1,319 @@
+"""
+SMS hattı metrikleri
+Sayaçlar ve gecikme histogramları, worker süreçleri arasında paylaşılan
+ayrı bir SQLite dosyasında toplanır; /metrics endpoint'i hepsini tek
+seferde Prometheus metin formatında döndürür (METRICS_TOKEN ile ya da
+personel girişiyle).
+
+İstek sırasında sadece süreç içi tampon güncellenir; SQLite dosyasına arka
+plan thread'i METRICS_FLUSH_INTERVAL saniyede bir tek transaction'la yazar.
+Böylece yoklama/SMS akışı metrik dosyasının yazma kilidini beklemez.
+
+Histogram bucket'ları süreç ömrü boyunca kümülatiftir (Prometheus sayacı).
+Yüzdelik tahminleri ise METRICS_QUANTILE_WINDOW saniyelik aralıklara
+ayrılmış ayrı bir tablodan, şimdiki ve önceki aralığa göre hesaplanır;
+böylece p95 günler önceki gecikmelerle sulanmaz. Eski aralıklar yazım
+sırasında silinir.
+"""
+
+import atexit
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Sağlayıcı gecikmesi için histogram sınırları (saniye)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+
+METRIC_HELP = {
+    'sms_sent_total': ('counter', 'Başarıyla gönderilen SMS sayısı'),
+    'sms_failed_total': ('counter', 'NETGSM hata koduna göre başarısız SMS sayısı'),
+    'sms_skipped_total': ('counter', 'Gönderilmeden atlanan SMS sayısı'),
+    'sms_provider_latency_seconds': ('histogram', 'NETGSM API istek süresi'),
+    'sms_retry_total': ('counter', 'Yeniden deneme kuyruğu olayları'),
+    'sms_provider_failover_total': ('counter', 'Hesap hatası nedeniyle başka hesaba aktarılan gönderimler'),
+}
+
+
+class MetricsStore:
+    """Süreçler arası paylaşılan SQLite metrik deposu"""
+
+    def __init__(self, path=None, window_seconds=None):
+        self.path = str(path or settings.METRICS_DB_PATH)
+        self.window_seconds = window_seconds or settings.METRICS_QUANTILE_WINDOW
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS metric ('
+                ' name TEXT NOT NULL,'
+                ' labels TEXT NOT NULL,'
+                ' value REAL NOT NULL DEFAULT 0,'
+                ' PRIMARY KEY (name, labels))'
+            )
+            # Yüzdelik tahmini için aralık başına bucket sayıları
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS metric_window ('
+                ' window INTEGER NOT NULL,'
+                ' name TEXT NOT NULL,'
+                ' labels TEXT NOT NULL,'
+                ' value REAL NOT NULL DEFAULT 0,'
+                ' PRIMARY KEY (window, name, labels))'
+            )
+            self._local.conn = conn
+        return conn
+
+    def _window(self, now=None):
+        return int((time.time() if now is None else now) // self.window_seconds)
+
+    def add(self, rows, now=None):
+        """(name, labels, amount) satırlarını tek transaction'da ekle"""
+        window = self._window(now)
+        buckets = [(window, name, labels, amount) for name, labels, amount in rows if name.endswith('_bucket')]
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(
+                'INSERT INTO metric (name, labels, value) VALUES (?, ?, ?) '
+                'ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value',
+                rows
+            )
+            if buckets:
+                conn.executemany(
+                    'INSERT INTO metric_window (window, name, labels, value) VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT (window, name, labels) DO UPDATE SET value = value + excluded.value',
+                    buckets
+                )
+                conn.execute('DELETE FROM metric_window WHERE window < ?', (window - 1,))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def collect(self):
+        """Tüm metrikleri (name, labels, value) olarak döndür"""
+        return self._connection().execute(
+            'SELECT name, labels, value FROM metric ORDER BY name, labels'
+        ).fetchall()
+
+    def collect_window(self, now=None):
+        """Şimdiki ve önceki aralıktaki bucket sayıları (name, labels, value)"""
+        return self._connection().execute(
+            'SELECT name, labels, SUM(value) FROM metric_window WHERE window >= ? '
+            'GROUP BY name, labels ORDER BY name, labels',
+            (self._window(now) - 1,)
+        ).fetchall()
+
+
+class MetricsBuffer:
+    """Süreç içi metrik tamponu; arka plan thread'i periyodik olarak depoya yazar"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        atexit.register(self.flush)
+
+    def add(self, rows):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Fork sonrası ebeveynin tamponu ve thread'i devralınmaz
+                self._pending = Counter()
+                self._thread = None
+                self._pid = os.getpid()
+            for name, labels, amount in rows:
+                self._pending[(name, labels)] += amount
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='metrics-flush', daemon=True)
+                self._thread.start()
+
+    def flush(self):
+        """Biriken güncellemeleri depoya yaz; yazılamazsa sonraki denemeye bırak"""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return
+        try:
+            get_store().add([(name, labels, amount) for (name, labels), amount in pending.items()])
+        except Exception as e:
+            logger.warning("Metrikler yazılamadı: %s", e)
+            with self._lock:
+                self._pending.update(pending)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+
+_store = None
+_buffer = None
+
+
+def get_store():
+    """Metrik deposunu ilk kullanımda oluştur"""
+    global _store
+    if _store is None:
+        _store = MetricsStore()
+    return _store
+
+
+def get_buffer():
+    """Süreç içi tamponu ilk kullanımda oluştur"""
+    global _buffer
+    if _buffer is None:
+        _buffer = MetricsBuffer(settings.METRICS_FLUSH_INTERVAL)
+    return _buffer
+
+
+def _escape_label(value):
+    """Prometheus etiket değeri kaçışı (ters bölü, tırnak, satır sonu)"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels):
+    """Etiket sözlüğünü Prometheus formatına çevir"""
+    if not labels:
+        return ''
+    parts = [f'{key}="{_escape_label(value)}"' for key, value in sorted(labels.items())]
+    return '{' + ','.join(parts) + '}'
+
+
+_LABEL_RE = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)",?')
+_LABEL_ESCAPE_RE = re.compile(r'\\(.)')
+
+
+def _parse_labels(labels):
+    """_format_labels çıktısını sözlüğe geri çevir (değerlerdeki virgül ve kaçışlarla)"""
+    return {
+        match.group(1): _LABEL_ESCAPE_RE.sub(lambda m: '\n' if m.group(1) == 'n' else m.group(1), match.group(2))
+        for match in _LABEL_RE.finditer(labels)
+    }
+
+
+def _record(rows):
+    """Metrik yazımı hiçbir zaman SMS akışını bozmamalı (sadece tampona eklenir)"""
+    if not getattr(settings, 'METRICS_ENABLED', True):
+        return
+    try:
+        get_buffer().add(rows)
+    except Exception as e:
+        logger.warning("Metrik kaydedilemedi: %s", e)
+
+
+def inc(name, amount=1, **labels):
+    """Sayacı artır"""
+    _record([(name, _format_labels(labels), amount)])
+
+
+def observe(name, value, **labels):
+    """Histograma bir ölçüm ekle"""
+    # Boş bucket'lar da yazılır; yüzdelik interpolasyonu alt sınırı bilsin
+    rows = [
+        (f'{name}_bucket', _format_labels({**labels, 'le': bound}), int(value <= bound))
+        for bound in LATENCY_BUCKETS
+    ]
+    rows.append((f'{name}_bucket', _format_labels({**labels, 'le': '+Inf'}), 1))
+    rows.append((f'{name}_sum', _format_labels(labels), value))
+    rows.append((f'{name}_count', _format_labels(labels), 1))
+    _record(rows)
+
+
+@contextmanager
+def timer(name, **labels):
+    """Blok süresini histograma kaydet"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start, **labels)
+
+
+def _quantile(buckets, q):
+    """Kümülatif bucket sayılarından yüzdelik değeri tahmin et"""
+    total = buckets[-1][1]
+    if not total:
+        return None
+
+    rank = q * total
+    previous_bound, previous_count = 0.0, 0
+    for bound, count in buckets:
+        if count >= rank:
+            if bound == float('inf'):
+                return previous_bound
+            # Bucket içinde doğrusal interpolasyon
+            span = count - previous_count
+            fraction = (rank - previous_count) / span if span else 0
+            return previous_bound + (bound - previous_bound) * fraction
+        previous_bound, previous_count = bound, count
+    return previous_bound
+
+
+def render():
+    """Tüm metrikleri Prometheus metin formatında döndür"""
+    # Bu sürecin bekleyen güncellemeleri de görünsün
+    if _buffer is not None:
+        _buffer.flush()
+    store = get_store()
+    lines = []
+    seen = set()
+
+    for name, labels, value in store.collect():
+        base = name
+        for suffix in ('_bucket', '_sum', '_count'):
+            if name.endswith(suffix) and name[:-len(suffix)] in METRIC_HELP:
+                base = name[:-len(suffix)]
+
+        if base not in seen and base in METRIC_HELP:
+            kind, help_text = METRIC_HELP[base]
+            lines.append(f'# HELP {base} {help_text}')
+            lines.append(f'# TYPE {base} {kind}')
+            seen.add(base)
+
+        number = int(value) if float(value).is_integer() else value
+        lines.append(f'{name}{labels} {number}')
+
+    # Son aralıklardaki bucket'lardan p50/p95/p99 tahmini
+    histograms = {}
+    for name, labels, value in store.collect_window():
+        base = name[:-len('_bucket')]
+        if base not in METRIC_HELP:
+            continue
+        parsed = _parse_labels(labels)
+        bound = parsed.pop('le', '+Inf')
+        bound = float('inf') if bound == '+Inf' else float(bound)
+        histograms.setdefault((base, tuple(sorted(parsed.items()))), []).append((bound, value))
+
+    for (base, label_items), buckets in sorted(histograms.items()):
+        quantile_name = base.replace('_seconds', '') + '_quantile_seconds'
+        if quantile_name not in seen:
+            lines.append(
+                f'# HELP {quantile_name} Son {store.window_seconds}-{2 * store.window_seconds} '
+                f'saniyedeki bucket\'lardan tahmini yüzdelik değer'
+            )
+            lines.append(f'# TYPE {quantile_name} gauge')
+            seen.add(quantile_name)
+
+        buckets.sort()
+        for q in (0.5, 0.95, 0.99):
+            estimate = _quantile(buckets, q)
+            if estimate is None:
+                continue
+            labels = _format_labels({**dict(label_items), 'quantile': q})
+            lines.append(f'{quantile_name}{labels} {estimate:.4f}')
+
+    return '\n'.join(lines) + '\n'
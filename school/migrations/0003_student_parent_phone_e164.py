@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+from school.phones import normalize_phone_number
+
+
+def fill_parent_phone_e164(apps, schema_editor):
+    Student = apps.get_model('school', 'Student')
+    # Okul veritabanları da migrate edilir (school/sharding.py); her biri kendi kayıtlarını günceller
+    db_alias = schema_editor.connection.alias
+    students = list(Student.objects.using(db_alias).only('id', 'parent_phone_number'))
+    for student in students:
+        student.parent_phone_e164 = normalize_phone_number(student.parent_phone_number)
+    Student.objects.using(db_alias).bulk_update(students, ['parent_phone_e164'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('school', '0002_attendance'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='parent_phone_e164',
+            field=models.CharField(blank=True, editable=False, max_length=13, verbose_name='Veli Telefon (E.164)'),
+        ),
+        migrations.RunPython(fill_parent_phone_e164, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['parent_phone_e164', 'is_active'], name='student_parent_phone_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-19 11:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('school', '0003_student_parent_phone_e164'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SMSDeadLetter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone_number', models.CharField(max_length=17, verbose_name='Telefon Numarası')),
+                ('message', models.TextField(verbose_name='Mesaj')),
+                ('attempts', models.PositiveIntegerField(verbose_name='Deneme Sayısı')),
+                ('last_error_code', models.CharField(blank=True, max_length=20, verbose_name='Son Hata Kodu')),
+                ('last_error', models.TextField(blank=True, verbose_name='Son Hata')),
+                ('first_failed_at', models.DateTimeField(verbose_name='İlk Hata Tarihi')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')),
+                ('replayed_at', models.DateTimeField(blank=True, null=True, verbose_name='Yeniden Gönderim Tarihi')),
+                ('student', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sms_dead_letters', to='school.student', verbose_name='Öğrenci')),
+            ],
+            options={
+                'verbose_name': 'Gönderilemeyen SMS',
+                'verbose_name_plural': "Gönderilemeyen SMS'ler",
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SMSRetry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phone_number', models.CharField(max_length=17, verbose_name='Telefon Numarası')),
+                ('message', models.TextField(verbose_name='Mesaj')),
+                ('attempts', models.PositiveIntegerField(default=1, verbose_name='Deneme Sayısı')),
+                ('last_error_code', models.CharField(blank=True, max_length=20, verbose_name='Son Hata Kodu')),
+                ('last_error', models.TextField(blank=True, verbose_name='Son Hata')),
+                ('next_attempt_at', models.DateTimeField(verbose_name='Sonraki Deneme')),
+                ('claim_token', models.CharField(blank=True, max_length=32, verbose_name='Kiralama Anahtarı')),
+                ('locked_until', models.DateTimeField(blank=True, null=True, verbose_name='Kilit Bitişi')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Güncellenme Tarihi')),
+                ('student', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sms_retries', to='school.student', verbose_name='Öğrenci')),
+            ],
+            options={
+                'verbose_name': 'SMS Yeniden Deneme',
+                'verbose_name_plural': 'SMS Yeniden Deneme Kuyruğu',
+                'ordering': ['next_attempt_at'],
+                'indexes': [models.Index(fields=['next_attempt_at'], name='smsretry_next_attempt_idx'), models.Index(fields=['claim_token'], name='smsretry_claim_token_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# PostgreSQL'e özel indeksler; diğer veritabanlarında hiçbir şey yapmaz.
+
+from django.db import migrations
+
+
+def create_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    # Zaman sıralı eklenen yoklama tablosunda çok küçük bir aralık indeksi
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS attendance_timestamp_brin '
+        'ON school_attendance USING brin (timestamp)'
+    )
+
+
+def drop_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS attendance_timestamp_brin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('school', '0005_attendance_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_brin_index, drop_brin_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('school', '0007_attendance_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendance',
+            name='client_id',
+            field=models.CharField(blank=True, editable=False, max_length=36, null=True, unique=True, verbose_name='İstemci Kayıt Kimliği'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('school', '0008_attendance_client_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RosterChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('id_number', models.CharField(max_length=11, verbose_name='TC Kimlik No')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Oluşturulma Tarihi')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='roster_changes', to='school.school', verbose_name='Okul')),
+            ],
+            options={
+                'verbose_name': 'Öğrenci Listesi Değişikliği',
+                'verbose_name_plural': 'Öğrenci Listesi Değişiklikleri',
+                'indexes': [models.Index(fields=['school', 'id'], name='rosterchange_school_id_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_directory(apps, schema_editor):
+    # Mevcut tüm öğrenciler ana veritabanında; okul veritabanlarında tablo boştur
+    Student = apps.get_model('school', 'Student')
+    StudentDirectory = apps.get_model('school', 'StudentDirectory')
+    alias = schema_editor.connection.alias
+    StudentDirectory.objects.using(alias).bulk_create(
+        [
+            StudentDirectory(id_number=id_number, school_id=school_id)
+            for id_number, school_id in Student.objects.using(alias).values_list('id_number', 'school_id')
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('school', '0009_roster_change'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='classroom',
+            name='created_by',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_classrooms', to=settings.AUTH_USER_MODEL, verbose_name='Oluşturan Kullanıcı'),
+        ),
+        migrations.AlterField(
+            model_name='school',
+            name='created_by',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_schools', to=settings.AUTH_USER_MODEL, verbose_name='Oluşturan Kullanıcı'),
+        ),
+        migrations.AlterField(
+            model_name='student',
+            name='created_by',
+            field=models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_students', to=settings.AUTH_USER_MODEL, verbose_name='Oluşturan Kullanıcı'),
+        ),
+        migrations.CreateModel(
+            name='StudentDirectory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('id_number', models.CharField(max_length=11, unique=True, verbose_name='TC Kimlik No')),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='directory_entries', to='school.school', verbose_name='Okul')),
+            ],
+            options={
+                'verbose_name': 'Öğrenci Dizini',
+                'verbose_name_plural': 'Öğrenci Dizini',
+            },
+        ),
+        migrations.RunPython(fill_directory, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 12:34
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('school', '0010_student_directory'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='student',
+            name='student_active_id_number_idx',
+        ),
+    ]
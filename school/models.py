@@ -1,8 +1,14 @@
-from django.db import models
+from datetime import timedelta
+
+from django.db import DEFAULT_DB_ALIAS, connections, models, router, transaction
+from django.db.models import OuterRef, Subquery
 from django.contrib.auth.models import User
 from django.core.validators import RegexValidator
 from django.utils import timezone
 
+from .db import serialized_write
+from .phones import normalize_phone_number
+
 
 class School(models.Model):
     """Okul modeli"""
@@ -14,6 +20,7 @@ class School(models.Model):
         on_delete=models.SET_NULL, 
         null=True, 
         blank=True,
+        db_constraint=False,  # Kullanıcılar ana veritabanında, kayıt okulun veritabanında olabilir
         related_name='created_schools',
         verbose_name="Oluşturan Kullanıcı"
     )
@@ -29,6 +36,42 @@ class School(models.Model):
         return self.name
 
 
+class SchoolDataQuerySet(models.QuerySet):
+    """Okulun veritabanında tutulan modellerin sorguları (school/sharding.py)"""
+    
+    def create(self, **kwargs):
+        if self._db is None:
+            # using() verilmediyse kayıt router'ın seçtiği veritabanına (okulun veritabanı)
+            return self.using(router.db_for_write(self.model, instance=self.model(**kwargs))).create(**kwargs)
+        return super().create(**kwargs)
+
+
+def record_roster_changes(pairs):
+    """(okul id, TC) çiftleri için kiosk listesi değişiklik kaydı düş (school/roster.py)"""
+    RosterChange.objects.bulk_create([
+        RosterChange(school_id=school_id, id_number=id_number)
+        for school_id, id_number in set(pairs) if school_id
+    ])
+
+
+class ClassroomQuerySet(SchoolDataQuerySet):
+    """Sınıf sorguları"""
+    
+    def update(self, **kwargs):
+        # Sınıf adı kiosk listesinde görünür; toplu yeniden adlandırma sinyal göndermediği
+        # için sınıftaki öğrencilerin değişikliği burada kaydedilir
+        if 'name' not in kwargs:
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            pairs = list(
+                Student.objects.using(self.db).filter(classroom__in=self.values('pk'))
+                .values_list('school_id', 'id_number')
+            )
+            rows = super().update(**kwargs)
+        record_roster_changes(pairs)
+        return rows
+
+
 class Classroom(models.Model):
     """Sınıf modeli"""
     name = models.CharField(max_length=100, verbose_name="Sınıf Adı")
@@ -44,12 +87,15 @@ class Classroom(models.Model):
         on_delete=models.SET_NULL, 
         null=True, 
         blank=True,
+        db_constraint=False,  # Kullanıcılar ana veritabanında, kayıt okulun veritabanında olabilir
         related_name='created_classrooms',
         verbose_name="Oluşturan Kullanıcı"
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma Tarihi")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Güncellenme Tarihi")
     
+    objects = ClassroomQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Sınıf"
         verbose_name_plural = "Sınıflar"
@@ -60,6 +106,43 @@ class Classroom(models.Model):
         return f"{self.school.name} - {self.name}"
 
 
+# Kiosk öğrenci listesinde görünen ya da listeyi etkileyen alanlar
+ROSTER_FIELDS = frozenset({'id_number', 'first_name', 'last_name', 'school_id', 'classroom_id', 'is_active'})
+ROSTER_UPDATE_FIELDS = ROSTER_FIELDS | {'school', 'classroom'}
+
+
+class StudentQuerySet(SchoolDataQuerySet):
+    """Öğrenci sorguları"""
+    
+    def update(self, **kwargs):
+        """
+        Toplu güncelleme post_save göndermez; kiosk listesini etkileyen alanlar
+        değişiyorsa güncellemeden önceki ve sonraki (okul, TC) çiftleri
+        değişiklik kaydına düşülür (silme işlemleri post_delete ile kaydedilir)
+        """
+        if ROSTER_UPDATE_FIELDS.isdisjoint(kwargs):
+            return super().update(**kwargs)
+        with transaction.atomic(using=self.db):
+            before = list(self.values_list('pk', 'school_id', 'id_number'))
+            rows = super().update(**kwargs)
+            after = self.model.objects.using(self.db).filter(pk__in=[pk for pk, _, _ in before])
+            pairs = [(school_id, id_number) for _, school_id, id_number in before]
+            pairs += after.values_list('school_id', 'id_number')
+        record_roster_changes(pairs)
+        return rows
+    
+    def for_parent_phone(self, phone_number):
+        """Aynı veli telefonuna kayıtlı aktif öğrenciler (kardeşler) - tek indeksli sorgu"""
+        normalized = normalize_phone_number(phone_number)
+        if not normalized:
+            return self.none()
+        
+        return self.filter(
+            parent_phone_e164=normalized,
+            is_active=True
+        ).select_related('school', 'classroom')
+
+
 class Student(models.Model):
     """Öğrenci modeli"""
     # Telefon numarası için validator
@@ -112,6 +195,12 @@ class Student(models.Model):
         validators=[phone_regex],
         verbose_name="Veli Telefon Numarası"
     )
+    parent_phone_e164 = models.CharField(
+        max_length=13,
+        blank=True,
+        editable=False,
+        verbose_name="Veli Telefon (E.164)"
+    )
     
     # Sistem alanları
     is_active = models.BooleanField(default=True, verbose_name="Aktif mi?")
@@ -120,21 +209,38 @@ class Student(models.Model):
         on_delete=models.SET_NULL, 
         null=True, 
         blank=True,
+        db_constraint=False,  # Kullanıcılar ana veritabanında, kayıt okulun veritabanında olabilir
         related_name='created_students',
         verbose_name="Oluşturan Kullanıcı"
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma Tarihi")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Güncellenme Tarihi")
     
+    objects = StudentQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Öğrenci"
         verbose_name_plural = "Öğrenciler"
         ordering = ['school', 'classroom', 'last_name', 'first_name']
         unique_together = ['school', 'classroom', 'id_number']  # Aynı sınıfta aynı TC'li öğrenci olamaz
+        indexes = [
+            # Kardeş sorguları: veli telefonu + aktiflik
+            models.Index(fields=['parent_phone_e164', 'is_active'], name='student_parent_phone_idx'),
+            # TC aramaları id_number'ın unique indeksini kullanır; ayrıca indeks gerekmez
+        ]
     
     def __str__(self):
         return f"{self.first_name} {self.last_name} - {self.classroom}"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Kiosk listesini etkileyen alanların yüklendiği andaki değerleri (school/roster.py)
+        if ROSTER_FIELDS.issubset(field_names):
+            loaded = dict(zip(field_names, values))
+            instance._roster_state = tuple(loaded[name] for name in sorted(ROSTER_FIELDS))
+        return instance
+    
     @property
     def full_name(self):
         """Öğrencinin tam adı"""
@@ -145,6 +251,11 @@ class Student(models.Model):
         """Velinin tam adı"""
         return f"{self.parent_first_name} {self.parent_last_name}"
     
+    @property
+    def siblings(self):
+        """Aynı veli telefonuna kayıtlı diğer aktif öğrenciler (aynı veritabanındakiler)"""
+        return Student.objects.db_manager(self._state.db).for_parent_phone(self.parent_phone_e164).exclude(pk=self.pk)
+    
     def clean(self):
         """Model validasyonu"""
         from django.core.exceptions import ValidationError
@@ -157,6 +268,12 @@ class Student(models.Model):
     def save(self, *args, **kwargs):
         """Kaydetmeden önce validasyonu çalıştır"""
         self.clean()
+        self.parent_phone_e164 = normalize_phone_number(self.parent_phone_number)
+        
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'parent_phone_number' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'parent_phone_e164'}
+        
         super().save(*args, **kwargs)
 
 
@@ -178,19 +295,37 @@ class Attendance(models.Model):
         choices=ENTRY_TYPE_CHOICES,
         verbose_name="Giriş Tipi"
     )
+    # auto_now_add yerine varsayılan değer: toplu veri yüklemede geçmiş zaman verilebilir
     timestamp = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
         verbose_name="Zaman"
     )
     date = models.DateField(
-        auto_now_add=True,
+        default=timezone.localdate,
+        editable=False,
         verbose_name="Tarih"
     )
+    # Çevrimdışı okutmalarda istemcinin ürettiği kimlik; aynı okutma iki kez işlenmez
+    client_id = models.CharField(
+        max_length=36,
+        null=True,
+        blank=True,
+        unique=True,
+        editable=False,
+        verbose_name="İstemci Kayıt Kimliği"
+    )
+    
+    objects = SchoolDataQuerySet.as_manager()
     
     class Meta:
         verbose_name = "Yoklama"
         verbose_name_plural = "Yoklamalar"
         ordering = ['-timestamp']
+        indexes = [
+            # Öğrencinin son kaydı: (student_id, timestamp DESC)
+            models.Index(fields=['student', '-timestamp'], name='attendance_student_ts_idx'),
+        ]
         
     def __str__(self):
         return f"{self.student.full_name} - {self.get_entry_type_display()} - {self.timestamp.strftime('%d.%m.%Y %H:%M')}"
@@ -198,25 +333,216 @@ class Attendance(models.Model):
     @classmethod
     def get_last_entry(cls, student):
         """Öğrencinin son giriş/çıkış kaydını getir"""
-        return cls.objects.filter(student=student).first()
+        return cls.objects.using(student._state.db).filter(student=student).first()
     
     @classmethod
     def toggle_attendance(cls, student):
         """Öğrencinin durumunu toggle et (giriş <-> çıkış)"""
-        last_entry = cls.get_last_entry(student)
+        # Son kaydı okuma ve yeni kaydı yazma tek sıralı transaction'da
+        # (öğrencinin okulunun veritabanında)
+        using = student._state.db
+        with serialized_write(using):
+            if connections[using].features.has_select_for_update:
+                # PostgreSQL: aynı öğrenci için eşzamanlı toggle'ları sırala
+                Student.objects.using(using).select_for_update().filter(pk=student.pk).exists()
+            
+            last_entry = cls.get_last_entry(student)
+            
+            # Eğer bugün hiç kayıt yoksa veya son kayıt çıkış ise -> giriş yap
+            today = timezone.now().date()
+            if not last_entry or last_entry.date != today or last_entry.entry_type == 'exit':
+                new_entry_type = 'entry'
+            else:
+                # Son kayıt bugünden ve giriş ise -> çıkış yap
+                new_entry_type = 'exit'
+            
+            # Yeni kayıt oluştur
+            attendance = cls.objects.using(using).create(
+                student=student,
+                entry_type=new_entry_type
+            )
+        
+        return attendance
+    
+    @classmethod
+    def apply_scans(cls, scans):
+        """
+        Çevrimdışı biriken okutmaları zaman sırasıyla tek transaction'da uygula
         
-        # Eğer bugün hiç kayıt yoksa veya son kayıt çıkış ise -> giriş yap
-        today = timezone.now().date()
-        if not last_entry or last_entry.date != today or last_entry.entry_type == 'exit':
-            new_entry_type = 'entry'
-        else:
-            # Son kayıt bugünden ve giriş ise -> çıkış yap
-            new_entry_type = 'exit'
+        Daha önce işlenmiş client_id'ler atlanır (yanıtı alınamayan partinin
+        tekrar gönderilmesi). Son kayıttan eski görünen okutmalar, giriş/çıkış
+        sırası bozulmasın diye son kaydın hemen sonrasına alınır.
         
-        # Yeni kayıt oluştur
-        attendance = cls.objects.create(
-            student=student,
-            entry_type=new_entry_type
-        )
+        Args:
+            scans: (client_id, student, timestamp) listesi; öğrenciler aynı
+                veritabanında olmalıdır (school/sharding.py)
+            
+        Returns:
+            dict: client_id -> yeni Attendance (atlananlar dahil değil)
+        """
+        student_ids = {student.pk for _, student, _ in scans}
+        using = scans[0][1]._state.db if scans else DEFAULT_DB_ALIAS
+        created = []
         
-        return attendance
+        with serialized_write(using), transaction.atomic(using=using):
+            if connections[using].features.has_select_for_update:
+                list(Student.objects.using(using).select_for_update().filter(pk__in=student_ids).values_list('pk', flat=True))
+            
+            done = set(
+                cls.objects.using(using).filter(client_id__in=[client_id for client_id, _, _ in scans])
+                .values_list('client_id', flat=True)
+            )
+            
+            # Her öğrencinin son kaydı: iki sorgu, öğrenci sayısından bağımsız
+            last_ids = Student.objects.using(using).filter(pk__in=student_ids).annotate(
+                last_id=Subquery(cls.objects.filter(student=OuterRef('pk')).order_by('-timestamp').values('pk')[:1])
+            ).values_list('last_id', flat=True)
+            last = {
+                attendance.student_id: attendance
+                for attendance in cls.objects.using(using).filter(pk__in=[pk for pk in last_ids if pk])
+            }
+            
+            for client_id, student, timestamp in sorted(scans, key=lambda scan: scan[2]):
+                if client_id in done:
+                    continue
+                done.add(client_id)
+                
+                previous = last.get(student.pk)
+                if previous and timestamp <= previous.timestamp:
+                    timestamp = previous.timestamp + timedelta(microseconds=1)
+                date = timezone.localdate(timestamp)
+                
+                if not previous or previous.date != date or previous.entry_type == 'exit':
+                    entry_type = 'entry'
+                else:
+                    entry_type = 'exit'
+                
+                attendance = cls(
+                    student=student,
+                    entry_type=entry_type,
+                    timestamp=timestamp,
+                    date=date,
+                    client_id=client_id
+                )
+                last[student.pk] = attendance
+                created.append(attendance)
+            
+            cls.objects.using(using).bulk_create(created)
+        
+        return {attendance.client_id: attendance for attendance in created}
+
+
+
+class RosterChange(models.Model):
+    """
+    Okul öğrenci listesindeki değişiklik kaydı
+    
+    Kayıt kimliği (pk) listenin sürüm numarasıdır; istemci son bildiği
+    sürümden sonraki değişiklikleri ister (school/roster.py).
+    """
+    school = models.ForeignKey(
+        School,
+        on_delete=models.CASCADE,
+        related_name='roster_changes',
+        verbose_name="Okul"
+    )
+    id_number = models.CharField(max_length=11, verbose_name="TC Kimlik No")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma Tarihi")
+    
+    class Meta:
+        verbose_name = "Öğrenci Listesi Değişikliği"
+        verbose_name_plural = "Öğrenci Listesi Değişiklikleri"
+        indexes = [
+            models.Index(fields=['school', 'id'], name='rosterchange_school_id_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.school_id} - {self.id_number} (#{self.pk})"
+
+
+class StudentDirectory(models.Model):
+    """
+    TC -> okul eşlemesi (her zaman ana veritabanında)
+
+    Okulu ayrı veritabanına taşınmış öğrenciyi TC numarasından bulmak için
+    kullanılır (school/sharding.py); öğrenci kaydedildikçe güncellenir.
+    """
+    id_number = models.CharField(max_length=11, unique=True, verbose_name="TC Kimlik No")
+    school = models.ForeignKey(
+        School,
+        on_delete=models.CASCADE,
+        related_name='directory_entries',
+        verbose_name="Okul"
+    )
+
+    class Meta:
+        verbose_name = "Öğrenci Dizini"
+        verbose_name_plural = "Öğrenci Dizini"
+
+    def __str__(self):
+        return f"{self.id_number} -> {self.school_id}"
+
+
+class SMSRetry(models.Model):
+    """Başarısız SMS yeniden deneme kuyruğu"""
+    phone_number = models.CharField(max_length=17, verbose_name="Telefon Numarası")
+    message = models.TextField(verbose_name="Mesaj")
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='sms_retries',
+        verbose_name="Öğrenci"
+    )
+    attempts = models.PositiveIntegerField(default=1, verbose_name="Deneme Sayısı")
+    last_error_code = models.CharField(max_length=20, blank=True, verbose_name="Son Hata Kodu")
+    last_error = models.TextField(blank=True, verbose_name="Son Hata")
+    next_attempt_at = models.DateTimeField(verbose_name="Sonraki Deneme")
+    
+    # Worker'ların aynı kaydı iki kez göndermemesi için kiralama alanları
+    claim_token = models.CharField(max_length=32, blank=True, verbose_name="Kiralama Anahtarı")
+    locked_until = models.DateTimeField(null=True, blank=True, verbose_name="Kilit Bitişi")
+    
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma Tarihi")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Güncellenme Tarihi")
+    
+    class Meta:
+        verbose_name = "SMS Yeniden Deneme"
+        verbose_name_plural = "SMS Yeniden Deneme Kuyruğu"
+        ordering = ['next_attempt_at']
+        indexes = [
+            models.Index(fields=['next_attempt_at'], name='smsretry_next_attempt_idx'),
+            models.Index(fields=['claim_token'], name='smsretry_claim_token_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.phone_number} - {self.attempts}. deneme - {self.next_attempt_at.strftime('%d.%m.%Y %H:%M')}"
+
+
+class SMSDeadLetter(models.Model):
+    """Tüm denemeleri tükenmiş SMS kayıtları"""
+    phone_number = models.CharField(max_length=17, verbose_name="Telefon Numarası")
+    message = models.TextField(verbose_name="Mesaj")
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='sms_dead_letters',
+        verbose_name="Öğrenci"
+    )
+    attempts = models.PositiveIntegerField(verbose_name="Deneme Sayısı")
+    last_error_code = models.CharField(max_length=20, blank=True, verbose_name="Son Hata Kodu")
+    last_error = models.TextField(blank=True, verbose_name="Son Hata")
+    first_failed_at = models.DateTimeField(verbose_name="İlk Hata Tarihi")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Oluşturulma Tarihi")
+    replayed_at = models.DateTimeField(null=True, blank=True, verbose_name="Yeniden Gönderim Tarihi")
+    
+    class Meta:
+        verbose_name = "Gönderilemeyen SMS"
+        verbose_name_plural = "Gönderilemeyen SMS'ler"
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.phone_number} - {self.last_error_code or 'hata'} - {self.created_at.strftime('%d.%m.%Y %H:%M')}"
@@ -0,0 +1,156 @@
+"""
+İstekten bağımsız sayfalar için tam sayfa önbelleği
+QR paneli ve öğrenci giriş sayfası her istekte aynı HTML'i üretir. İlk
+render sonucu sürümlü bir anahtarla paylaşılan cache'e ve süreç belleğine
+yazılır; sonraki istekler PageCacheMiddleware tarafından session, CSRF,
+auth ve mesaj middleware'lerine hiç girmeden bellekten yanıtlanır.
+
+Anahtar sürümü şablon ve statik manifest dosyalarının değişiklik
+zamanlarından türetilir; deploy sonrası yeniden başlayan worker'lar
+otomatik olarak yeni anahtarları kullanır (PAGE_CACHE_VERSION ile de
+sabitlenebilir).
+"""
+
+import hashlib
+import time
+from functools import wraps
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+
+_version = None
+
+# Bu süreçte önbelleğe alınmış sayfa yolları ve bellek kopyaları
+_paths = set()
+_memory = {}
+
+
+def cache_version():
+    """Deploy'a göre değişen anahtar sürümü (süreç başına bir kez hesaplanır)"""
+    global _version
+    if _version is None:
+        _version = getattr(settings, 'PAGE_CACHE_VERSION', '') or _files_fingerprint()
+    return _version
+
+
+def _files_fingerprint():
+    digest = hashlib.sha1()
+    roots = [Path(directory) for template in settings.TEMPLATES for directory in template.get('DIRS', [])]
+    files = [
+        path for root in roots if root.is_dir()
+        for pattern in ('*.html', '*.js') for path in root.rglob(pattern)
+    ]
+    files.append(Path(settings.STATIC_ROOT) / 'staticfiles.json')
+    for path in sorted(files):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        digest.update(f'{path}:{stat.st_mtime_ns}:{stat.st_size}'.encode())
+    return digest.hexdigest()[:12]
+
+
+def _key(path):
+    return f'page:{cache_version()}:{path}'
+
+
+def get_page(path):
+    """Önce süreç belleğinden, sonra paylaşılan cache'ten sayfayı getir"""
+    key = _key(path)
+    entry = _memory.get(key)
+    if entry is not None and entry['expires'] > time.monotonic():
+        return entry
+
+    entry = cache.get(key)
+    if entry is not None:
+        entry['expires'] = time.monotonic() + settings.PAGE_CACHE_MEMORY_TIMEOUT
+        _memory[key] = entry
+        _paths.add(path)
+    return entry
+
+
+def store_page(path, response):
+    content = response.content
+    entry = {
+        'content': content,
+        'content_type': response['Content-Type'],
+        'etag': quote_etag(hashlib.sha1(content).hexdigest()[:16]),
+        'xframe_exempt': getattr(response, 'xframe_options_exempt', False),
+    }
+    cache.set(_key(path), entry, settings.PAGE_CACHE_TIMEOUT)
+    _memory[_key(path)] = {**entry, 'expires': time.monotonic() + settings.PAGE_CACHE_MEMORY_TIMEOUT}
+    _paths.add(path)
+    return entry
+
+
+def _set_headers(response, entry):
+    response['ETag'] = entry['etag']
+    patch_cache_control(response, public=True, max_age=settings.PAGE_CACHE_MAX_AGE)
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def build_response(request, entry):
+    if request.headers.get('If-None-Match') == entry['etag']:
+        return _set_headers(HttpResponseNotModified(), entry)
+    response = HttpResponse(entry['content'], content_type=entry['content_type'])
+    response['X-Page-Cache'] = 'hit'
+    # Önbellekten dönen yanıt XFrameOptionsMiddleware'e uğramaz; clickjacking
+    # koruması burada eklenir
+    if not entry.get('xframe_exempt'):
+        response['X-Frame-Options'] = getattr(settings, 'X_FRAME_OPTIONS', 'DENY').upper()
+    return _set_headers(response, entry)
+
+
+def cached_page(view):
+    """
+    İstekten bağımsız (oturum, kullanıcı, CSRF token kullanmayan) sayfalar için
+
+    İlk render sonucu önbelleğe alınır; sorgu parametreleri yok sayılır
+    (sayfa bunları yalnızca tarayıcıda JavaScript ile okur).
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not settings.PAGE_CACHE_ENABLED or request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+
+        entry = get_page(request.path)
+        if entry is not None:
+            return build_response(request, entry)
+
+        response = view(request, *args, **kwargs)
+        if response.status_code != 200 or response.streaming or response.cookies:
+            return response
+        if hasattr(response, 'render') and callable(response.render):
+            response.render()
+
+        response['X-Page-Cache'] = 'miss'
+        return _set_headers(response, store_page(request.path, response))
+    return wrapper
+
+
+class PageCacheMiddleware:
+    """
+    Önbellekteki sayfaları diğer middleware'lerden önce yanıtlar
+
+    Yalnızca bu süreçte daha önce cached_page ile işaretlenmiş yollar için
+    cache'e bakılır; diğer istekler ek maliyet olmadan devam eder.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if (
+            settings.PAGE_CACHE_ENABLED
+            and request.method in ('GET', 'HEAD')
+            and request.path in _paths
+        ):
+            entry = get_page(request.path)
+            if entry is not None:
+                return build_response(request, entry)
+        return self.get_response(request)
@@ -0,0 +1,33 @@
+"""
+Telefon numarası normalizasyonu
+Veli telefonları kayıt sırasında E.164 formatına (+905XXXXXXXXX) çevrilir,
+böylece SMS gönderiminde tekrar temizlenmeleri gerekmez.
+"""
+
+
+def normalize_phone_number(phone_number):
+    """
+    Türk cep telefonu numarasını E.164 formatına çevir
+
+    Args:
+        phone_number (str): Ham telefon numarası (0555..., +90555..., 555...)
+
+    Returns:
+        str: +905XXXXXXXXX formatında numara, geçersizse boş string
+    """
+    if not phone_number:
+        return ''
+
+    digits = ''.join(filter(str.isdigit, phone_number))
+
+    # Ülke kodu veya başındaki 0'ı kaldır
+    if len(digits) == 12 and digits.startswith('90'):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith('0'):
+        digits = digits[1:]
+
+    # Türk cep telefonu formatı: 5XXXXXXXXX (10 hane)
+    if len(digits) != 10 or not digits.startswith('5'):
+        return ''
+
+    return f'+90{digits}'
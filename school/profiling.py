@@ -0,0 +1,299 @@
+"""
+İstek profilleme
+Açıldığında (PROFILING_ENABLED) örneklenen her istek için toplam süre,
+SQL sorgu sayısı ve süresi ile dış HTTP (NETGSM) süresi ölçülür ve ayrı
+bir SQLite dosyasına yazılır. Eşik süresini (PROFILING_SLOW_MS) aşan
+isteklerde sorgu listesi ve örneklenmiş yığın (stack) profili de saklanır.
+Özet için: python manage.py profile_summary
+"""
+
+import json
+import logging
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .log_handlers import redact
+
+logger = logging.getLogger(__name__)
+
+# Yavaş istek detayında saklanacak en fazla sorgu ve yığın sayısı
+MAX_QUERIES = 200
+MAX_STACKS = 25
+MAX_STACK_DEPTH = 40
+
+_current = ContextVar('request_profile', default=None)
+
+
+class ProfileStore:
+    """Süreçler arası paylaşılan SQLite profil deposu"""
+
+    def __init__(self, path=None):
+        self.path = str(path or settings.PROFILING_DB_PATH)
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS request_profile ('
+                ' id INTEGER PRIMARY KEY,'
+                ' created_at REAL NOT NULL,'
+                ' view TEXT NOT NULL,'
+                ' method TEXT NOT NULL,'
+                ' path TEXT NOT NULL,'
+                ' status INTEGER,'
+                ' wall_ms REAL NOT NULL,'
+                ' sql_count INTEGER NOT NULL,'
+                ' sql_ms REAL NOT NULL,'
+                ' http_count INTEGER NOT NULL,'
+                ' http_ms REAL NOT NULL,'
+                ' slow INTEGER NOT NULL,'
+                ' detail TEXT)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS request_profile_created_idx ON request_profile (created_at)')
+            self._local.conn = conn
+        return conn
+
+    def add(self, row):
+        self._connection().execute(
+            'INSERT INTO request_profile (created_at, view, method, path, status, wall_ms, '
+            'sql_count, sql_ms, http_count, http_ms, slow, detail) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            row
+        )
+
+    def fetch(self, since, view=None):
+        sql = (
+            'SELECT view, wall_ms, sql_count, sql_ms, http_count, http_ms, slow '
+            'FROM request_profile WHERE created_at >= ?'
+        )
+        params = [since]
+        if view:
+            sql += ' AND view = ?'
+            params.append(view)
+        return self._connection().execute(sql, params).fetchall()
+
+    def slowest(self, since, limit, view=None):
+        sql = (
+            'SELECT created_at, view, method, path, status, wall_ms, sql_count, sql_ms, '
+            'http_count, http_ms, detail FROM request_profile '
+            'WHERE created_at >= ? AND slow = 1'
+        )
+        params = [since]
+        if view:
+            sql += ' AND view = ?'
+            params.append(view)
+        sql += ' ORDER BY wall_ms DESC LIMIT ?'
+        params.append(limit)
+        return self._connection().execute(sql, params).fetchall()
+
+    def clear(self, before=None):
+        if before is None:
+            return self._connection().execute('DELETE FROM request_profile').rowcount
+        return self._connection().execute(
+            'DELETE FROM request_profile WHERE created_at < ?', (before,)
+        ).rowcount
+
+
+_store = None
+
+
+def get_store():
+    """Profil deposunu ilk kullanımda oluştur"""
+    global _store
+    if _store is None:
+        _store = ProfileStore()
+    return _store
+
+
+class StackSampler:
+    """
+    Kayıtlı thread'lerin yığınını belirli aralıklarla örnekleyen tek thread
+
+    cProfile'dan farklı olarak duvar saati süresini ölçer; kilit, ağ ve
+    disk beklemeleri de görünür. Kayıtlı thread yokken uyur.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._threads = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def register(self, thread_id):
+        counter = Counter()
+        with self._lock:
+            self._threads[thread_id] = counter
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+        self._wakeup.set()
+        return counter
+
+    def unregister(self, thread_id):
+        with self._lock:
+            self._threads.pop(thread_id, None)
+
+    def _run(self):
+        while True:
+            # Sayaçlar kilit altında güncellenir; unregister sonrası yazım olmaz
+            with self._lock:
+                idle = not self._threads
+                if idle:
+                    self._wakeup.clear()
+                else:
+                    frames = sys._current_frames()
+                    for thread_id, counter in self._threads.items():
+                        frame = frames.get(thread_id)
+                        if frame is not None:
+                            counter[_collapse(frame)] += 1
+                    frame = frames = None
+            if idle:
+                self._wakeup.wait()
+            else:
+                time.sleep(self.interval)
+
+
+def _collapse(frame):
+    """Yığını kökten yaprağa 'dosya:fonksiyon:satır;...' biçiminde yaz"""
+    parts = []
+    while frame is not None and len(parts) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        parts.append(f'{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}')
+        frame = frame.f_back
+    return ';'.join(reversed(parts))
+
+
+_sampler = None
+
+
+def get_sampler():
+    global _sampler
+    if _sampler is None:
+        _sampler = StackSampler(settings.PROFILING_STACK_INTERVAL)
+    return _sampler
+
+
+class RequestProfile:
+    """Tek bir isteğin ölçümleri"""
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.http_count = 0
+        self.http_seconds = 0.0
+        self.queries = []
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.sql_count += 1
+            self.sql_seconds += elapsed
+            if len(self.queries) < MAX_QUERIES:
+                alias = context['connection'].alias
+                self.queries.append((alias, sql, round(elapsed * 1000, 3)))
+
+
+@contextmanager
+def outbound_http():
+    """Dış HTTP çağrısının süresini aktif istek profiline ekle"""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.http_count += 1
+        profile.http_seconds += time.perf_counter() - start
+
+
+class ProfilingMiddleware:
+    """
+    Örneklenen isteklerin süre, SQL ve dış HTTP ölçümlerini kaydeder
+
+    Diğer middleware'lerin süresi de ölçülsün diye listenin en başında
+    olmalıdır. PROFILING_ENABLED kapalıyken Django bu middleware'i hiç
+    yüklemez.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.slow_ms = settings.PROFILING_SLOW_MS
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        thread_id = threading.get_ident()
+        stacks = get_sampler().register(thread_id)
+        status = None
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile.execute_wrapper))
+                response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            wall_ms = (time.perf_counter() - start) * 1000
+            get_sampler().unregister(thread_id)
+            _current.reset(token)
+            self._save(request, profile, status, wall_ms, stacks)
+
+    def _save(self, request, profile, status, wall_ms, stacks):
+        # Adresteki TC/telefon numarası profil deposuna yazılmasın: eşleşen
+        # URL kalıbı (/student-status/<str:id_number>/), yoksa maskelenmiş adres
+        match = getattr(request, 'resolver_match', None)
+        path = f'/{match.route}' if match and match.route else redact(request.path)
+        view = match.view_name if match else path
+        slow = wall_ms >= self.slow_ms
+
+        detail = None
+        if slow:
+            detail = json.dumps({
+                'queries': profile.queries,
+                'stacks': stacks.most_common(MAX_STACKS),
+                'stack_interval_ms': settings.PROFILING_STACK_INTERVAL * 1000,
+            }, ensure_ascii=False)
+            logger.warning(
+                "Yavaş istek: %s %s %.0f ms (SQL %s sorgu / %.0f ms, HTTP %s / %.0f ms)",
+                request.method, view, wall_ms,
+                profile.sql_count, profile.sql_seconds * 1000,
+                profile.http_count, profile.http_seconds * 1000
+            )
+
+        try:
+            get_store().add((
+                time.time(), view, request.method, path, status, round(wall_ms, 3),
+                profile.sql_count, round(profile.sql_seconds * 1000, 3),
+                profile.http_count, round(profile.http_seconds * 1000, 3),
+                int(slow), detail,
+            ))
+        except Exception as e:
+            logger.warning("Profil kaydı yazılamadı: %s", e)
@@ -0,0 +1,453 @@
+"""
+Harici servise ihtiyaç duymayan QR kod üretici
+Byte modunda, ISO/IEC 18004 standardına uygun QR kodu süreç içinde
+üretir ve PNG (Pillow) veya SVG olarak çizer. Okul internetinin kesildiği
+durumlarda da öğretmen paneli QR kodunu gösterebilir.
+
+Kullanım:
+    matrix = encode('https://ornek.com/student-checkin/')
+    png = render_png(matrix, size=180, margin=1)
+    svg = render_svg(matrix, margin=1)
+
+Görüntüler URL, boyut ve kenar boşluğuna göre cache'lenir (get_image).
+"""
+
+import hashlib
+import io
+
+from django.conf import settings
+from django.core.cache import cache
+
+# Hata düzeltme seviyeleri: (tablo indeksi, format bitleri)
+ECC_LEVELS = {'L': (0, 1), 'M': (1, 0), 'Q': (2, 3), 'H': (3, 2)}
+
+# Sürüm (1-40) başına blok başına hata düzeltme kod kelimesi sayısı
+ECC_CODEWORDS_PER_BLOCK = (
+    (-1, 7, 10, 15, 20, 26, 18, 20, 24, 30, 18, 20, 24, 26, 30, 22, 24, 28, 30, 28, 28,
+     28, 28, 30, 30, 26, 28, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30),
+    (-1, 10, 16, 26, 18, 24, 16, 18, 22, 22, 26, 30, 22, 22, 24, 24, 28, 28, 26, 26, 26,
+     26, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28, 28),
+    (-1, 13, 22, 18, 26, 18, 24, 18, 22, 20, 24, 28, 26, 24, 20, 30, 24, 28, 28, 26, 30,
+     28, 30, 30, 30, 30, 28, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30),
+    (-1, 17, 28, 22, 16, 22, 28, 26, 26, 24, 28, 24, 28, 22, 24, 24, 30, 28, 28, 26, 28,
+     30, 24, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30, 30),
+)
+
+# Sürüm başına hata düzeltme blok sayısı
+NUM_ERROR_CORRECTION_BLOCKS = (
+    (-1, 1, 1, 1, 1, 1, 2, 2, 2, 2, 4, 4, 4, 4, 4, 6, 6, 6, 6, 7, 8,
+     8, 9, 9, 10, 12, 12, 12, 13, 14, 15, 16, 17, 18, 19, 19, 20, 21, 22, 24, 25),
+    (-1, 1, 1, 1, 2, 2, 4, 4, 4, 5, 5, 5, 8, 9, 9, 10, 10, 11, 13, 14, 16,
+     17, 17, 18, 20, 21, 23, 25, 26, 28, 29, 31, 33, 35, 37, 38, 40, 43, 45, 47, 49),
+    (-1, 1, 1, 2, 2, 4, 4, 6, 6, 8, 8, 8, 10, 12, 16, 12, 17, 16, 18, 21, 20,
+     23, 23, 25, 27, 29, 34, 34, 35, 38, 40, 43, 45, 48, 51, 53, 56, 59, 62, 65, 68),
+    (-1, 1, 1, 2, 4, 4, 4, 5, 6, 8, 8, 11, 11, 16, 16, 18, 16, 19, 21, 25, 25,
+     25, 34, 30, 32, 35, 37, 40, 42, 45, 48, 51, 54, 57, 60, 63, 66, 70, 74, 77, 81),
+)
+
+# Maske desenleri (koşul sağlanırsa modül tersine çevrilir)
+MASK_PATTERNS = (
+    lambda x, y: (x + y) % 2 == 0,
+    lambda x, y: y % 2 == 0,
+    lambda x, y: x % 3 == 0,
+    lambda x, y: (x + y) % 3 == 0,
+    lambda x, y: (x // 3 + y // 2) % 2 == 0,
+    lambda x, y: x * y % 2 + x * y % 3 == 0,
+    lambda x, y: (x * y % 2 + x * y % 3) % 2 == 0,
+    lambda x, y: ((x + y) % 2 + x * y % 3) % 2 == 0,
+)
+
+
+class QRCodeError(ValueError):
+    """Veri seçilen hata düzeltme seviyesinde hiçbir sürüme sığmıyor"""
+
+
+def _raw_data_modules(version):
+    """Fonksiyon desenleri dışında kalan modül sayısı"""
+    result = (16 * version + 128) * version + 64
+    if version >= 2:
+        alignments = version // 7 + 2
+        result -= (25 * alignments - 10) * alignments - 55
+        if version >= 7:
+            result -= 36
+    return result
+
+
+def _data_codewords(version, ecc_index):
+    return (
+        _raw_data_modules(version) // 8
+        - ECC_CODEWORDS_PER_BLOCK[ecc_index][version] * NUM_ERROR_CORRECTION_BLOCKS[ecc_index][version]
+    )
+
+
+def _alignment_positions(version):
+    if version == 1:
+        return []
+    count = version // 7 + 2
+    step = (version * 8 + count * 3 + 5) // (count * 4 - 4) * 2
+    positions = [version * 4 + 10 - i * step for i in range(count - 1)]
+    return [6] + positions[::-1]
+
+
+# Reed-Solomon: GF(2^8), indirgeme polinomu 0x11D
+def _rs_multiply(x, y):
+    z = 0
+    for i in reversed(range(8)):
+        z = (z << 1) ^ ((z >> 7) * 0x11D)
+        z ^= ((y >> i) & 1) * x
+    return z
+
+
+def _rs_divisor(degree):
+    result = [0] * (degree - 1) + [1]
+    root = 1
+    for _ in range(degree):
+        for j in range(degree):
+            result[j] = _rs_multiply(result[j], root)
+            if j + 1 < degree:
+                result[j] ^= result[j + 1]
+        root = _rs_multiply(root, 0x02)
+    return result
+
+
+def _rs_remainder(data, divisor):
+    result = [0] * len(divisor)
+    for byte in data:
+        factor = byte ^ result.pop(0)
+        result.append(0)
+        for i, coefficient in enumerate(divisor):
+            result[i] ^= _rs_multiply(coefficient, factor)
+    return result
+
+
+class _Matrix:
+    def __init__(self, version):
+        self.size = version * 4 + 17
+        self.modules = [[False] * self.size for _ in range(self.size)]
+        self.is_function = [[False] * self.size for _ in range(self.size)]
+
+    def set_function(self, x, y, dark):
+        self.modules[y][x] = dark
+        self.is_function[y][x] = True
+
+
+def _draw_function_patterns(matrix, version):
+    size = matrix.size
+    for i in range(size):
+        matrix.set_function(6, i, i % 2 == 0)
+        matrix.set_function(i, 6, i % 2 == 0)
+
+    for cx, cy in ((3, 3), (size - 4, 3), (3, size - 4)):
+        for dy in range(-4, 5):
+            for dx in range(-4, 5):
+                x, y = cx + dx, cy + dy
+                if 0 <= x < size and 0 <= y < size:
+                    distance = max(abs(dx), abs(dy))
+                    matrix.set_function(x, y, distance not in (2, 4))
+
+    positions = _alignment_positions(version)
+    last = len(positions) - 1
+    for i, cx in enumerate(positions):
+        for j, cy in enumerate(positions):
+            if (i, j) in ((0, 0), (0, last), (last, 0)):
+                continue
+            for dy in range(-2, 3):
+                for dx in range(-2, 3):
+                    matrix.set_function(cx + dx, cy + dy, max(abs(dx), abs(dy)) != 1)
+
+    _draw_format_bits(matrix, 0, 0)
+    _draw_version(matrix, version)
+
+
+def _draw_format_bits(matrix, format_ecc, mask):
+    data = format_ecc << 3 | mask
+    remainder = data
+    for _ in range(10):
+        remainder = (remainder << 1) ^ ((remainder >> 9) * 0x537)
+    bits = (data << 10 | remainder) ^ 0x5412
+
+    def bit(i):
+        return (bits >> i) & 1 != 0
+
+    size = matrix.size
+    for i in range(0, 6):
+        matrix.set_function(8, i, bit(i))
+    matrix.set_function(8, 7, bit(6))
+    matrix.set_function(8, 8, bit(7))
+    matrix.set_function(7, 8, bit(8))
+    for i in range(9, 15):
+        matrix.set_function(14 - i, 8, bit(i))
+
+    for i in range(0, 8):
+        matrix.set_function(size - 1 - i, 8, bit(i))
+    for i in range(8, 15):
+        matrix.set_function(8, size - 15 + i, bit(i))
+    matrix.set_function(8, size - 8, True)
+
+
+def _draw_version(matrix, version):
+    if version < 7:
+        return
+    remainder = version
+    for _ in range(12):
+        remainder = (remainder << 1) ^ ((remainder >> 11) * 0x1F25)
+    bits = version << 12 | remainder
+    size = matrix.size
+    for i in range(18):
+        dark = (bits >> i) & 1 != 0
+        a, b = size - 11 + i % 3, i // 3
+        matrix.set_function(a, b, dark)
+        matrix.set_function(b, a, dark)
+
+
+def _interleave(data, version, ecc_index):
+    blocks_count = NUM_ERROR_CORRECTION_BLOCKS[ecc_index][version]
+    ecc_length = ECC_CODEWORDS_PER_BLOCK[ecc_index][version]
+    raw_codewords = _raw_data_modules(version) // 8
+    short_blocks = blocks_count - raw_codewords % blocks_count
+    short_length = raw_codewords // blocks_count
+
+    divisor = _rs_divisor(ecc_length)
+    blocks = []
+    offset = 0
+    for i in range(blocks_count):
+        length = short_length - ecc_length + (0 if i < short_blocks else 1)
+        block = data[offset:offset + length]
+        offset += length
+        ecc = _rs_remainder(block, divisor)
+        if i < short_blocks:
+            block = block + [0]  # Kısa bloklar hizalama için doldurulur
+        blocks.append(block + ecc)
+
+    result = []
+    for i in range(len(blocks[0])):
+        for j, block in enumerate(blocks):
+            # Kısa bloklardaki dolgu baytı atlanır
+            if i != short_length - ecc_length or j >= short_blocks:
+                result.append(block[i])
+    return result
+
+
+def _draw_codewords(matrix, codewords):
+    size = matrix.size
+    i = 0
+    right = size - 1
+    while right >= 1:
+        if right == 6:
+            right = 5
+        for vertical in range(size):
+            for j in range(2):
+                x = right - j
+                upward = (right + 1) & 2 == 0
+                y = size - 1 - vertical if upward else vertical
+                if not matrix.is_function[y][x] and i < len(codewords) * 8:
+                    matrix.modules[y][x] = (codewords[i >> 3] >> (7 - (i & 7))) & 1 != 0
+                    i += 1
+        right -= 2
+
+
+def _apply_mask(matrix, mask):
+    pattern = MASK_PATTERNS[mask]
+    for y in range(matrix.size):
+        row, functions = matrix.modules[y], matrix.is_function[y]
+        for x in range(matrix.size):
+            if not functions[x] and pattern(x, y):
+                row[x] = not row[x]
+
+
+def _finder_penalty_count(run_history, size):
+    n = run_history[1]
+    core = n > 0 and run_history[2] == run_history[4] == run_history[5] == n and run_history[3] == n * 3
+    return (
+        (1 if core and run_history[0] >= n * 4 and run_history[6] >= n else 0)
+        + (1 if core and run_history[6] >= n * 4 and run_history[0] >= n else 0)
+    )
+
+
+def _finder_penalty_add_history(run_length, run_history, size):
+    if run_history[0] == 0:
+        run_length += size
+    run_history.pop()
+    run_history.insert(0, run_length)
+
+
+def _finder_penalty_terminate(run_color, run_length, run_history, size):
+    if run_color:
+        _finder_penalty_add_history(run_length, run_history, size)
+        run_length = 0
+    run_length += size
+    _finder_penalty_add_history(run_length, run_history, size)
+    return _finder_penalty_count(run_history, size)
+
+
+def _penalty(matrix):
+    size = matrix.size
+    modules = matrix.modules
+    result = 0
+
+    for lines in (modules, [list(column) for column in zip(*modules)]):
+        for line in lines:
+            run_color = False
+            run_length = 0
+            run_history = [0] * 7
+            for dark in line:
+                if dark == run_color:
+                    run_length += 1
+                    if run_length == 5:
+                        result += 3
+                    elif run_length > 5:
+                        result += 1
+                else:
+                    _finder_penalty_add_history(run_length, run_history, size)
+                    if not run_color:
+                        result += _finder_penalty_count(run_history, size) * 40
+                    run_color = dark
+                    run_length = 1
+            result += _finder_penalty_terminate(run_color, run_length, run_history, size) * 40
+
+    for y in range(size - 1):
+        for x in range(size - 1):
+            color = modules[y][x]
+            if color == modules[y][x + 1] == modules[y + 1][x] == modules[y + 1][x + 1]:
+                result += 3
+
+    dark = sum(row.count(True) for row in modules)
+    total = size * size
+    k = (abs(dark * 20 - total * 10) + total - 1) // total - 1
+    return result + k * 10
+
+
+def encode(text, ecc='M', mask=None):
+    """
+    Metni QR kod matrisine çevir
+
+    mask verilmezse en düşük cezalı maske (0-7) seçilir.
+
+    Returns:
+        list[list[bool]]: True = koyu modül
+    """
+    data = text.encode('utf-8')
+    ecc_index, format_ecc = ECC_LEVELS[ecc]
+
+    for version in range(1, 41):
+        count_bits = 8 if version <= 9 else 16
+        capacity_bits = _data_codewords(version, ecc_index) * 8
+        used_bits = 4 + count_bits + len(data) * 8
+        if used_bits <= capacity_bits:
+            break
+    else:
+        raise QRCodeError('Veri QR koda sığmayacak kadar uzun')
+
+    # Byte modu: mod göstergesi + uzunluk + veri + sonlandırıcı + dolgu
+    bits = []
+
+    def append(value, length):
+        bits.extend((value >> i) & 1 for i in reversed(range(length)))
+
+    append(0b0100, 4)
+    append(len(data), count_bits)
+    for byte in data:
+        append(byte, 8)
+    append(0, min(4, capacity_bits - len(bits)))
+    append(0, -len(bits) % 8)
+    pad = 0xEC
+    while len(bits) < capacity_bits:
+        append(pad, 8)
+        pad ^= 0xEC ^ 0x11
+
+    codewords = [
+        int(''.join(str(bit) for bit in bits[i:i + 8]), 2)
+        for i in range(0, len(bits), 8)
+    ]
+
+    matrix = _Matrix(version)
+    _draw_function_patterns(matrix, version)
+    _draw_codewords(matrix, _interleave(codewords, version, ecc_index))
+
+    # En düşük cezalı maske seçilir
+    if mask is None:
+        best_penalty = None
+        for candidate in range(8):
+            _apply_mask(matrix, candidate)
+            _draw_format_bits(matrix, format_ecc, candidate)
+            penalty = _penalty(matrix)
+            if best_penalty is None or penalty < best_penalty:
+                mask, best_penalty = candidate, penalty
+            _apply_mask(matrix, candidate)  # Maske XOR olduğu için ikinci uygulama geri alır
+
+    _apply_mask(matrix, mask)
+    _draw_format_bits(matrix, format_ecc, mask)
+    return matrix.modules
+
+
+def render_png(matrix, size, margin=1):
+    """Matrisi yaklaşık size x size piksellik siyah-beyaz PNG olarak çiz"""
+    # Pillow sadece PNG üretiminde gerekir; worker açılışını yavaşlatmasın
+    from PIL import Image
+
+    count = len(matrix) + margin * 2
+    scale = max(1, size // count)
+    image = Image.new('1', (count, count), 1)
+    pixels = image.load()
+    for y, row in enumerate(matrix):
+        for x, dark in enumerate(row):
+            if dark:
+                pixels[x + margin, y + margin] = 0
+    image = image.resize((count * scale, count * scale), Image.NEAREST)
+
+    output = io.BytesIO()
+    image.save(output, format='PNG', optimize=True)
+    return output.getvalue()
+
+
+def render_svg(matrix, margin=1):
+    """Matrisi ölçeklenebilir SVG olarak çiz (satır başına tek path)"""
+    count = len(matrix) + margin * 2
+    parts = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < len(row):
+            if row[x]:
+                start = x
+                while x < len(row) and row[x]:
+                    x += 1
+                parts.append(f'M{start + margin} {y + margin}h{x - start}v1h{start - x}z')
+            else:
+                x += 1
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {count} {count}" '
+        f'shape-rendering="crispEdges"><rect width="100%" height="100%" fill="#fff"/>'
+        f'<path fill="#000" d="{"".join(parts)}"/></svg>'
+    )
+
+
+# Çıktı formatı değişirse önbellekteki eski görüntüler kullanılmasın diye artırılır
+RENDER_VERSION = '1'
+
+FORMATS = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+
+def image_etag(data, fmt, size, margin):
+    """Aynı girdiler her zaman aynı görüntüyü üretir; ETag girdilerden hesaplanır"""
+    key = f'{RENDER_VERSION}|{fmt}|{size}|{margin}|{data}'
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+
+
+def get_image(data, fmt='png', size=None, margin=None):
+    """QR görüntüsünü cache'ten getir, yoksa üretip QR_CODE_CACHE_TIMEOUT süresince sakla"""
+    size = size or settings.QR_CODE_SIZE
+    margin = settings.QR_CODE_MARGIN if margin is None else margin
+
+    key = f'qr:{image_etag(data, fmt, size, margin)}'
+    content = cache.get(key)
+    if content is None:
+        matrix = encode(data)
+        if fmt == 'png':
+            content = render_png(matrix, size, margin)
+        else:
+            content = render_svg(matrix, margin).encode('utf-8')
+        cache.set(key, content, settings.QR_CODE_CACHE_TIMEOUT)
+    return content
@@ -0,0 +1,175 @@
+"""
+Kimlik doğrulamasız API'ler için kayan pencereli istek sınırı
+Sayaçlar süreçler arası paylaşılan cache'te tutulur (üretimde ayrı SQLite
+dosyası); ana veritabanına hiç gidilmez. Her uç nokta için IP başına ve
+cihaz başına (X-Device-Id başlığı) ayrı sınır tanımlanır:
+
+    RATELIMITS = {'attendance_toggle': {'ip': '300/60', 'device': '12/60'}}
+
+    @rate_limited('attendance_toggle')
+    def attendance_toggle(request): ...
+
+Kayan pencere iki sabit pencereyle yaklaşık hesaplanır: önceki pencerenin
+sayacı, geçen süre oranında azaltılarak şimdikine eklenir. İstek başına bir
+okuma (get_many) ve kabul edilen istekte anahtar başına bir atomik artırma
+yapılır. Reddedilen istekler sayılmaz; sınırı aşan istemci pencere
+kaydıkça tekrar kabul edilir, sürekli deneme 429'u uzatmaz.
+
+Okuma ile artırma arasında kilit yoktur: aynı anda gelen istekler aynı
+sayacı görüp birlikte kabul edilebilir. Sınır yaklaşıktır; eşzamanlı istek
+sayısı kadar aşılabilir.
+
+Okulda tüm öğrenciler aynı IP'den çıkabildiği için IP sınırı geniş, cihaz
+sınırı dar tutulur. Personel oturumlu cihazlar (kiosk) cihaz sınırına
+tabi değildir; oturum sadece cihaz sınırını aşan istekte okunur, sınırın
+altındaki istekler session/auth veritabanına gitmez. Cache'e ulaşılamazsa
+istek sınırlanmadan geçer.
+"""
+
+import hashlib
+import logging
+import math
+import re
+import time
+from functools import lru_cache, wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import api
+
+logger = logging.getLogger(__name__)
+
+# İstemcide localStorage'da saklanan rastgele kimlik (static/js/checkin_queue.js)
+DEVICE_ID_RE = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """'12/60' -> (12 istek, 60 saniye); boş ya da '0/..' sınırsız demektir"""
+    if not rate:
+        return None
+    count, _, seconds = rate.partition('/')
+    count, seconds = int(count), int(seconds or 60)
+    if count <= 0 or seconds <= 0:
+        return None
+    return count, seconds
+
+
+def client_ip(request):
+    """İstemci IP'si (proxy arkasında RATELIMIT_IP_HEADER ile okunur)"""
+    header = settings.RATELIMIT_IP_HEADER
+    if header:
+        # Proxy'nin eklediği değer en sağdadır; istemcinin yazdıkları solda kalır
+        value = request.headers.get(header, '').split(',')[-1].strip()
+        if value:
+            return value
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def client_keys(request):
+    """Sınır uygulanacak (tür, kimlik) çiftleri"""
+    keys = [('ip', client_ip(request))]
+    device = request.headers.get('X-Device-Id', '')
+    if DEVICE_ID_RE.match(device):
+        keys.append(('device', device))
+    return keys
+
+
+def _is_staff(request):
+    # request.user tembel yüklenir; erişim session ve auth sorgusu yapar
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_authenticated and user.is_staff
+
+
+def _count(key, window_seconds):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # Pencerenin ilk isteği; eşzamanlı başka istek oluşturduysa artırılır
+        if cache.add(key, 1, timeout=window_seconds * 2):
+            return 1
+        return cache.incr(key)
+
+
+def _retry_after(limit, seconds, previous, current, elapsed):
+    """Tahmini sayacın tekrar sınırın altına inmesi için beklenecek süre (sn)"""
+    remaining = seconds - elapsed
+    if current >= limit:
+        # Şimdiki pencere biter, sayacı önceki pencere olarak azalarak sayılır
+        wait = remaining + (1 - limit / current) * seconds
+    else:
+        wait = (1 - (limit - current) / previous) * seconds - elapsed if previous else remaining
+    return max(1, math.ceil(wait))
+
+
+def check(request, name):
+    """
+    Sınır aşıldıysa beklenecek saniyeyi döndür; aşılmadıysa isteği say ve None döndür
+    """
+    rates = settings.RATELIMITS.get(name, {})
+    limits = []
+    for kind, value in client_keys(request):
+        rate = parse_rate(rates.get(kind))
+        if rate is None or not value:
+            continue
+        limit, seconds = rate
+        window, offset = divmod(time.time(), seconds)
+        # IP ve cihaz kimliği anahtar uzunluğu sabit kalsın diye özetlenir
+        ident = hashlib.blake2b(value.encode(), digest_size=12).hexdigest()
+        prefix = f'rl:{name}:{kind}:{ident}:{seconds}'
+        limits.append((kind, limit, seconds, offset, f'{prefix}:{int(window)}', f'{prefix}:{int(window) - 1}'))
+
+    if not limits:
+        return None
+
+    counts = cache.get_many([key for item in limits for key in item[4:]])
+    waits = {}
+    for kind, limit, seconds, offset, current_key, previous_key in limits:
+        # Bu istek de sayılırsa oluşacak tahmin
+        current = counts.get(current_key, 0) + 1
+        before = counts.get(previous_key, 0)
+        estimate = before * (1 - offset / seconds) + current
+        if estimate > limit:
+            waits[kind] = _retry_after(limit, seconds, before, current, offset)
+
+    if waits.keys() == {'device'} and _is_staff(request):
+        # Kapıdaki kiosk yoğun saatte tek cihazdan çok okutma gönderir; personel
+        # oturumu olduğu için cihaz sınırı yerine sadece IP sınırı uygulanır
+        limits = [item for item in limits if item[0] != 'device']
+        waits = {}
+
+    if waits:
+        return max(waits.values())
+
+    # Sadece kabul edilen istek sayılır
+    for kind, limit, seconds, offset, current_key, previous_key in limits:
+        _count(current_key, seconds)
+    return None
+
+
+def rate_limited(name):
+    """View'ı RATELIMITS[name] sınırlarıyla koruyan dekoratör (aşılırsa 429)"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if settings.RATELIMIT_ENABLED:
+                try:
+                    wait = check(request, name)
+                except Exception as e:
+                    # Sayaç deposundaki sorun check-in'i durdurmamalı
+                    logger.warning("Rate limit kontrolü yapılamadı (%s): %s", name, e)
+                    wait = None
+
+                if wait is not None:
+                    response = api.response(request, {
+                        'status': 'error',
+                        'message': f'Çok fazla istek gönderildi. Lütfen {wait} saniye sonra tekrar deneyin.',
+                        'code': 'rate_limited',
+                        'retry_after': wait,
+                    }, status=429)
+                    response['Retry-After'] = str(wait)
+                    return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
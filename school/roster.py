@@ -0,0 +1,164 @@
+"""
+Sürümlü okul öğrenci listesi (kiosk ve istemci tarafı doğrulama için)
+Öğrenci eklendiğinde, düzenlendiğinde, pasife alındığında ya da
+silindiğinde RosterChange tablosuna (okul, TC) kaydı düşülür. Tablonun
+kayıt kimliği liste sürümüdür:
+
+    snapshot(school_id)            # tam liste, sürüm numarasıyla
+    snapshot(school_id, since=120) # 120. sürümden sonra değişen öğrenciler
+
+Değişiklik kaydında sadece TC tutulur; delta yanıtındaki bilgiler her
+zaman öğrencinin güncel halinden okunur, listede olmayanlar "removed"
+olarak döner. Tam liste sürüm başına sıkıştırılmış olarak cache'lenir.
+
+Sinyal göndermeyen toplu işlemler de kaydedilir: içe aktarma
+record_students'ı çağırır, Student/Classroom QuerySet.update() listeyi
+etkileyen alanlarda kaydı kendisi düşer, QuerySet.delete() post_delete
+gönderir. Ham SQL ile yapılan değişiklikler kaydedilmez; kiosk saatte bir
+tam listeyi yeniden alarak bunları da yakalar.
+
+Bilinen sınır: PostgreSQL'de eşzamanlı iki transaction'dan küçük pk'lı
+olan sonra commit edilirse, arada eşitlenen istemci o değişikliği
+kaçırabilir (SQLite'ta yazımlar sıralı olduğundan oluşmaz). Kiosk bu
+yüzden periyodik olarak tam listeyi de yeniler.
+"""
+
+import gzip
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, Min
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import sharding
+from .models import ROSTER_FIELDS, Classroom, RosterChange, Student
+
+FIELDS = ['id_number', 'name', 'classroom']
+
+
+def roster_state(student):
+    return tuple(getattr(student, name) for name in sorted(ROSTER_FIELDS))
+
+
+def record_students(students):
+    """
+    Listeyi etkileyen değişiklikleri kaydet (toplu işlemler için de kullanılır)
+
+    Öğrencinin yüklendiği andaki ve şimdiki (okul, TC) çiftleri kaydedilir;
+    böylece okul ya da TC değişiminde eski okulun listesi de güncellenir.
+    """
+    pairs = set()
+    for student in students:
+        previous = getattr(student, '_roster_state', None)
+        current = roster_state(student)
+        if previous == current:
+            continue
+        pairs.add((student.school_id, student.id_number))
+        if previous:
+            loaded = dict(zip(sorted(ROSTER_FIELDS), previous))
+            pairs.add((loaded['school_id'], loaded['id_number']))
+        student._roster_state = current
+
+    if pairs:
+        RosterChange.objects.bulk_create([
+            RosterChange(school_id=school_id, id_number=id_number)
+            for school_id, id_number in pairs if school_id
+        ])
+
+
+@receiver(post_save, sender=Student)
+def _student_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        record_students([instance])
+
+
+@receiver(post_delete, sender=Student)
+def _student_deleted(sender, instance, using=None, **kwargs):
+    if using != sharding.db_for_school(instance.school_id):
+        return  # Okul taşındıktan sonra eski kopyanın silinmesi
+    RosterChange.objects.create(school_id=instance.school_id, id_number=instance.id_number)
+
+
+@receiver(post_save, sender=Classroom)
+def _classroom_saved(sender, instance, created=False, raw=False, using=None, **kwargs):
+    # Sınıf adı listede görünür; yeniden adlandırmada sınıftaki tüm öğrenciler değişir
+    if created or raw:
+        return
+    RosterChange.objects.bulk_create([
+        RosterChange(school_id=school_id, id_number=id_number)
+        for school_id, id_number in Student.objects.using(using).filter(classroom=instance).values_list('school_id', 'id_number')
+    ])
+
+
+def current_version(school_id):
+    return RosterChange.objects.filter(school_id=school_id).aggregate(version=Max('pk'))['version'] or 0
+
+
+def _rows(school_id, id_numbers=None):
+    students = Student.objects.using(sharding.db_for_school(school_id)).filter(school_id=school_id, is_active=True)
+    if id_numbers is not None:
+        students = students.filter(id_number__in=id_numbers)
+    rows = students.order_by().values_list('id_number', 'first_name', 'last_name', 'classroom__name')
+    return [[id_number, f'{first} {last}', classroom] for id_number, first, last, classroom in rows]
+
+
+def _encode(data):
+    return gzip.compress(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), mtime=0)
+
+
+def snapshot(school_id, since=None):
+    """
+    Okul listesinin gzip'li JSON'u: (sürüm, tam liste mi, içerik)
+
+    since verilirse ve o sürümden sonraki değişiklikler hâlâ kayıtlıysa
+    sadece değişen öğrenciler döner; aksi halde tam liste.
+    """
+    # Sürüm listeden önce okunur: arada gelen değişiklik bir sonraki deltada tekrar gelir
+    version = current_version(school_id)
+
+    if since is not None and since <= version:
+        # Temizlenmiş (prune) kayıtların ötesine geçilemez
+        oldest = RosterChange.objects.filter(school_id=school_id).aggregate(oldest=Min('pk'))['oldest']
+        if oldest is None or since >= oldest - 1:
+            changed = set(
+                RosterChange.objects.filter(school_id=school_id, pk__gt=since, pk__lte=version)
+                .values_list('id_number', flat=True)
+            )
+            students = _rows(school_id, changed) if changed else []
+            present = {row[0] for row in students}
+            return version, False, _encode({
+                'school': school_id,
+                'version': version,
+                'full': False,
+                'fields': FIELDS,
+                'students': students,
+                'removed': sorted(changed - present),
+            })
+
+    key = f'roster:{school_id}:{version}'
+    content = cache.get(key)
+    if content is None:
+        content = _encode({
+            'school': school_id,
+            'version': version,
+            'full': True,
+            'fields': FIELDS,
+            'students': _rows(school_id),
+            'removed': [],
+        })
+        cache.set(key, content, settings.ROSTER_CACHE_TIMEOUT)
+    return version, True, content
+
+
+def prune(before):
+    """
+    Verilen zamandan eski değişiklik kayıtlarını sil
+
+    Her okulun en son kaydı tutulur; böylece eski sürümdeki istemcilerin
+    delta yerine tam liste alması gerektiği anlaşılabilir.
+    """
+    latest = RosterChange.objects.values('school_id').annotate(latest=Max('pk')).values_list('latest', flat=True)
+    deleted, _ = RosterChange.objects.filter(created_at__lt=before).exclude(pk__in=list(latest)).delete()
+    return deleted
@@ -0,0 +1,232 @@
+"""
+Okul başına veritabanı yönlendirmesi
+SQLite tek yazıcıya izin verdiği için kalabalık bir okulun sabah girişleri
+diğer okulların yazımlarını bekletir. SCHOOL_DATABASES ayarındaki okulların
+sınıf, öğrenci ve yoklama kayıtları ayrı bir veritabanında tutulur; böylece
+her okul kendi yazma kilidini kullanır.
+
+Ana veritabanında kalanlar: okullar, kullanıcılar, SMS kuyruğu, liste
+değişiklikleri ve TC -> okul dizini (StudentDirectory). Okul veritabanında
+okul kaydının bir kopyası da tutulur (yabancı anahtar kısıtı için; okul
+bilgisi her zaman ana veritabanından okunur).
+
+Router sadece kayıt üzerinden yapılan erişimleri (student.attendances,
+attendance.student, yeni kayıt) yönlendirebilir. Sorgularda veritabanı
+açıkça seçilir:
+
+    alias = sharding.db_for_id_number(id_number)
+    Student.objects.using(alias).get(id_number=id_number)
+
+SCHOOL_DATABASES boşken her şey ana veritabanındadır; dizine yazılmaz ve
+dizin sorgusu yapılmaz. Bu sürede eskiyen dizin kayıtlarını move_school
+okulu taşırken temizler (prune_directory). Sadece SQLite ile kullanılır (okul veritabanında auth tabloları
+yoktur; ilk migration'daki kullanıcı kısıtı PostgreSQL'de oluşturulamaz).
+"""
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Attendance, Classroom, School, Student, StudentDirectory
+
+# Okulun veritabanında tutulan modeller
+SHARDED_MODELS = {Classroom, Student, Attendance}
+
+
+# Okul veritabanındaki yeni kayıtların kimlikleri <en küçük okul id> << 40'tan
+# başlar; ana veritabanı ve diğer okul veritabanlarıyla çakışmaz (sınıf QR
+# token'ı ve SMS kuyruğu kayıt kimliği taşır)
+ID_RANGE_BITS = 40
+
+
+def enabled():
+    return bool(settings.SCHOOL_DATABASES)
+
+
+def db_for_school(school_id):
+    """Okul kayıtlarının bulunduğu veritabanı"""
+    if school_id is None:
+        return DEFAULT_DB_ALIAS
+    return settings.SCHOOL_DATABASES.get(int(school_id), DEFAULT_DB_ALIAS)
+
+
+def databases():
+    """Okul kayıtları içerebilecek tüm veritabanları (ana veritabanı ilk sırada)"""
+    return [DEFAULT_DB_ALIAS, *sorted(set(settings.SCHOOL_DATABASES.values()))]
+
+
+def home_filter(queryset, alias, field='school_id'):
+    """Sorguyu o veritabanında yaşayan okullarla sınırla (taşıma sonrası eski kopyalar hariç)"""
+    if alias == DEFAULT_DB_ALIAS:
+        if not enabled():
+            return queryset
+        return queryset.exclude(**{f'{field}__in': list(settings.SCHOOL_DATABASES)})
+    sharded = [school_id for school_id, db in settings.SCHOOL_DATABASES.items() if db == alias]
+    return queryset.filter(**{f'{field}__in': sharded})
+
+
+def db_for_id_numbers(id_numbers):
+    """TC numaralarını veritabanlarına grupla: {alias: [TC, ...]} (dizinden tek sorgu)"""
+    id_numbers = list(id_numbers)
+    if not enabled():
+        return {DEFAULT_DB_ALIAS: id_numbers} if id_numbers else {}
+
+    schools = dict(
+        StudentDirectory.objects.using(DEFAULT_DB_ALIAS)
+        .filter(id_number__in=id_numbers).values_list('id_number', 'school_id')
+    )
+    groups = {}
+    for id_number in id_numbers:
+        groups.setdefault(db_for_school(schools.get(id_number)), []).append(id_number)
+    return groups
+
+
+def db_for_id_number(id_number):
+    groups = db_for_id_numbers([id_number])
+    return next(iter(groups), DEFAULT_DB_ALIAS)
+
+
+def students_by_id_number(id_numbers, queryset=None):
+    """TC -> öğrenci (her veritabanında tek sorgu)"""
+    queryset = Student.objects.all() if queryset is None else queryset
+    students = {}
+    for alias, numbers in db_for_id_numbers(id_numbers).items():
+        students.update(queryset.using(alias).in_bulk(numbers, field_name='id_number'))
+    return students
+
+
+def record_directory(students):
+    """Öğrencilerin TC -> okul eşlemesini yaz (toplu işlemler için de kullanılır)"""
+    if not enabled():
+        return
+    entries = [
+        StudentDirectory(id_number=student.id_number, school_id=student.school_id)
+        for student in students if student.school_id
+    ]
+    if entries:
+        StudentDirectory.objects.using(DEFAULT_DB_ALIAS).bulk_create(
+            entries, batch_size=500,
+            update_conflicts=True, unique_fields=['id_number'], update_fields=['school'],
+        )
+
+
+def prune_directory(school_id, id_numbers, batch_size=500):
+    """
+    Okulu gösteren ama okulun güncel öğrencisi olmayan dizin kayıtlarını sil
+
+    Sharding kapalıyken dizin güncellenmez; bu sürede okul ya da TC değiştiren
+    öğrencinin eski kaydı, okul taşındıktan sonra aramayı yanlış veritabanına
+    yönlendirirdi.
+    """
+    directory = StudentDirectory.objects.using(DEFAULT_DB_ALIAS)
+    stale = sorted(
+        set(directory.filter(school_id=school_id).values_list('id_number', flat=True)) - set(id_numbers)
+    )
+    deleted = 0
+    for start in range(0, len(stale), batch_size):
+        count, _ = directory.filter(school_id=school_id, id_number__in=stale[start:start + batch_size]).delete()
+        deleted += count
+    return deleted
+
+
+def replicate_school(school):
+    """Okul kaydının kopyasını okulun veritabanına yaz"""
+    alias = db_for_school(school.pk)
+    if alias != DEFAULT_DB_ALIAS:
+        School.objects.using(alias).bulk_create(
+            [school], update_conflicts=True, unique_fields=['id'],
+            update_fields=[field.name for field in School._meta.concrete_fields if not field.primary_key],
+        )
+
+
+def reserve_ids(alias):
+    """Okul veritabanının kimlik sayaçlarını kendi aralığının başına al (move_school çağırır)"""
+    start = min(
+        school_id for school_id, db in settings.SCHOOL_DATABASES.items() if db == alias
+    ) << ID_RANGE_BITS
+    with connections[alias].cursor() as cursor:
+        for model in SHARDED_MODELS:
+            table = model._meta.db_table
+            cursor.execute('UPDATE sqlite_sequence SET seq = MAX(seq, %s) WHERE name = %s', [start, table])
+            if not cursor.rowcount:
+                cursor.execute('INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)', [table, start])
+    return start
+
+
+def _is_home(instance, using):
+    # Taşıma sırasında eski veritabanındaki kopyanın silinmesi dizini değiştirmez
+    return using == db_for_school(instance.school_id)
+
+
+@receiver(post_save, sender=Student)
+def _student_saved(sender, instance, raw=False, using=DEFAULT_DB_ALIAS, **kwargs):
+    if raw or not enabled() or not _is_home(instance, using):
+        return
+    previous = getattr(instance, '_directory_id_number', None)
+    if previous and previous != instance.id_number:
+        StudentDirectory.objects.using(DEFAULT_DB_ALIAS).filter(id_number=previous).delete()
+    record_directory([instance])
+    instance._directory_id_number = instance.id_number
+
+
+@receiver(post_delete, sender=Student)
+def _student_deleted(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs):
+    if enabled() and _is_home(instance, using):
+        StudentDirectory.objects.using(DEFAULT_DB_ALIAS).filter(
+            id_number=instance.id_number, school_id=instance.school_id
+        ).delete()
+
+
+@receiver(post_save, sender=School)
+def _school_saved(sender, instance, raw=False, using=DEFAULT_DB_ALIAS, **kwargs):
+    if not raw and using == DEFAULT_DB_ALIAS:
+        replicate_school(instance)
+
+
+@receiver(post_delete, sender=School)
+def _school_deleted(sender, instance, using=DEFAULT_DB_ALIAS, **kwargs):
+    # Okul silinince okul veritabanındaki sınıf, öğrenci ve yoklamalar da silinir
+    alias = db_for_school(instance.pk)
+    if using == DEFAULT_DB_ALIAS and alias != DEFAULT_DB_ALIAS:
+        School.objects.using(alias).filter(pk=instance.pk).delete()
+
+
+class SchoolRouter:
+    """Okul verisini SCHOOL_DATABASES'taki veritabanına yönlendiren router"""
+
+    def _db(self, model, instance):
+        if model not in SHARDED_MODELS:
+            return DEFAULT_DB_ALIAS
+        if instance is None:
+            return None
+        if isinstance(instance, School):
+            # school.students, Student(school=...) ataması
+            return db_for_school(instance.pk)
+        if isinstance(instance, (Classroom, Student)) and instance._state.adding and instance.school_id:
+            # Yeni kayıt okulunun veritabanına yazılır
+            return db_for_school(instance.school_id)
+        if isinstance(instance, Attendance) and instance._state.adding:
+            # Yeni yoklama kaydı öğrencinin veritabanına yazılır
+            student = Attendance._meta.get_field('student').get_cached_value(instance, None)
+            if student is not None and student._state.db:
+                return student._state.db
+        # İlişkili kayıtlar aynı veritabanındadır
+        return instance._state.db
+
+    def db_for_read(self, model, **hints):
+        return self._db(model, hints.get('instance'))
+
+    def db_for_write(self, model, **hints):
+        return self._db(model, hints.get('instance'))
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Okul ve kullanıcı ana veritabanında; öğrenci/sınıf okulun veritabanında olabilir
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == DEFAULT_DB_ALIAS or db not in settings.SCHOOL_DATABASES.values():
+            return None
+        # Uygulamanın tüm tabloları oluşturulur (silmede ilişkili tablolar da sorgulanır);
+        # okul veritabanında sadece okul kopyası, sınıf, öğrenci ve yoklama kayıtları bulunur
+        return app_label == 'school'
@@ -0,0 +1,192 @@
+"""
+SMS yeniden deneme zamanlayıcısı
+Geçici hatalarla gönderilemeyen SMS'ler veritabanına kaydedilir ve ayrı
+bir worker (process_sms_retries komutu) tarafından üstel geri çekilme ve
+rastgele sapma (jitter) ile yeniden denenir. Deneme hakkı biten mesajlar
+SMSDeadLetter tablosuna taşınır.
+"""
+
+import logging
+import random
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import metrics
+from .models import SMSRetry, SMSDeadLetter
+
+logger = logging.getLogger(__name__)
+
+# Bağlantı hatası, sistem hatası (80) ve yetersiz bakiye (51) geçicidir
+RETRYABLE_ERROR_CODES = {'connection', '51', '80'}
+
+
+def is_retryable(result):
+    """Gönderim sonucu yeniden denenebilir mi?"""
+    return not result['success'] and result.get('error_code') in RETRYABLE_ERROR_CODES
+
+
+def backoff_delay(attempts):
+    """
+    Üstel geri çekilme + tam jitter (saniye)
+
+    Sağlayıcı düzeldiğinde bekleyen mesajlar aynı anda gönderilmesin diye
+    bekleme süresi [taban, üst sınır] aralığında rastgele seçilir.
+    """
+    base = settings.SMS_RETRY_BASE_DELAY
+    cap = min(settings.SMS_RETRY_MAX_DELAY, base * (2 ** attempts))
+    return random.uniform(base, max(base, cap))
+
+
+def enqueue(phone_number, message, result, student=None):
+    """Başarısız SMS'i yeniden deneme kuyruğuna ekle (tek INSERT)"""
+    if student is not None and student._state.db != DEFAULT_DB_ALIAS:
+        # Kuyruk ana veritabanında; okul veritabanındaki öğrenciye bağlanamaz
+        student = None
+    retry = SMSRetry.objects.create(
+        phone_number=phone_number,
+        message=message,
+        student=student,
+        attempts=1,
+        last_error_code=result.get('error_code') or '',
+        last_error=result.get('error') or '',
+        next_attempt_at=timezone.now() + timedelta(seconds=backoff_delay(1)),
+    )
+    metrics.inc('sms_retry_total', outcome='enqueued')
+    logger.info("SMS yeniden deneme kuyruğuna eklendi: %s (%s)", phone_number, retry.last_error_code)
+    return retry
+
+
+def claim_due(batch_size):
+    """
+    Zamanı gelen kayıtları bu worker için kirala
+
+    Kiralama tek bir UPDATE ile yapılır; aynı anda çalışan worker'lar
+    aynı kaydı alamaz. Kilit süresi dolan kayıtlar tekrar kiralanabilir.
+    """
+    now = timezone.now()
+    token = uuid.uuid4().hex
+    due_ids = list(
+        SMSRetry.objects.filter(next_attempt_at__lte=now)
+        .filter(Q(locked_until__isnull=True) | Q(locked_until__lt=now))
+        .order_by('next_attempt_at')
+        .values_list('pk', flat=True)[:batch_size]
+    )
+    if not due_ids:
+        return []
+
+    SMSRetry.objects.filter(pk__in=due_ids).filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now)
+    ).update(
+        claim_token=token,
+        locked_until=now + timedelta(seconds=settings.SMS_RETRY_LEASE_SECONDS),
+    )
+    return list(SMSRetry.objects.filter(claim_token=token).order_by('next_attempt_at'))
+
+
+def move_to_dead_letter(retry):
+    """Deneme hakkı biten mesajı dead-letter tablosuna taşı"""
+    with transaction.atomic():
+        SMSDeadLetter.objects.create(
+            phone_number=retry.phone_number,
+            message=retry.message,
+            student_id=retry.student_id,
+            attempts=retry.attempts,
+            last_error_code=retry.last_error_code,
+            last_error=retry.last_error,
+            first_failed_at=retry.created_at,
+        )
+        retry.delete()
+    metrics.inc('sms_retry_total', outcome='dead_letter')
+    logger.error("SMS %s denemede gönderilemedi, dead-letter'a taşındı: %s", retry.attempts, retry.phone_number)
+
+
+def release(retries):
+    """Denenmeyen kayıtları deneme sayısını artırmadan, dağıtarak ertele"""
+    now = timezone.now()
+    for retry in retries:
+        retry.next_attempt_at = now + timedelta(seconds=backoff_delay(retry.attempts))
+        retry.claim_token = ''
+        retry.locked_until = None
+    SMSRetry.objects.bulk_update(retries, ['next_attempt_at', 'claim_token', 'locked_until'])
+
+
+def process_due(netgsm, batch_size=None):
+    """
+    Zamanı gelen bir grup mesajı yeniden dene
+
+    Art arda bağlantı hataları alınırsa sağlayıcı hâlâ kapalı kabul edilir;
+    grubun kalanı denenmeden ileri bir zamana dağıtılır.
+
+    Returns:
+        dict: sent / retried / dead / deferred sayıları
+    """
+    batch_size = batch_size or settings.SMS_RETRY_BATCH_SIZE
+    stats = {'sent': 0, 'retried': 0, 'dead': 0, 'deferred': 0}
+    consecutive_failures = 0
+
+    retries = claim_due(batch_size)
+    for index, retry in enumerate(retries):
+        if consecutive_failures >= settings.SMS_RETRY_FAILURE_BREAKER:
+            remaining = retries[index:]
+            release(remaining)
+            stats['deferred'] += len(remaining)
+            logger.warning("NETGSM yanıt vermiyor, %s SMS ertelendi", len(remaining))
+            break
+
+        result = netgsm.send_sms(retry.phone_number, retry.message)
+
+        if result['success']:
+            retry.delete()
+            consecutive_failures = 0
+            stats['sent'] += 1
+            metrics.inc('sms_retry_total', outcome='sent')
+            continue
+
+        consecutive_failures += 1 if result.get('error_code') == 'connection' else 0
+        retry.attempts += 1
+        retry.last_error_code = result.get('error_code') or ''
+        retry.last_error = result.get('error') or ''
+
+        if not is_retryable(result) or retry.attempts >= settings.SMS_RETRY_MAX_ATTEMPTS:
+            move_to_dead_letter(retry)
+            stats['dead'] += 1
+            continue
+
+        retry.next_attempt_at = timezone.now() + timedelta(seconds=backoff_delay(retry.attempts))
+        retry.claim_token = ''
+        retry.locked_until = None
+        retry.save(update_fields=[
+            'attempts', 'last_error_code', 'last_error',
+            'next_attempt_at', 'claim_token', 'locked_until', 'updated_at'
+        ])
+        stats['retried'] += 1
+        metrics.inc('sms_retry_total', outcome='retried')
+
+    return stats
+
+
+def replay_dead_letters(dead_letters):
+    """Dead-letter kayıtlarını kuyruğa geri al (admin aksiyonu)"""
+    now = timezone.now()
+    count = 0
+    with transaction.atomic():
+        for dead in dead_letters:
+            if dead.replayed_at:
+                continue
+            SMSRetry.objects.create(
+                phone_number=dead.phone_number,
+                message=dead.message,
+                student_id=dead.student_id,
+                attempts=0,
+                last_error_code=dead.last_error_code,
+                last_error=dead.last_error,
+                next_attempt_at=now,
+            )
+            dead.replayed_at = now
+            dead.save(update_fields=['replayed_at'])
+            count += 1
+    return count
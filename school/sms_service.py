@@ -3,22 +3,208 @@ NETGSM SMS API Entegrasyonu
 Öğrenci giriş-çıkış bilgilendirme sistemi
 """
 
-import requests
 import logging
+import math
+import random
+import threading
+import time
 from datetime import datetime
 from django.conf import settings
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject
+from django.utils.module_loading import import_string
 import urllib.parse
 
+from . import health, metrics, profiling, sms_retry
+
 logger = logging.getLogger(__name__)
 
+# Türkçe tek kaydırma (single shift) tablosundaki karakterler
+TURKISH_CHARS = set('çÇğĞıİöÖşŞüÜ')
+
+
+def count_sms_segments(message):
+    """
+    Mesajın kaç SMS (segment) olarak faturalandırılacağını hesapla
+
+    ASCII metin 160/153, Türkçe karakterli metin 155/149, diğer
+    Unicode karakterler içeren metin 70/67 karakterde bölünür.
+    """
+    if not message:
+        return 1
+
+    if all(ord(char) < 128 for char in message):
+        single, multi = 160, 153
+    elif all(ord(char) < 128 or char in TURKISH_CHARS for char in message):
+        single, multi = 155, 149
+    else:
+        single, multi = 70, 67
+
+    if len(message) <= single:
+        return 1
+    return math.ceil(len(message) / multi)
+
+
+class ProviderConnectionError(Exception):
+    """Sağlayıcıya bağlanılamadı (requests hatasını sarar)"""
+
+
+class SMSBalanceTracker:
+    """
+    NETGSM bakiye önbelleği
+
+    Son bilinen bakiye cache'te tutulur ve süresi dolduğunda arka planda
+    yenilenir. İki sorgu arasında gönderilen her segment yerel tahminden
+    düşülür; tahmin eşik değerin altına inerse uyarı loglanır.
+    """
+
+    def __init__(self, netgsm):
+        self.netgsm = netgsm
+        self.ttl = getattr(settings, 'SMS_BALANCE_CACHE_TTL', 300)
+        self.low_threshold = getattr(settings, 'SMS_BALANCE_LOW_THRESHOLD', 50.0)
+        self.segment_cost = getattr(settings, 'SMS_SEGMENT_COST', 0.10)
+        self.alert_interval = getattr(settings, 'SMS_BALANCE_ALERT_INTERVAL', 3600)
+
+        key_prefix = f'sms_balance:{netgsm.username}'
+        self.snapshot_key = f'{key_prefix}:snapshot'
+        self.spent_key = f'{key_prefix}:spent_segments'
+        self.refresh_key = f'{key_prefix}:refreshing'
+        self.alert_key = f'{key_prefix}:low_alerted'
+
+        self._refresh_lock = threading.Lock()
+
+    def get(self):
+        """
+        Son bilinen bakiyeyi beklemeden döndür
+
+        Returns:
+            dict: Bakiye, tahmini bakiye ve verinin yaşı
+        """
+        snapshot = cache.get(self.snapshot_key)
+        now = time.time()
+
+        if snapshot is None or now - snapshot['fetched_at'] >= self.ttl:
+            self.refresh_async()
+
+        if snapshot is None:
+            return {
+                'success': False,
+                'pending': True,
+                'error': 'Bakiye henüz sorgulanmadı, arka planda güncelleniyor'
+            }
+
+        estimated = self._estimate(snapshot['balance'])
+        age = now - snapshot['fetched_at']
+
+        return {
+            'success': True,
+            'balance': estimated,
+            'last_known_balance': snapshot['balance'],
+            'currency': snapshot['currency'],
+            'age_seconds': round(age, 1),
+            'stale': age >= self.ttl,
+            'low_balance': estimated < self.low_threshold,
+            'error': None
+        }
+
+    def record_sent(self, segments):
+        """Gönderilen segmentleri yerel tahminden düş"""
+        cache.add(self.spent_key, 0, None)
+        try:
+            cache.incr(self.spent_key, segments)
+        except ValueError:
+            cache.set(self.spent_key, segments, None)
+
+        snapshot = cache.get(self.snapshot_key)
+        if snapshot is not None:
+            self._check_threshold(self._estimate(snapshot['balance']))
+
+    def refresh_async(self):
+        """Bakiyeyi arka planda yenile (aynı anda tek yenileme)"""
+        # Süreçler arası tekil yenileme: kilidi alamayan tekrar denemez
+        if not cache.add(self.refresh_key, 1, 60):
+            return
+
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+
+        def worker():
+            try:
+                self.refresh()
+            finally:
+                self._refresh_lock.release()
+                cache.delete(self.refresh_key)
+
+        try:
+            threading.Thread(target=worker, name='sms-balance-refresh', daemon=True).start()
+        except RuntimeError:
+            self._refresh_lock.release()
+            cache.delete(self.refresh_key)
+
+    def refresh(self):
+        """Bakiyeyi NETGSM'den senkron olarak sorgula ve cache'e yaz"""
+        spent_before = cache.get(self.spent_key, 0)
+        result = self.netgsm.get_balance()
+
+        if not result['success']:
+            logger.warning("SMS bakiye yenilenemedi: %s", result['error'])
+            return result
+
+        cache.set(self.snapshot_key, {
+            'balance': result['balance'],
+            'currency': result.get('currency', 'TL'),
+            'fetched_at': time.time(),
+        }, None)
+
+        # Sorgudan önce sayılan segmentler artık bakiyeye yansıdı
+        if spent_before:
+            try:
+                cache.decr(self.spent_key, spent_before)
+            except ValueError:
+                pass
+
+        self._check_threshold(self._estimate(result['balance']))
+        return result
+
+    def _estimate(self, balance):
+        """Son bakiyeden harcanan segmentleri düşerek tahmini bakiyeyi hesapla"""
+        spent = cache.get(self.spent_key, 0)
+        return round(balance - spent * self.segment_cost, 2)
+
+    def _check_threshold(self, estimated):
+        """Tahmini bakiye eşik değerin altındaysa uyarı ver"""
+        if estimated >= self.low_threshold:
+            return
+
+        if cache.add(self.alert_key, 1, self.alert_interval):
+            logger.warning(
+                "SMS bakiyesi düşük: tahmini %s TL (eşik %s TL, hesap %s)",
+                estimated, self.low_threshold, self.netgsm.username
+            )
+
 class NetGSMService:
     """NETGSM API servisi"""
     
-    def __init__(self):
-        self.api_url = "https://api.netgsm.com.tr/sms/send/get"
-        self.username = settings.NETGSM_USERNAME
-        self.password = settings.NETGSM_PASSWORD
-        self.header = settings.NETGSM_HEADER
+    # NETGSM hata kodları; metrik etiketi olarak sadece bunlar kullanılır
+    ERROR_CODES = {
+        '20': 'Mesaj metninde ki problemden dolayı gönderilemediği gönderim sayısı',
+        '30': 'Geçersiz kullanıcı adı, şifre veya kullanıcınızın API erişim izninin olmadığı',
+        '40': 'Mesaj başlığınızın (gönderici adınızın) sistemde tanımlı olmadığı',
+        '50': 'Abone olmadığınız hesabınıza ait şifrenizin hatalı olduğu',
+        '51': 'Bakiye yetersiz',
+        '60': 'Gönderim sırasında alınan numara hatasının miktarı',
+        '70': 'Hatalı sorgulama. Gönderdiğiniz parametrelerden birisi hatalı veya zorunlu alanlardan birinin eksik olduğu',
+        '80': 'Gönderim sırasında sistemde meydana gelen hatayı',
+        '85': 'Gönderilecek mesajda harf, rakam ve Türkçe karakterler dışında karakter bulunduğu'
+    }
+    
+    def __init__(self, username=None, password=None, header=None, api_url=None, balance_url=None):
+        self.api_url = api_url or "https://api.netgsm.com.tr/sms/send/get"
+        self.balance_url = balance_url or "https://api.netgsm.com.tr/balance/list/get"
+        self.username = username or settings.NETGSM_USERNAME
+        self.password = password or settings.NETGSM_PASSWORD
+        self.header = header or settings.NETGSM_HEADER
+        self.balance = SMSBalanceTracker(self)
         
     def send_sms(self, phone_number, message):
         """
@@ -36,8 +222,10 @@ class NetGSMService:
             clean_phone = self._clean_phone_number(phone_number)
             
             if not self._validate_phone_number(clean_phone):
+                metrics.inc('sms_skipped_total', reason='invalid_phone')
                 return {
                     'success': False,
+                    'error_code': 'invalid_phone',
                     'error': 'Geçersiz telefon numarası formatı'
                 }
             
@@ -54,31 +242,55 @@ class NetGSMService:
             }
             
             # API isteği gönder
-            response = requests.get(self.api_url, params=params, timeout=30)
+            response = self._request(self.api_url, params, 'send')
             
             # Yanıtı kontrol et
             result = self._parse_response(response.text)
             
             if result['success']:
-                logger.info(f"SMS başarıyla gönderildi: {clean_phone}")
+                metrics.inc('sms_sent_total')
+                self.balance.record_sent(count_sms_segments(message))
+                logger.info("SMS başarıyla gönderildi: %s", clean_phone)
             else:
-                logger.error(f"SMS gönderim hatası: {result['error']}")
+                # Bilinmeyen yanıt (ör. HTML hata sayfası) etiket sayısını büyütmesin
+                code = result['error_code'] if result['error_code'] in self.ERROR_CODES else 'unknown'
+                metrics.inc('sms_failed_total', code=code)
+                logger.error("SMS gönderim hatası: %s", result['error'])
             
             return result
             
-        except requests.RequestException as e:
-            logger.error(f"NETGSM API bağlantı hatası: {str(e)}")
+        except ProviderConnectionError as e:
+            metrics.inc('sms_failed_total', code='connection')
+            logger.error("NETGSM API bağlantı hatası: %s", e)
             return {
                 'success': False,
+                'error_code': 'connection',
                 'error': f'API bağlantı hatası: {str(e)}'
             }
         except Exception as e:
-            logger.error(f"SMS gönderim genel hatası: {str(e)}")
+            metrics.inc('sms_failed_total', code='exception')
+            logger.exception("SMS gönderim genel hatası: %s", e)
             return {
                 'success': False,
+                'error_code': 'exception',
                 'error': f'Beklenmeyen hata: {str(e)}'
             }
     
+    def _request(self, url, params, endpoint):
+        """NETGSM isteği; süre metriklere, erişilebilirlik sağlık kaydına yazılır"""
+        # requests yüklemesi yavaştır; worker açılışında değil ilk SMS'te import edilir
+        import requests
+
+        started = time.perf_counter()
+        try:
+            with profiling.outbound_http(), metrics.timer('sms_provider_latency_seconds', endpoint=endpoint):
+                response = requests.get(url, params=params, timeout=30)
+        except requests.RequestException as e:
+            health.record_netgsm(self.username, False, time.perf_counter() - started, type(e).__name__)
+            raise ProviderConnectionError(str(e)) from e
+        health.record_netgsm(self.username, True, time.perf_counter() - started)
+        return response
+    
     def _clean_phone_number(self, phone_number):
         """Telefon numarasını temizle ve formatla"""
         if not phone_number:
@@ -123,41 +335,29 @@ class NetGSMService:
             return {
                 'success': True,
                 'message_id': response_text,
+                'error_code': None,
                 'error': None
             }
         
         # Hata kodları
-        error_codes = {
-            '20': 'Mesaj metninde ki problemden dolayı gönderilemediği gönderim sayısı',
-            '30': 'Geçersiz kullanıcı adı, şifre veya kullanıcınızın API erişim izninin olmadığı',
-            '40': 'Mesaj başlığınızın (gönderici adınızın) sistemde tanımlı olmadığı',
-            '50': 'Abone olmadığınız hesabınıza ait şifrenizin hatalı olduğu',
-            '51': 'Bakiye yetersiz',
-            '60': 'Gönderim sırasında alınan numara hatasının miktarı',
-            '70': 'Hatalı sorgulama. Gönderdiğiniz parametrelerden birisi hatalı veya zorunlu alanlardan birinin eksik olduğu',
-            '80': 'Gönderim sırasında sistemde meydana gelen hatayı',
-            '85': 'Gönderilecek mesajda harf, rakam ve Türkçe karakterler dışında karakter bulunduğu'
-        }
-        
-        error_message = error_codes.get(response_text, f'Bilinmeyen hata kodu: {response_text}')
+        error_message = self.ERROR_CODES.get(response_text, f'Bilinmeyen hata kodu: {response_text}')
         
         return {
             'success': False,
             'message_id': None,
+            'error_code': response_text,
             'error': error_message
         }
     
     def get_balance(self):
         """Bakiye sorgulama"""
         try:
-            balance_url = "https://api.netgsm.com.tr/balance/list/get"
-            
             params = {
                 'usercode': self.username,
                 'password': self.password
             }
             
-            response = requests.get(balance_url, params=params, timeout=30)
+            response = self._request(self.balance_url, params, 'balance')
             
             if response.text.replace('.', '').isdigit():
                 return {
@@ -178,11 +378,124 @@ class NetGSMService:
             }
 
 
+class SMSProviderPool:
+    """
+    Birden fazla SMS hesabı arasında ağırlıklı yük dağıtımı
+    
+    Gönderimler sağlıklı hesaplara ağırlıklarına göre dağıtılır. Hesap
+    kaynaklı bir hata alındığında (bağlantı, sistem hatası, bakiye, yetki)
+    gönderim sıradaki hesaba aktarılır ve hatalı hesap, art arda hata
+    sayısıyla artan bir süre boyunca devre dışı bırakılır.
+    """
+    
+    # Bu hatalar hesaba/sağlayıcıya özgüdür, başka hesapla denenebilir
+    FAILOVER_ERROR_CODES = {'connection', 'exception', '30', '40', '50', '51', '80'}
+    
+    def __init__(self, providers=None):
+        configs = providers if providers is not None else settings.SMS_PROVIDERS
+        self.providers = [self._build_provider(index, config) for index, config in enumerate(configs)]
+        if not self.providers:
+            raise ValueError('En az bir SMS hesabı tanımlanmalı (SMS_PROVIDERS)')
+        
+        self.cooldown = getattr(settings, 'SMS_PROVIDER_COOLDOWN', 30)
+        self.max_cooldown = getattr(settings, 'SMS_PROVIDER_MAX_COOLDOWN', 600)
+        self._lock = threading.Lock()
+    
+    def _build_provider(self, index, config):
+        """Ayar sözlüğünden sağlayıcı adaptörünü oluştur"""
+        config = dict(config)
+        # Metrik etiketi; hesap kullanıcı adı herkese açık metriklerde yer almasın
+        name = str(config.pop('name', index))
+        backend = import_string(config.pop('backend', 'school.sms_service.NetGSMService'))
+        weight = max(float(config.pop('weight', 1)), 0.0)
+        return {
+            'service': backend(**config),
+            'name': name,
+            'weight': weight,
+            'failures': 0,
+            'disabled_until': 0.0,
+        }
+    
+    @property
+    def balance(self):
+        """Birincil hesabın bakiye önbelleği"""
+        return self.providers[0]['service'].balance
+    
+    @property
+    def username(self):
+        return self.providers[0]['service'].username
+    
+    def get_balance(self):
+        return self.providers[0]['service'].get_balance()
+    
+    def _ordered_providers(self):
+        """
+        Sağlıklı hesaplar ağırlıklı rastgele sırayla
+        
+        Devre dışı hesaplar sağlıklı hesap varken denenmez; hiç sağlıklı hesap
+        yoksa sadece devre dışı kalma süresi en önce dolacak hesap denenir
+        (sağlayıcı kesintisinde her gönderim tüm hesapların zaman aşımını
+        beklemesin).
+        """
+        now = time.monotonic()
+        with self._lock:
+            healthy = [p for p in self.providers if p['disabled_until'] <= now and p['weight'] > 0]
+            if not healthy:
+                candidates = [p for p in self.providers if p['weight'] > 0] or self.providers
+                return [min(candidates, key=lambda p: p['disabled_until'])]
+        
+        ordered = []
+        while healthy:
+            total = sum(p['weight'] for p in healthy)
+            pick = random.uniform(0, total)
+            for index, provider in enumerate(healthy):
+                pick -= provider['weight']
+                if pick <= 0:
+                    break
+            ordered.append(healthy.pop(index))
+        
+        return ordered
+    
+    def _mark_success(self, provider):
+        with self._lock:
+            provider['failures'] = 0
+            provider['disabled_until'] = 0.0
+    
+    def _mark_failure(self, provider):
+        with self._lock:
+            provider['failures'] += 1
+            delay = min(self.max_cooldown, self.cooldown * (2 ** (provider['failures'] - 1)))
+            provider['disabled_until'] = time.monotonic() + delay
+        logger.warning(
+            "SMS hesabı %s %.0f sn devre dışı (%s art arda hata)",
+            provider['service'].username, delay, provider['failures']
+        )
+    
+    def send_sms(self, phone_number, message):
+        """SMS'i sağlıklı bir hesaptan gönder, hesap hatasında diğerlerine geç"""
+        result = None
+        for provider in self._ordered_providers():
+            result = provider['service'].send_sms(phone_number, message)
+            
+            if result['success']:
+                self._mark_success(provider)
+                return result
+            
+            if result.get('error_code') not in self.FAILOVER_ERROR_CODES:
+                # Mesaj/numara kaynaklı hata, başka hesapla da düzelmez
+                return result
+            
+            self._mark_failure(provider)
+            metrics.inc('sms_provider_failover_total', provider=provider['name'])
+        
+        return result
+
+
 class AttendanceSMSService:
     """Yoklama SMS bildirimi servisi"""
     
     def __init__(self):
-        self.netgsm = NetGSMService()
+        self.netgsm = SMSProviderPool()
     
     def send_attendance_notification(self, student, attendance):
         """
@@ -196,34 +509,110 @@ class AttendanceSMSService:
             # SMS metnini oluştur
             message = self._create_message(student, attendance)
             
-            # Veli telefon numarasını al
-            parent_phone = student.parent_phone_number
+            # Veli telefon numarasını al (kayıt sırasında normalize edilmiş)
+            parent_phone = student.parent_phone_e164
             
-            if not parent_phone:
-                logger.warning(f"Öğrenci {student.full_name} için veli telefon numarası bulunamadı")
+            if not student.parent_phone_number:
+                metrics.inc('sms_skipped_total', reason='missing_phone')
+                logger.warning("Öğrenci #%s için veli telefon numarası bulunamadı", student.pk)
                 return {
                     'success': False,
                     'error': 'Veli telefon numarası bulunamadı'
                 }
             
+            if not parent_phone:
+                metrics.inc('sms_skipped_total', reason='invalid_phone')
+                logger.warning("Öğrenci #%s için veli telefon numarası geçersiz", student.pk)
+                return {
+                    'success': False,
+                    'error': 'Geçersiz telefon numarası formatı'
+                }
+            
             # SMS gönder
             result = self.netgsm.send_sms(parent_phone, message)
             
             # Log kaydet
             if result['success']:
-                logger.info(f"Yoklama SMS'i gönderildi: {student.full_name} -> {parent_phone}")
+                logger.info("Yoklama SMS'i gönderildi: öğrenci #%s -> %s", student.pk, parent_phone)
             else:
-                logger.error(f"Yoklama SMS gönderim hatası: {student.full_name} -> {result['error']}")
+                logger.error("Yoklama SMS gönderim hatası: öğrenci #%s -> %s", student.pk, result['error'])
+                
+                # Geçici hatalar kuyruğa alınır, worker daha sonra yeniden dener
+                if sms_retry.is_retryable(result):
+                    sms_retry.enqueue(parent_phone, message, result, student=student)
             
             return result
             
         except Exception as e:
-            logger.error(f"Attendance SMS service hatası: {str(e)}")
+            logger.exception("Attendance SMS service hatası: %s", e)
             return {
                 'success': False,
                 'error': f'SMS servisi hatası: {str(e)}'
             }
     
+    def send_grouped_notifications(self, attendances):
+        """
+        Kardeş bildirimlerini veli telefonuna göre grupla
+        
+        Aynı veliye ait birden fazla kayıt tek SMS'te birleştirilir.
+        
+        Args:
+            attendances: Attendance instance listesi (student select_related ile)
+            
+        Returns:
+            dict: Attendance pk -> gönderim sonucu
+        """
+        groups = {}
+        for attendance in attendances:
+            groups.setdefault(attendance.student.parent_phone_e164, []).append(attendance)
+        
+        results = {}
+        for parent_phone, group in groups.items():
+            if not parent_phone or len(group) == 1:
+                for attendance in group:
+                    results[attendance.pk] = self.send_attendance_notification(
+                        attendance.student, attendance
+                    )
+                continue
+            
+            try:
+                message = self._create_group_message(group)
+                result = self.netgsm.send_sms(parent_phone, message)
+            except Exception as e:
+                logger.exception("Toplu yoklama SMS hatası: %s", e)
+                result = {'success': False, 'error': f'SMS servisi hatası: {str(e)}'}
+            
+            if result['success']:
+                logger.info("Kardeş yoklama SMS'i gönderildi: %s öğrenci -> %s", len(group), parent_phone)
+            else:
+                logger.error("Kardeş yoklama SMS gönderim hatası: %s -> %s", parent_phone, result['error'])
+                
+                if sms_retry.is_retryable(result):
+                    sms_retry.enqueue(parent_phone, message, result, student=group[0].student)
+            
+            for attendance in group:
+                results[attendance.pk] = result
+        
+        return results
+    
+    def _create_group_message(self, attendances):
+        """Kardeşler için tek SMS mesaj metnini oluştur"""
+        lines = ["Başkent Psikoloji"]
+        
+        for attendance in sorted(attendances, key=lambda item: item.timestamp):
+            student = attendance.student
+            action = "GİRİŞ" if attendance.entry_type == 'entry' else "ÇIKIŞ"
+            lines.append(
+                f"{student.first_name} {student.last_name} {action}: "
+                f"{attendance.timestamp.strftime('%H:%M')}"
+            )
+        
+        first = attendances[0]
+        lines.append(first.timestamp.strftime('%d.%m.%Y'))
+        lines.append(first.student.school.name)
+        
+        return '\n'.join(lines)
+    
     def _create_message(self, student, attendance):
         """SMS mesaj metnini oluştur"""
         
@@ -252,5 +641,5 @@ SMS sistemi aktif!"""
         return self.netgsm.send_sms(phone_number, test_message)
 
 
-# Global service instance
-sms_service = AttendanceSMSService()
\ No newline at end of file
+# Global service instance: ilk kullanımda oluşturulur (import ve manage.py komutları hafif kalır)
+sms_service = SimpleLazyObject(AttendanceSMSService)
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""
+Statik dosyaların uzun süreli önbellek başlıklarıyla sunulması
+Önünde statik dosya sunucusu olmayan kurulumlar içindir (STATIC_SERVE=True).
+Hash'li dosyalar bir yıl 'immutable' olarak önbelleğe alınır; tarayıcı
+destekliyorsa collectstatic'in ürettiği .br/.gz kopyası gönderilir.
+"""
+
+import mimetypes
+import posixpath
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+# Hash'siz adlar (ör. admin'in doğrudan istediği dosyalar) kısa süre önbelleğe alınır
+DEFAULT_MAX_AGE = 60 * 60
+
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_hashed_names = None
+
+
+def _is_hashed(path):
+    """Dosya adı manifest'te hash'li bir ad olarak geçiyor mu?"""
+    global _hashed_names
+    if _hashed_names is None:
+        _hashed_names = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+    return path in _hashed_names
+
+
+def serve_static(request, path):
+    path = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = Path(safe_join(settings.STATIC_ROOT, path))
+    except Exception:
+        raise Http404('Geçersiz yol')
+    if not fullpath.is_file():
+        raise Http404('Dosya bulunamadı')
+
+    statobj = fullpath.stat()
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), statobj.st_mtime):
+        response = HttpResponseNotModified()
+    else:
+        content_type, _ = mimetypes.guess_type(str(fullpath))
+        accept_encoding = request.headers.get('Accept-Encoding', '')
+        served, content_encoding = fullpath, None
+        for encoding, suffix in ENCODINGS:
+            candidate = fullpath.with_name(fullpath.name + suffix)
+            if encoding in accept_encoding and candidate.is_file():
+                served, content_encoding = candidate, encoding
+                break
+
+        response = FileResponse(served.open('rb'), content_type=content_type or 'application/octet-stream')
+        response.headers['Last-Modified'] = http_date(statobj.st_mtime)
+        if content_encoding:
+            response.headers['Content-Encoding'] = content_encoding
+
+    if _is_hashed(path):
+        response.headers['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        response.headers['Cache-Control'] = f'public, max-age={DEFAULT_MAX_AGE}'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
@@ -0,0 +1,58 @@
+"""
+Sıkıştırılmış, içerik hash'li statik dosyalar
+collectstatic sırasında ManifestStaticFilesStorage dosya adlarına içerik
+hash'i ekler (auth.3f2a9c1b.css); bu sınıf ayrıca metin dosyalarının
+.gz ve (brotli kuruluysa) .br kopyalarını üretir. Dosya içeriği
+değişmedikçe adı da değişmediği için tarayıcılar süresiz önbelleğe alabilir.
+"""
+
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # brotli opsiyonel; yoksa sadece gzip üretilir
+    brotli = None
+
+COMPRESS_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.map', '.xml')
+
+# Bu boyutun altındaki dosyalarda sıkıştırma kazandırmaz
+COMPRESS_MIN_SIZE = 256
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Hash'li dosya adları + önceden sıkıştırılmış .gz/.br kopyaları"""
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed_names = []
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.append(hashed_name)
+            yield name, hashed_name, processed
+
+        if dry_run:
+            return
+
+        for hashed_name in hashed_names:
+            if hashed_name.endswith(COMPRESS_EXTENSIONS):
+                self._compress(self.path(hashed_name))
+
+    def _compress(self, path):
+        with open(path, 'rb') as source:
+            content = source.read()
+        if len(content) < COMPRESS_MIN_SIZE:
+            return
+
+        variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(content, quality=11)))
+
+        for suffix, compressed in variants:
+            # Kazanç yoksa sıkıştırılmış kopya tutulmaz
+            if len(compressed) >= len(content) * 0.95:
+                continue
+            with open(path + suffix, 'wb') as target:
+                target.write(compressed)
+            os.utime(path + suffix, (os.path.getatime(path), os.path.getmtime(path)))
@@ -0,0 +1,2 @@
+# Testler paylaşılan SQLite cache dosyasına yazmasın
+LOCMEM_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
@@ -0,0 +1,28 @@
+import json
+
+from django.test import RequestFactory, SimpleTestCase
+
+from school import api
+
+
+class ResponseFieldsTests(SimpleTestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def respond(self, data, fields, status=200):
+        response = api.response(self.factory.get('/', {'fields': fields}), data, status=status)
+        return json.loads(response.content)
+
+    def test_selected_fields(self):
+        data = {'status': 'success', 'current_status': 'içeride', 'student': {'full_name': 'Ali', 'school': 'A'}}
+        self.assertEqual(self.respond(data, 'student.full_name'), {
+            'status': 'success', 'student': {'full_name': 'Ali'},
+        })
+
+    def test_error_code_always_kept(self):
+        # İstemci hata türünü alan seçiminden bağımsız olarak code ile ayırt eder
+        data = {'status': 'error', 'message': 'Çok fazla istek', 'code': 'rate_limited', 'retry_after': 5}
+        self.assertEqual(self.respond(data, 'current_status', status=429), {
+            'status': 'error', 'message': 'Çok fazla istek', 'code': 'rate_limited',
+        })
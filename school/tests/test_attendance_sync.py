@@ -0,0 +1,239 @@
+import json
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.contrib.auth.models import User
+from django.test import Client, TestCase, override_settings
+from django.utils import timezone
+
+from school import checkin_tokens
+from school.models import Attendance, Classroom, School, Student
+from school.tests import LOCMEM_CACHES
+
+
+def create_student(school=None, classroom=None, id_number='12345678901', **fields):
+    school = school or School.objects.create(name='Test Okulu', address='Ankara')
+    classroom = classroom or Classroom.objects.create(name='5-A', school=school)
+    return Student.objects.create(
+        first_name='Ali', last_name='Yılmaz', id_number=id_number,
+        school=school, classroom=classroom,
+        parent_first_name='Ayşe', parent_last_name='Yılmaz', parent_phone_number='05321234567',
+        **fields
+    )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ApplyScansTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_student()
+        cls.morning = datetime(2026, 3, 2, 5, 0, tzinfo=dt_timezone.utc)
+
+    def test_scans_applied_in_time_order(self):
+        # Parti istemci zamanına göre sıralanır: giriş, çıkış, giriş
+        scans = [
+            ('scan-0003', self.student, self.morning + timedelta(hours=3)),
+            ('scan-0001', self.student, self.morning),
+            ('scan-0002', self.student, self.morning + timedelta(hours=1)),
+        ]
+        created = Attendance.apply_scans(scans)
+        self.assertEqual(
+            [created[client_id].entry_type for client_id in ('scan-0001', 'scan-0002', 'scan-0003')],
+            ['entry', 'exit', 'entry']
+        )
+
+    def test_resent_scans_are_skipped(self):
+        scans = [('scan-0001', self.student, self.morning), ('scan-0001', self.student, self.morning)]
+        self.assertEqual(list(Attendance.apply_scans(scans)), ['scan-0001'])
+        self.assertEqual(Attendance.apply_scans(scans), {})
+        self.assertEqual(Attendance.objects.filter(student=self.student).count(), 1)
+
+    def test_scan_older_than_last_entry_follows_it(self):
+        last = Attendance.objects.create(
+            student=self.student, entry_type='entry', timestamp=self.morning, date=timezone.localdate(self.morning)
+        )
+        created = Attendance.apply_scans([('scan-0001', self.student, self.morning - timedelta(minutes=5))])
+        attendance = created['scan-0001']
+        self.assertEqual(attendance.entry_type, 'exit')
+        self.assertGreater(attendance.timestamp, last.timestamp)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, SMS_ENABLED=False, RATELIMIT_ENABLED=False)
+class ToggleAttendanceTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_student()
+
+    def test_toggle_alternates(self):
+        # PostgreSQL'de öğrenci satırı select_for_update ile kilitlenir
+        entry_types = [Attendance.toggle_attendance(self.student).entry_type for _ in range(3)]
+        self.assertEqual(entry_types, ['entry', 'exit', 'entry'])
+
+    def test_toggle_endpoint(self):
+        token = checkin_tokens.make_token(checkin_tokens.scope_for(school_id=self.student.school_id))
+        response = Client(HTTP_HOST='localhost').post(
+            '/attendance-toggle/', json.dumps({'id_number': self.student.id_number, 'token': token}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['attendance']['entry_type'], 'entry')
+        self.assertEqual(Attendance.objects.filter(student=self.student).count(), 1)
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES, SMS_ENABLED=False, RATELIMIT_ENABLED=False, CHECKIN_TOKEN_REQUIRED=True,
+    CHECKIN_TOKEN_PERIOD=60, CHECKIN_TOKEN_MAX_AGE=300, ATTENDANCE_SYNC_TOKEN_GRACE=900,
+)
+class AttendanceSyncTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_student()
+
+    def setUp(self):
+        self.client = Client(HTTP_HOST='localhost')
+        self.now = time.time()
+
+    def sync(self, *scans, **headers):
+        response = self.client.post(
+            '/attendance-sync/', json.dumps({'scans': list(scans)}), content_type='application/json', **headers
+        )
+        self.assertEqual(response.status_code, 200)
+        return {result['id']: result for result in response.json()['results']}
+
+    def scan(self, client_id, age, token_age=None, id_number=None, scope=None):
+        """age saniye önce okutulmuş, token_age saniye önceki QR koduyla okutma"""
+        window = checkin_tokens.current_window(self.now - (age if token_age is None else token_age))
+        return {
+            'id': client_id,
+            'id_number': id_number or self.student.id_number,
+            'client_time': (self.now - age) * 1000,
+            'token': checkin_tokens.make_token(scope or checkin_tokens.scope_for(classroom_id=self.student.classroom_id), window),
+        }
+
+    def test_batch_created_in_order(self):
+        results = self.sync(self.scan('scan-0002', 60), self.scan('scan-0001', 120))
+        self.assertEqual({result['status'] for result in results.values()}, {'created'})
+        self.assertLess(results['scan-0001']['timestamp'], results['scan-0002']['timestamp'])
+
+    def test_resent_batch_is_duplicate(self):
+        scans = [self.scan('scan-0001', 120), self.scan('scan-0002', 60)]
+        self.sync(*scans)
+        results = self.sync(*scans)
+        self.assertEqual({result['status'] for result in results.values()}, {'duplicate'})
+        self.assertEqual(Attendance.objects.count(), 2)
+
+    def test_offline_scan_within_grace(self):
+        # 10 dakika çevrimdışı kalan okutma kabul edilir
+        results = self.sync(self.scan('scan-0001', 600))
+        self.assertEqual(results['scan-0001']['status'], 'created')
+
+    def test_replayed_token_rejected(self):
+        # Eski bir QR kodu, istemci zamanı da eskiye alınarak tekrar gönderilemez
+        results = self.sync(self.scan('scan-0001', 20 * 3600))
+        self.assertEqual(results['scan-0001']['status'], 'error')
+        self.assertIn('süresi dolmuş', results['scan-0001']['message'])
+        # İstemci token hatalı okutmayı silmeden incelemeye ayırır
+        self.assertEqual(results['scan-0001']['code'], 'invalid_token')
+        self.assertFalse(Attendance.objects.exists())
+
+    def test_missing_token_rejected(self):
+        scan = dict(self.scan('scan-0001', 60), token=None)
+        results = self.sync(scan)
+        self.assertEqual(results['scan-0001']['code'], 'invalid_token')
+
+    def test_non_finite_client_time_rejected(self):
+        # json.loads NaN/Infinity kabul eder; partinin geri kalanı işlenmeli
+        results = self.sync(
+            dict(self.scan('scan-0001', 60), client_time=float('nan')),
+            dict(self.scan('scan-0002', 60), client_time=float('inf')),
+            dict(self.scan('scan-0003', 60), client_time=True),
+            self.scan('scan-0004', 60),
+        )
+        self.assertEqual(
+            [results[f'scan-000{index}']['status'] for index in range(1, 5)],
+            ['error', 'error', 'error', 'created']
+        )
+        self.assertEqual(Attendance.objects.count(), 1)
+
+    def test_invalid_client_id_gets_error_result(self):
+        response = self.client.post('/attendance-sync/', json.dumps({'scans': [
+            dict(self.scan('x', 60)),
+            dict(self.scan('scan-0001', 60), id=None),
+            'okutma',
+            self.scan('scan-0002', 60),
+        ]}), content_type='application/json')
+        results = response.json()['results']
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results[0]['status'], 'created')
+        self.assertEqual(
+            [(result['id'], result['code']) for result in results[1:]],
+            [('x', 'invalid_id'), (None, 'invalid_id'), (None, 'invalid_id')]
+        )
+
+    def test_staff_device_sync_after_long_outage(self):
+        # Personel oturumlu kiosk: token'ın bekleme payı aşılsa da, token'ı hiç
+        # olmasa da ATTENDANCE_SYNC_MAX_AGE içindeki okutmalar kaydedilir
+        self.client.force_login(User.objects.create_user('kapi', is_staff=True))
+        scans = [self.scan('scan-0001', 2 * 3600), dict(self.scan('scan-0002', 3600), token=None)]
+        results = self.sync(*scans, HTTP_X_DEVICE_ID='kiosk-device-1')
+        self.assertEqual({result['status'] for result in results.values()}, {'created'})
+
+        # Cihaz başlığı olmayan istek (başka siteden gönderilmiş olabilir) ayrıcalık almaz
+        results = self.sync(dict(self.scan('scan-0003', 60), token=None))
+        self.assertEqual(results['scan-0003']['code'], 'invalid_token')
+
+    def test_kiosk_scans_deep_into_outage(self):
+        # Kiosk 3 token'lık (3 dakikalık) listeyle çevrimdışı kalır; listenin bitiminden
+        # sonraki okutmalar son token'la, token alınamadıysa token'sız kuyruğa girer
+        outage = self.now - 3600
+        scope = checkin_tokens.scope_for(classroom_id=self.student.classroom_id)
+        last_token = checkin_tokens.schedule(scope, count=3, now=outage)['tokens'][-1]['token']
+        other = create_student(school=self.student.school, classroom=self.student.classroom, id_number='12345678902')
+        scans = [
+            {'id': 'scan-0001', 'id_number': self.student.id_number, 'client_time': (outage + 4 * 60) * 1000, 'token': last_token},
+            {'id': 'scan-0002', 'id_number': other.id_number, 'client_time': (outage + 30 * 60) * 1000, 'token': None},
+        ]
+
+        self.client.force_login(User.objects.create_user('kapi', is_staff=True))
+        results = self.sync(*scans, HTTP_X_DEVICE_ID='kiosk-device-1')
+        self.assertEqual({result['status'] for result in results.values()}, {'created'})
+
+    def test_staff_device_token_still_checked(self):
+        self.client.force_login(User.objects.create_user('kapi', is_staff=True))
+        results = self.sync(
+            self.scan('scan-0001', 60, scope=checkin_tokens.scope_for(classroom_id=self.student.classroom_id + 1)),
+            self.scan('scan-0002', 25 * 3600, token_age=60),
+            HTTP_X_DEVICE_ID='kiosk-device-1',
+        )
+        self.assertIn('okuluna/sınıfına', results['scan-0001']['message'])
+        self.assertIn('çok eski', results['scan-0002']['message'])
+
+    def test_client_time_before_token_rejected(self):
+        # Okutma zamanı QR kodunun oluşturulmasından önce olamaz
+        results = self.sync(self.scan('scan-0001', 600, token_age=0))
+        self.assertEqual(results['scan-0001']['status'], 'error')
+        self.assertIn('uyuşmuyor', results['scan-0001']['message'])
+
+    def test_wrong_scope_and_unknown_student(self):
+        results = self.sync(
+            self.scan('scan-0001', 60, scope=checkin_tokens.scope_for(classroom_id=self.student.classroom_id + 1)),
+            self.scan('scan-0002', 60, id_number='10000000000'),
+            self.scan('scan-0003', 60),
+        )
+        self.assertIn('okuluna/sınıfına', results['scan-0001']['message'])
+        self.assertIn('bulunamadı', results['scan-0002']['message'])
+        # Hatalı okutmalar partinin geri kalanını engellemez
+        self.assertEqual(results['scan-0003']['status'], 'created')
+
+    def test_invalid_batch(self):
+        response = self.client.post('/attendance-sync/', json.dumps({'scans': []}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        with self.settings(ATTENDANCE_SYNC_MAX_BATCH=1):
+            response = self.client.post(
+                '/attendance-sync/', json.dumps({'scans': [self.scan('scan-0001', 60)] * 2}),
+                content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 400)
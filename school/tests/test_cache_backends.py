@@ -0,0 +1,86 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from school.cache_backends import SQLiteCache
+
+
+class SQLiteCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = SQLiteCache(Path(directory.name) / 'cache.sqlite3', {'OPTIONS': {'MAX_ENTRIES': 3}})
+
+    def test_set_get_delete(self):
+        self.cache.set('key', {'a': [1, 2]})
+        self.assertEqual(self.cache.get('key'), {'a': [1, 2]})
+        self.assertTrue(self.cache.has_key('key'))
+        self.assertTrue(self.cache.delete('key'))
+        self.assertIsNone(self.cache.get('key'))
+        self.assertFalse(self.cache.delete('key'))
+
+    def test_expired_entries(self):
+        with mock.patch('school.cache_backends.time.time', return_value=1000.0):
+            self.cache.set('key', 'value', 10)
+            self.cache.set('forever', 'value', None)
+        with mock.patch('school.cache_backends.time.time', return_value=1011.0):
+            self.assertEqual(self.cache.get('key', 'missing'), 'missing')
+            self.assertFalse(self.cache.has_key('key'))
+            self.assertEqual(self.cache.get_many(['key', 'forever']), {'forever': 'value'})
+
+    def test_add_only_when_missing_or_expired(self):
+        with mock.patch('school.cache_backends.time.time', return_value=1000.0):
+            self.assertTrue(self.cache.add('key', 1, 10))
+            self.assertFalse(self.cache.add('key', 2, 10))
+            self.assertEqual(self.cache.get('key'), 1)
+        with mock.patch('school.cache_backends.time.time', return_value=1011.0):
+            self.assertTrue(self.cache.add('key', 3, 10))
+            self.assertEqual(self.cache.get('key'), 3)
+
+    def test_incr(self):
+        self.cache.set('count', 1)
+        self.assertEqual(self.cache.incr('count'), 2)
+        self.assertEqual(self.cache.incr('count', 5), 7)
+        self.assertEqual(self.cache.decr('count'), 6)
+        # Tam sayı olmayan değerler genel yoldan artırılır
+        self.cache.set('ratio', 1.5)
+        self.assertEqual(self.cache.incr('ratio'), 2.5)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_incr_keeps_expiry(self):
+        with mock.patch('school.cache_backends.time.time', return_value=1000.0):
+            self.cache.set('count', 1, 10)
+            self.cache.set('ratio', 1.5, 10)
+            self.assertEqual(self.cache.incr('count'), 2)
+            self.assertEqual(self.cache.incr('ratio'), 2.5)
+        with mock.patch('school.cache_backends.time.time', return_value=1011.0):
+            self.assertEqual(self.cache.get_many(['count', 'ratio']), {})
+            with self.assertRaises(ValueError):
+                self.cache.incr('ratio')
+
+    def test_booleans_are_not_integers(self):
+        self.cache.set('flag', True)
+        self.assertIs(self.cache.get('flag'), True)
+
+    def test_many_and_touch(self):
+        self.cache.set_many({'a': 1, 'b': 'two'})
+        self.assertEqual(self.cache.get_many(['a', 'b', 'c']), {'a': 1, 'b': 'two'})
+        self.assertTrue(self.cache.touch('a', None))
+        self.assertFalse(self.cache.touch('c'))
+        self.cache.delete_many(['a', 'b'])
+        self.assertEqual(self.cache.get_many(['a', 'b']), {})
+
+    def test_cull_evicts_least_recently_used(self):
+        with mock.patch('school.cache_backends.random.random', return_value=1.0):
+            for index in range(5):
+                with mock.patch('school.cache_backends.time.time', return_value=1000.0 + index):
+                    self.cache.set(f'key{index}', index, None)
+        self.cache._cull(self.cache._connection())
+        # MAX_ENTRIES=3, CULL_FREQUENCY=3: 5 kaydın 1'i (en eski erişilen) silinir
+        self.assertEqual(self.cache.get_many([f'key{index}' for index in range(5)]), {
+            'key1': 1, 'key2': 2, 'key3': 3, 'key4': 4,
+        })
@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase, override_settings
+
+from school import checkin_tokens
+from school.checkin_tokens import InvalidToken, make_token, scope_for, scope_matches, verify_token
+
+# 6000 sn -> 100. pencere (CHECKIN_TOKEN_PERIOD=60)
+NOW = 6000
+
+
+@override_settings(CHECKIN_TOKEN_PERIOD=60, CHECKIN_TOKEN_MAX_AGE=300)
+class VerifyTokenTests(SimpleTestCase):
+
+    def test_current_window(self):
+        scope = verify_token(make_token('c3', 100), now=NOW)
+        self.assertEqual(scope, {'school_id': None, 'classroom_id': 3, 'window': 100, 'valid_from': 6000})
+
+    def test_max_age_edges(self):
+        # 300 sn = 5 pencere geriye kadar geçerli
+        verify_token(make_token('g', 95), now=NOW)
+        with self.assertRaisesMessage(InvalidToken, 'süresi dolmuş'):
+            verify_token(make_token('g', 94), now=NOW)
+
+    def test_next_window_edges(self):
+        # Panel bir sonraki token'ı önceden alır; daha ilerisi kabul edilmez
+        verify_token(make_token('g', 101), now=NOW)
+        with self.assertRaisesMessage(InvalidToken, 'süresi dolmuş'):
+            verify_token(make_token('g', 102), now=NOW)
+
+    def test_max_age_override(self):
+        verify_token(make_token('g', 80), now=NOW, max_age=1200)
+        with self.assertRaises(InvalidToken):
+            verify_token(make_token('g', 79), now=NOW, max_age=1200)
+
+    def test_tampered_token(self):
+        scope, window, signature = make_token('c3', 100).split('.')
+        with self.assertRaisesMessage(InvalidToken, 'Geçersiz'):
+            verify_token(f'c4.{window}.{signature}', now=NOW)
+        with self.assertRaisesMessage(InvalidToken, 'Geçersiz'):
+            verify_token(f'{scope}.{window}.{signature[:-1]}', now=NOW)
+
+    def test_malformed_token(self):
+        for token in ('abc', 'c3.zz.x', 's0.64.' + 'a' * checkin_tokens.SIGNATURE_LENGTH, 'c3.64'):
+            with self.subTest(token=token), self.assertRaises(InvalidToken):
+                verify_token(token, now=NOW)
+
+    def test_missing_token(self):
+        with self.assertRaisesMessage(InvalidToken, 'QR kodu okutun'):
+            verify_token('', now=NOW)
+
+
+class ScopeTests(SimpleTestCase):
+
+    def test_scope_for(self):
+        self.assertEqual(scope_for(), 'g')
+        self.assertEqual(scope_for(school_id=2), 's2')
+        # Sınıf kapsamı okul kapsamından önceliklidir
+        self.assertEqual(scope_for(school_id=2, classroom_id=7), 'c7')
+
+    def test_scope_matches(self):
+        student = SimpleNamespace(school_id=2, classroom_id=7)
+        self.assertTrue(scope_matches({'school_id': None, 'classroom_id': None}, student))
+        self.assertTrue(scope_matches({'school_id': 2, 'classroom_id': None}, student))
+        self.assertFalse(scope_matches({'school_id': 3, 'classroom_id': None}, student))
+        self.assertTrue(scope_matches({'school_id': None, 'classroom_id': 7}, student))
+        self.assertFalse(scope_matches({'school_id': None, 'classroom_id': 8}, student))
@@ -0,0 +1,122 @@
+import io
+from unittest import mock
+
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from school.importers import ImportFileError, StudentImporter, read_rows
+from school.models import Classroom, School, Student, StudentDirectory
+from school.tests import LOCMEM_CACHES
+from school.views import student_status_etag
+
+HEADER = 'Ad;Soyad;TC;Okul;Sınıf;Veli Adı;Veli Soyadı;Veli Telefon'
+
+
+def rows(*lines, header=HEADER):
+    return read_rows(io.BytesIO('\n'.join([header, *lines]).encode('utf-8-sig')), 'ogrenciler.csv')
+
+
+class ReadRowsTests(SimpleTestCase):
+
+    def test_turkish_headers_and_line_numbers(self):
+        result = list(rows('Ali;Yılmaz;12345678901;Test Okulu;5-A;Ayşe;Yılmaz;0532 123 45 67', ';;;;;;;'))
+        self.assertEqual(len(result), 1)
+        number, row = result[0]
+        self.assertEqual(number, 2)
+        self.assertEqual(row['id_number'], '12345678901')
+        self.assertEqual(row['parent_phone_number'], '0532 123 45 67')
+
+    def test_missing_columns(self):
+        with self.assertRaisesMessage(ImportFileError, 'Eksik sütunlar: parent_phone_number'):
+            list(rows(header=HEADER.rsplit(';', 1)[0]))
+
+    def test_empty_file(self):
+        with self.assertRaisesMessage(ImportFileError, 'Dosya boş'):
+            list(read_rows(io.BytesIO(b''), 'ogrenciler.csv'))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class StudentImporterTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.school = School.objects.create(name='Test Okulu', address='Ankara')
+        cls.classroom = Classroom.objects.create(name='5-A', school=cls.school)
+
+    def test_create_and_update(self):
+        # Dizin sadece sharding açıkken tutulur (okullar yine ana veritabanında)
+        with mock.patch('school.sharding.enabled', return_value=True):
+            result = StudentImporter().run(rows(
+                'Ali;Yılmaz;12345678901;Test Okulu;5-A;Ayşe;Yılmaz;0532 123 45 67',
+                'Can;Demir;12345678902;test okulu;5-a;Elif;Demir;05331234567',
+            ))
+        self.assertEqual((result.total, result.created, result.updated, result.failed), (2, 2, 0, 0))
+        student = Student.objects.get(id_number='12345678901')
+        self.assertEqual(student.classroom, self.classroom)
+        self.assertEqual(student.parent_phone_number, '05321234567')
+        self.assertEqual(student.parent_phone_e164, '+905321234567')
+        # Toplu yazım sinyal göndermez; TC dizini yine de güncellenir
+        self.assertEqual(StudentDirectory.objects.count(), 2)
+
+        result = StudentImporter().run(rows(
+            'Ali;Yılmaz;12345678901;Test Okulu;5-A;Ayşe;Yılmaz;0532 123 45 67',
+            'Can;Demirci;12345678902;Test Okulu;5-A;Elif;Demir;05331234567',
+        ))
+        self.assertEqual((result.created, result.updated, result.unchanged), (0, 1, 1))
+        self.assertEqual(Student.objects.get(id_number='12345678902').last_name, 'Demirci')
+
+    def test_update_changes_status_etag(self):
+        StudentImporter().run(rows('Ali;Yılmaz;12345678901;Test Okulu;5-A;Ayşe;Yılmaz;05321234567'))
+        request = RequestFactory().get('/')
+        etag = student_status_etag(request, '12345678901')
+
+        # bulk_update auto_now çalıştırmaz; ad değişikliği kiosklara 304 yerine yeni veriyle yansımalı
+        StudentImporter().run(rows('Ali Can;Yılmaz;12345678901;Test Okulu;5-A;Ayşe;Yılmaz;05321234567'))
+        self.assertEqual(Student.objects.get(id_number='12345678901').first_name, 'Ali Can')
+        self.assertNotEqual(student_status_etag(request, '12345678901'), etag)
+
+    def test_row_errors(self):
+        result = StudentImporter().run(rows(
+            'Ali;Yılmaz;1234;Test Okulu;5-A;Ayşe;Yılmaz;05321234567',
+            'Can;Demir;12345678902;Yok Okulu;5-A;Elif;Demir;05331234567',
+            'Efe;Kaya;12345678903;Test Okulu;9-Z;Elif;Kaya;05331234567',
+            'Ece;Ak;12345678904;Test Okulu;5-A;Elif;Ak;02121234567',
+            'Ece;Ak;12345678905;Test Okulu;5-A;Elif;Ak;05331234567',
+            'Ece;Ak;12345678905;Test Okulu;5-A;Elif;Ak;05331234567',
+        ))
+        errors = {(number, message.split(':')[0]) for number, _, message in result.errors}
+        self.assertEqual(errors, {
+            (2, 'TC Kimlik No'),
+            (3, 'Okul bulunamadı'),
+            (4, 'Sınıf bulunamadı'),
+            (5, 'Veli telefon numarası geçerli bir cep telefonu değil'),
+            (7, 'TC kimlik numarası dosyada birden fazla kez geçiyor'),
+        })
+        self.assertEqual((result.created, result.failed), (1, 5))
+        self.assertEqual(list(Student.objects.values_list('id_number', flat=True)), ['12345678905'])
+
+        report = io.StringIO()
+        result.write_report(report)
+        self.assertTrue(report.getvalue().startswith('satir,tc_kimlik_no,hata'))
+
+    def test_create_classrooms(self):
+        lines = ['Ali;Yılmaz;12345678901;Test Okulu;6-B;Ayşe;Yılmaz;05321234567',
+                 'Can;Demir;12345678902;Test Okulu;6-B;Elif;Demir;05331234567']
+        result = StudentImporter().run(rows(*lines))
+        self.assertEqual(result.failed, 2)
+
+        result = StudentImporter(create_classrooms=True).run(rows(*lines))
+        self.assertEqual((result.created, result.classrooms_created), (2, 1))
+        classroom = Classroom.objects.get(school=self.school, name='6-B')
+        self.assertEqual(classroom.students.count(), 2)
+
+    def test_dry_run(self):
+        result = StudentImporter(dry_run=True).run(rows('Ali;Yılmaz;12345678901;Test Okulu;5-A;Ayşe;Yılmaz;05321234567'))
+        self.assertEqual(result.created, 1)
+        self.assertFalse(Student.objects.exists())
+
+    def test_deactivate(self):
+        header = HEADER + ';Aktif'
+        StudentImporter().run(rows('Ali;Yılmaz;12345678901;Test Okulu;5-A;Ayşe;Yılmaz;05321234567;evet', header=header))
+        result = StudentImporter().run(rows('Ali;Yılmaz;12345678901;Test Okulu;5-A;Ayşe;Yılmaz;05321234567;pasif', header=header))
+        self.assertEqual(result.updated, 1)
+        self.assertFalse(Student.objects.get().is_active)
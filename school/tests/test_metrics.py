@@ -0,0 +1,80 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from school import metrics
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_FLUSH_INTERVAL=3600, METRICS_QUANTILE_WINDOW=300)
+class MetricsBufferTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = metrics.MetricsStore(Path(directory.name) / 'metrics.sqlite3')
+        self.buffer = metrics.MetricsBuffer(3600)
+        patches = [
+            mock.patch.object(metrics, '_store', self.store),
+            mock.patch.object(metrics, '_buffer', self.buffer),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def test_updates_buffered_until_flush(self):
+        # İstek yolunda depoya yazılmaz
+        with mock.patch.object(self.store, 'add', wraps=self.store.add) as add:
+            metrics.inc('sms_sent_total')
+            metrics.inc('sms_sent_total')
+            metrics.observe('sms_provider_latency_seconds', 0.2, endpoint='send')
+            add.assert_not_called()
+
+            self.buffer.flush()
+            add.assert_called_once()
+
+        values = {(name, labels): value for name, labels, value in self.store.collect()}
+        self.assertEqual(values[('sms_sent_total', '')], 2)
+        self.assertEqual(values[('sms_provider_latency_seconds_count', '{endpoint="send"}')], 1)
+
+    def test_render_includes_pending_updates(self):
+        metrics.inc('sms_failed_total', code='40')
+        self.assertIn('sms_failed_total{code="40"} 1', metrics.render())
+
+    def test_failed_flush_kept_for_next_attempt(self):
+        metrics.inc('sms_sent_total')
+        with mock.patch.object(self.store, 'add', side_effect=OSError('disk')):
+            self.buffer.flush()
+        self.buffer.flush()
+        self.assertEqual(self.store.collect(), [('sms_sent_total', '', 1.0)])
+
+    def test_quantiles_use_recent_windows(self):
+        with mock.patch('school.metrics.time.time', return_value=3000.0) as now:
+            for _ in range(10):
+                metrics.observe('sms_provider_latency_seconds', 20, endpoint='send')
+            self.buffer.flush()
+            self.assertIn('sms_provider_latency_quantile_seconds{endpoint="send",quantile="0.5"} 20.0000', metrics.render())
+
+            # Üç aralık sonra eski ölçümler yüzdeliğe girmez, kümülatif sayaçlarda kalır
+            now.return_value = 3000.0 + 3 * 300
+            for _ in range(10):
+                metrics.observe('sms_provider_latency_seconds', 0.07, endpoint='send')
+            output = metrics.render()
+        self.assertIn('sms_provider_latency_quantile_seconds{endpoint="send",quantile="0.99"} 0.0995', output)
+        self.assertIn('sms_provider_latency_seconds_count{endpoint="send"} 20', output)
+        self.assertIn('sms_provider_latency_seconds_bucket{endpoint="send",le="30.0"} 20', output)
+        self.assertIn('sms_provider_latency_seconds_bucket{endpoint="send",le="0.05"} 0', output)
+        # Eski aralıklar yazımda silinir
+        windows = self.store._connection().execute('SELECT DISTINCT window FROM metric_window').fetchall()
+        self.assertEqual(windows, [(13,)])
+
+    def test_label_values_with_commas_and_quotes(self):
+        endpoint = 'send,"eu"\\x\ny'
+        metrics.observe('sms_provider_latency_seconds', 0.2, endpoint=endpoint)
+        output = metrics.render()
+        self.assertIn(
+            'sms_provider_latency_quantile_seconds{endpoint="send,\\"eu\\"\\\\x\\ny",quantile="0.5"}', output
+        )
+        self.assertEqual(metrics._parse_labels(metrics._format_labels({'endpoint': endpoint, 'le': 0.5})),
+                         {'endpoint': endpoint, 'le': '0.5'})
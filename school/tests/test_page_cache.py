@@ -0,0 +1,81 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+
+from school import page_cache
+from school.tests import LOCMEM_CACHES
+
+# Testlerde collectstatic manifesti yok
+PLAIN_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES, STORAGES=PLAIN_STORAGES, PAGE_CACHE_ENABLED=True, PAGE_CACHE_VERSION='test',
+    PAGE_CACHE_TIMEOUT=3600, PAGE_CACHE_MEMORY_TIMEOUT=60, PAGE_CACHE_MAX_AGE=60,
+    X_FRAME_OPTIONS='DENY',
+)
+class PageCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        patches = [
+            mock.patch.object(page_cache, '_version', None),
+            mock.patch.object(page_cache, '_paths', set()),
+            mock.patch.object(page_cache, '_memory', {}),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.client = Client(HTTP_HOST='localhost')
+
+    def test_miss_then_hit_keeps_headers(self):
+        miss = self.client.get('/student-checkin/')
+        hit = self.client.get('/student-checkin/')
+        self.assertEqual((miss['X-Page-Cache'], hit['X-Page-Cache']), ('miss', 'hit'))
+        self.assertEqual(miss.content, hit.content)
+        self.assertEqual(miss['ETag'], hit['ETag'])
+        # Önbellekten dönen yanıt XFrameOptionsMiddleware'e uğramaz
+        self.assertEqual((miss['X-Frame-Options'], hit['X-Frame-Options']), ('DENY', 'DENY'))
+        self.assertIn('max-age=60', hit['Cache-Control'])
+        self.assertNotIn('Set-Cookie', hit)
+
+        not_modified = self.client.get('/student-checkin/', HTTP_IF_NONE_MATCH=hit['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_query_string_ignored(self):
+        self.client.get('/student-checkin/?t=c1.aaaa.bbbb')
+        response = self.client.get('/student-checkin/?t=c2.cccc.dddd')
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        # Anahtar yalnızca yol; farklı sorgu parametreleri yeni kayıt açmaz
+        self.assertEqual(page_cache._paths, {'/student-checkin/'})
+
+    def test_middleware_only_serves_known_paths(self):
+        # Paylaşılan cache'te olsa bile bu süreçte işaretlenmemiş yol ara katmanda yanıtlanmaz
+        page_cache.store_page('/healthz', HttpResponse('önbellek', content_type='text/html'))
+        page_cache._paths.clear()
+        page_cache._memory.clear()
+
+        response = self.client.get('/healthz')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertNotEqual(response.content, 'önbellek'.encode())
+        self.assertEqual(page_cache._paths, set())
+
+    def test_post_and_disabled_bypass_cache(self):
+        self.client.get('/student-checkin/')
+        with self.settings(PAGE_CACHE_ENABLED=False):
+            self.assertNotIn('X-Page-Cache', self.client.get('/student-checkin/'))
+        self.assertNotIn('X-Page-Cache', self.client.post('/student-checkin/'))
+
+    def test_xframe_exempt_page(self):
+        response = HttpResponse('<p>embed</p>')
+        response.xframe_options_exempt = True
+        entry = page_cache.store_page('/embed/', response)
+        hit = page_cache.build_response(RequestFactory().get('/embed/'), entry)
+        self.assertEqual(hit['X-Page-Cache'], 'hit')
+        self.assertNotIn('X-Frame-Options', hit)
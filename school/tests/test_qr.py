@@ -0,0 +1,254 @@
+import io
+from urllib.parse import quote
+
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+
+from school import checkin_tokens, qr
+from school.tests import LOCMEM_CACHES
+
+# Standarttaki hizalama deseni merkezleri (sürüm 1-10)
+ALIGNMENT_POSITIONS = {
+    1: [], 2: [6, 18], 3: [6, 22], 4: [6, 26], 5: [6, 30],
+    6: [6, 34], 7: [6, 22, 38], 8: [6, 24, 42], 9: [6, 26, 46], 10: [6, 28, 50],
+}
+
+FORMAT_ECC = {0b01: 'L', 0b00: 'M', 0b11: 'Q', 0b10: 'H'}
+
+# Standarttaki maske koşulları (i = satır, j = sütun)
+MASKS = (
+    lambda i, j: (i + j) % 2 == 0,
+    lambda i, j: i % 2 == 0,
+    lambda i, j: j % 3 == 0,
+    lambda i, j: (i + j) % 3 == 0,
+    lambda i, j: (i // 2 + j // 3) % 2 == 0,
+    lambda i, j: (i * j) % 2 + (i * j) % 3 == 0,
+    lambda i, j: ((i * j) % 2 + (i * j) % 3) % 2 == 0,
+    lambda i, j: ((i + j) % 2 + (i * j) % 3) % 2 == 0,
+)
+
+# GF(2^8) üs/logaritma tabloları (indirgeme polinomu 0x11D, üreteç 2)
+GF_EXP = [0] * 512
+GF_LOG = [0] * 256
+_value = 1
+for _power in range(255):
+    GF_EXP[_power] = _value
+    GF_LOG[_value] = _power
+    _value <<= 1
+    if _value & 0x100:
+        _value ^= 0x11D
+for _power in range(255, 512):
+    GF_EXP[_power] = GF_EXP[_power - 255]
+
+
+def gf_mul(x, y):
+    return 0 if x == 0 or y == 0 else GF_EXP[GF_LOG[x] + GF_LOG[y]]
+
+
+def function_modules(version):
+    """Veri taşımayan modüller (sonlandırıcı, zamanlama, hizalama, format/sürüm alanları)"""
+    size = version * 4 + 17
+    reserved = [[False] * size for _ in range(size)]
+
+    def mark(rows, cols):
+        for i in rows:
+            for j in cols:
+                reserved[i][j] = True
+
+    mark(range(9), range(9))
+    mark(range(9), range(size - 8, size))
+    mark(range(size - 8, size), range(9))
+    mark([6], range(size))
+    mark(range(size), [6])
+    positions = ALIGNMENT_POSITIONS[version]
+    for i in positions:
+        for j in positions:
+            if (i, j) in ((6, 6), (6, positions[-1]), (positions[-1], 6)):
+                continue
+            mark(range(i - 2, i + 3), range(j - 2, j + 3))
+    if version >= 7:
+        mark(range(6), range(size - 11, size - 8))
+        mark(range(size - 11, size - 8), range(6))
+    return reserved
+
+
+def read_format(matrix):
+    """Sol üstteki format bitleri (15 bit, maskeli)"""
+    cells = [(i, 8) for i in range(6)] + [(7, 8), (8, 8), (8, 7)] + [(8, 14 - i) for i in range(9, 15)]
+    return sum(matrix[y][x] << bit for bit, (y, x) in enumerate(cells))
+
+
+def decode(matrix):
+    """
+    Matristen metni çöz (qr.py'den bağımsız)
+
+    Format bitlerini okur, maskeyi kaldırır, kod kelimelerini zikzak sırasıyla
+    toplar, bloklara ayırır, Reed-Solomon sendromlarının sıfır olduğunu
+    doğrular ve byte modundaki veriyi döndürür.
+    """
+    size = len(matrix)
+    version = (size - 17) // 4
+    format_bits = read_format(matrix) ^ 0x5412
+    ecc = FORMAT_ECC[format_bits >> 13]
+    mask = (format_bits >> 10) & 7
+
+    reserved = function_modules(version)
+    bits = []
+    right = size - 1
+    upward = True
+    while right >= 1:
+        if right == 6:
+            right = 5
+        rows = range(size - 1, -1, -1) if upward else range(size)
+        for i in rows:
+            for j in (right, right - 1):
+                if not reserved[i][j]:
+                    bits.append(int(matrix[i][j]) ^ MASKS[mask](i, j))
+        upward = not upward
+        right -= 2
+
+    total = len(bits) // 8
+    codewords = [int(''.join(map(str, bits[k * 8:k * 8 + 8])), 2) for k in range(total)]
+
+    ecc_index = 'LMQH'.index(ecc)
+    blocks = qr.NUM_ERROR_CORRECTION_BLOCKS[ecc_index][version]
+    ecc_length = qr.ECC_CODEWORDS_PER_BLOCK[ecc_index][version]
+    short_blocks = blocks - total % blocks
+    data_lengths = [total // blocks - ecc_length + (0 if b < short_blocks else 1) for b in range(blocks)]
+
+    stream = iter(codewords)
+    data = [[] for _ in range(blocks)]
+    for k in range(max(data_lengths)):
+        for b in range(blocks):
+            if k < data_lengths[b]:
+                data[b].append(next(stream))
+    ecc_words = [[] for _ in range(blocks)]
+    for _ in range(ecc_length):
+        for b in range(blocks):
+            ecc_words[b].append(next(stream))
+
+    for block, check in zip(data, ecc_words):
+        word = block + check
+        for power in range(ecc_length):
+            syndrome = 0
+            for coefficient in word:
+                syndrome = gf_mul(syndrome, GF_EXP[power]) ^ coefficient
+            if syndrome:
+                raise AssertionError('Reed-Solomon sendromu sıfır değil')
+
+    data_bits = ''.join(f'{byte:08b}' for block in data for byte in block)
+    if data_bits[:4] != '0100':
+        raise AssertionError('Byte modu bekleniyordu')
+    count_bits = 8 if version <= 9 else 16
+    length = int(data_bits[4:4 + count_bits], 2)
+    start = 4 + count_bits
+    payload = bytes(int(data_bits[start + k * 8:start + k * 8 + 8], 2) for k in range(length))
+    return {'text': payload.decode('utf-8'), 'version': version, 'ecc': ecc, 'mask': mask}
+
+
+class EncodeTests(SimpleTestCase):
+
+    def test_round_trip_levels_and_masks(self):
+        url = 'https://ornek.com/student-checkin/?t=c12.1b2f3a.AbCdEfGhIjKlMnOpQrStUv'
+        for ecc in 'LMQH':
+            for mask in range(8):
+                with self.subTest(ecc=ecc, mask=mask):
+                    result = decode(qr.encode(url, ecc, mask=mask))
+                    self.assertEqual(result, {'text': url, 'version': result['version'], 'ecc': ecc, 'mask': mask})
+
+    def test_round_trip_versions(self):
+        # Sürüm 7+ sürüm bilgisi taşır, sürüm 10+ uzunluğu 16 bitle yazar
+        for length, ecc, version in ((1, 'H', 1), (40, 'M', 3), (80, 'Q', 7), (200, 'M', 10), (250, 'L', 10)):
+            with self.subTest(length=length, ecc=ecc):
+                text = ('ogrenci-' * length)[:length]
+                result = decode(qr.encode(text, ecc))
+                self.assertEqual((result['text'], result['version'], result['ecc']), (text, version, ecc))
+
+    def test_utf8_text(self):
+        text = 'Öğrenci girişi: Şükrü Çağlar'
+        self.assertEqual(decode(qr.encode(text))['text'], text)
+
+    def test_smallest_version_chosen(self):
+        # Sürüm 1 byte kapasitesi: L 17, M 14, Q 11, H 7
+        for ecc, capacity in (('L', 17), ('M', 14), ('Q', 11), ('H', 7)):
+            with self.subTest(ecc=ecc):
+                self.assertEqual(len(qr.encode('a' * capacity, ecc)), 21)
+                self.assertEqual(len(qr.encode('a' * (capacity + 1), ecc)), 25)
+        with self.assertRaises(qr.QRCodeError):
+            qr.encode('a' * 3000, 'L')
+
+    def test_format_and_version_bits(self):
+        # Standarttaki tablo: maske 0 için format bitleri
+        for ecc, expected in (('L', 0x77C4), ('M', 0x5412), ('Q', 0x355F), ('H', 0x1689)):
+            with self.subTest(ecc=ecc):
+                self.assertEqual(read_format(qr.encode('x', ecc, mask=0)), expected)
+        matrix = qr.encode('a' * 80, 'Q')
+        size = len(matrix)
+        self.assertEqual(size, 45)
+        version_bits = sum(matrix[i // 3][size - 11 + i % 3] << i for i in range(18))
+        self.assertEqual(version_bits, 0x07C94)
+
+    def test_codeword_tables(self):
+        # Veri modülü sayısı standarttaki toplam kod kelimesiyle uyuşmalı
+        for version, total in ((1, 26), (2, 44), (5, 134), (7, 196), (10, 346)):
+            free = sum(not cell for row in function_modules(version) for cell in row)
+            self.assertEqual(free // 8, total)
+        self.assertEqual(qr.ECC_CODEWORDS_PER_BLOCK[2][5], 18)
+        self.assertEqual(qr.NUM_ERROR_CORRECTION_BLOCKS[3][10], 8)
+
+    def test_render(self):
+        from PIL import Image
+
+        matrix = qr.encode('https://ornek.com/')
+        image = Image.open(io.BytesIO(qr.render_png(matrix, size=180, margin=1)))
+        count = len(matrix) + 2
+        scale = 180 // count
+        self.assertEqual(image.size, (count * scale, count * scale))
+        # Sol üst sonlandırıcı deseninin köşesi koyu, kenar boşluğu açık
+        self.assertEqual(image.getpixel((scale, scale)), 0)
+        self.assertEqual(image.getpixel((0, 0)), 255)
+        self.assertTrue(qr.render_svg(matrix).startswith('<svg'))
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES, RATELIMIT_ENABLED=True, RATELIMITS={'qr_code': {'ip': '3/60'}},
+    CHECKIN_TOKEN_PERIOD=60, CHECKIN_TOKEN_MAX_AGE=300,
+)
+class QRCodeViewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client(HTTP_HOST='localhost')
+        self.token = checkin_tokens.make_token('s1')
+        self.url = f'http://localhost/student-checkin/?t={self.token}'
+
+    def get(self, url, fmt='svg'):
+        return self.client.get(f'/qr-code.{fmt}', {'url': url})
+
+    def test_checkin_url_rendered(self):
+        response = self.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/svg+xml')
+
+    def test_only_checkin_urls_with_valid_token(self):
+        stale = checkin_tokens.make_token('s1', checkin_tokens.current_window() - 100)
+        for url in (
+            'http://localhost/admin/',
+            'http://evil.example/student-checkin/?t=' + self.token,
+            'http://localhost/student-checkin/',
+            self.url + '&x=1',
+            self.url + '#a',
+            'http://localhost/student-checkin/?t=' + stale,
+            'http://localhost/student-checkin/?t=g.1.xxxxxxxxxxxxxxxxxxxxxx',
+        ):
+            with self.subTest(url=url), self.settings(RATELIMIT_ENABLED=False):
+                self.assertEqual(self.get(url).status_code, 400)
+
+    def test_cache_key_from_normalized_url(self):
+        first = self.get(self.url)
+        second = self.get(f'http://localhost/student-checkin/?t={quote(self.token, safe="")}')
+        self.assertEqual(first['ETag'], second['ETag'])
+
+    def test_rate_limited(self):
+        statuses = [self.get(self.url).status_code for _ in range(4)]
+        self.assertEqual(statuses, [200, 200, 200, 429])
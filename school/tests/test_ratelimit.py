@@ -0,0 +1,131 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from school import ratelimit
+from school.ratelimit import parse_rate, rate_limited
+from school.tests import LOCMEM_CACHES
+
+# Pencerenin 30. saniyesi (60 sn'lik pencerede)
+NOW = 6030.0
+
+
+class SessionUser:
+    """request.user yerine; oturumun kaç kez okunduğunu sayar"""
+
+    def __init__(self, is_staff):
+        self.is_staff = is_staff
+        self.loaded = 0
+
+    @property
+    def is_authenticated(self):
+        self.loaded += 1
+        return True
+
+
+class ParseRateTests(SimpleTestCase):
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate('12/60'), (12, 60))
+        self.assertEqual(parse_rate('5'), (5, 60))
+        for rate in ('', None, '0/60', '5/0'):
+            with self.subTest(rate=rate):
+                self.assertIsNone(parse_rate(rate))
+
+    def test_retry_after(self):
+        # Şimdiki pencere doldu: pencere sonuna kadar beklenir
+        self.assertEqual(ratelimit._retry_after(10, 60, 0, 10, 30), 30)
+        self.assertEqual(ratelimit._retry_after(10, 60, 0, 20, 30), 60)
+        # Önceki pencerenin ağırlığı azaldıkça tahmin sınırın altına iner
+        self.assertEqual(ratelimit._retry_after(10, 60, 20, 5, 0), 45)
+        # En az bir saniye
+        self.assertEqual(ratelimit._retry_after(10, 60, 20, 5, 50), 1)
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES, RATELIMIT_ENABLED=True, RATELIMIT_IP_HEADER='',
+    RATELIMITS={'test': {'ip': '100/60', 'device': '2/60'}},
+)
+@mock.patch('school.ratelimit.time.time', return_value=NOW)
+class RateLimitedTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.view = rate_limited('test')(lambda request: JsonResponse({'status': 'success'}))
+
+    def get(self, device='device-0001', ip='10.0.0.1', user=None):
+        request = self.factory.get('/', HTTP_X_DEVICE_ID=device, REMOTE_ADDR=ip)
+        if user is not None:
+            request.user = user
+        return self.view(request)
+
+    def test_device_limit(self, _):
+        self.assertEqual(self.get().status_code, 200)
+        self.assertEqual(self.get().status_code, 200)
+        response = self.get()
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '50')
+        # Aynı IP'den başka cihaz etkilenmez
+        self.assertEqual(self.get(device='device-0002').status_code, 200)
+
+    def test_previous_window_counts(self, time):
+        for _ in range(2):
+            self.get()
+        # Sonraki pencerenin yarısında önceki pencerenin yarısı sayılır
+        time.return_value = NOW + 60
+        self.assertEqual(self.get().status_code, 200)
+        self.assertEqual(self.get().status_code, 429)
+
+    def test_rejected_requests_not_counted(self, time):
+        for _ in range(2):
+            self.get()
+        # Sınırdayken ısrarla denemek bekleme süresini uzatmaz
+        for _ in range(50):
+            self.assertEqual(self.get().status_code, 429)
+        time.return_value = NOW + 60
+        self.assertEqual(self.get().status_code, 200)
+
+    def test_morning_rush(self, time):
+        # Kapıda 3 dakika boyunca saniyede bir gönderim (varsayılan cihaz sınırıyla)
+        with self.settings(RATELIMITS={'test': {'ip': '300/60', 'device': '120/60'}}):
+            statuses = set()
+            for second in range(180):
+                time.return_value = NOW + second
+                statuses.add(self.get().status_code)
+        self.assertEqual(statuses, {200})
+
+    def test_staff_exempt_from_device_limit(self, _):
+        staff = SessionUser(is_staff=True)
+        for _ in range(2):
+            self.assertEqual(self.get(user=staff).status_code, 200)
+        # Sınırın altındaki istekler oturuma bakmaz (session/auth sorgusu yok)
+        self.assertEqual(staff.loaded, 0)
+        for _ in range(8):
+            self.assertEqual(self.get(user=staff).status_code, 200)
+        self.assertEqual(staff.loaded, 8)
+
+        self.assertEqual(self.get(device='device-0002', user=SessionUser(is_staff=False)).status_code, 200)
+        self.assertEqual(self.get(device='device-0002', user=SessionUser(is_staff=False)).status_code, 200)
+        self.assertEqual(self.get(device='device-0002', user=SessionUser(is_staff=False)).status_code, 429)
+
+        # IP sınırı personel için de geçerli
+        with self.settings(RATELIMITS={'test': {'ip': '2/60', 'device': '2/60'}}):
+            self.assertEqual(self.get(user=staff, ip='10.0.0.2').status_code, 200)
+            self.assertEqual(self.get(user=staff, ip='10.0.0.2').status_code, 200)
+            self.assertEqual(self.get(user=staff, ip='10.0.0.2').status_code, 429)
+
+    def test_invalid_device_id_ignored(self, _):
+        for _ in range(5):
+            self.assertEqual(self.get(device='x').status_code, 200)
+
+    def test_disabled(self, _):
+        with self.settings(RATELIMIT_ENABLED=False):
+            for _ in range(5):
+                self.assertEqual(self.get().status_code, 200)
+
+    def test_cache_error_does_not_block(self, _):
+        with mock.patch('school.ratelimit.check', side_effect=RuntimeError('cache')):
+            self.assertEqual(self.get().status_code, 200)
@@ -0,0 +1,96 @@
+import gzip
+import json
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from school import roster
+from school.models import Classroom, RosterChange, School, Student
+from school.tests import LOCMEM_CACHES
+from school.tests.test_attendance_sync import create_student
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RosterSnapshotTests(TestCase):
+
+    def setUp(self):
+        self.school = School.objects.create(name='Test Okulu', address='Ankara')
+        self.classroom = Classroom.objects.create(name='5-A', school=self.school)
+        self.ali = create_student(self.school, self.classroom, '12345678901')
+        self.can = create_student(self.school, self.classroom, '12345678902')
+
+    def snapshot(self, since=None):
+        version, full, content = roster.snapshot(self.school.pk, since)
+        data = json.loads(gzip.decompress(content))
+        self.assertEqual((data['version'], data['full']), (version, full))
+        return data
+
+    def test_full_and_delta(self):
+        full = self.snapshot()
+        self.assertTrue(full['full'])
+        self.assertEqual([row[0] for row in sorted(full['students'])], ['12345678901', '12345678902'])
+
+        # Güncel sürümden sonra değişiklik yok
+        self.assertEqual(self.snapshot(full['version'])['students'], [])
+
+        self.ali.last_name = 'Kaya'
+        self.ali.save()
+        delta = self.snapshot(full['version'])
+        self.assertFalse(delta['full'])
+        self.assertEqual(delta['students'], [['12345678901', 'Ali Kaya', '5-A']])
+        self.assertGreater(delta['version'], full['version'])
+
+        # Pasife alınan öğrenci "removed" olarak döner
+        self.can.is_active = False
+        self.can.save()
+        delta = self.snapshot(delta['version'])
+        self.assertEqual((delta['students'], delta['removed']), ([], ['12345678902']))
+
+    def test_queryset_update_and_delete_recorded(self):
+        version = self.snapshot()['version']
+
+        Student.objects.filter(id_number='12345678902').update(is_active=False)
+        self.assertEqual(self.snapshot(version)['removed'], ['12345678902'])
+
+        version = roster.current_version(self.school.pk)
+        Classroom.objects.filter(pk=self.classroom.pk).update(name='6-A')
+        delta = self.snapshot(version)
+        self.assertEqual(delta['students'], [['12345678901', 'Ali Yılmaz', '6-A']])
+
+        version = delta['version']
+        Student.objects.filter(id_number='12345678901').delete()
+        self.assertEqual(self.snapshot(version)['removed'], ['12345678901'])
+
+    def test_unrelated_update_not_recorded(self):
+        version = roster.current_version(self.school.pk)
+        Student.objects.update(parent_phone_number='05329999999')
+        self.assertEqual(roster.current_version(self.school.pk), version)
+
+    def test_school_change_updates_both_lists(self):
+        other = School.objects.create(name='Diğer Okul', address='Ankara')
+        other_classroom = Classroom.objects.create(name='1-A', school=other)
+        version = roster.current_version(self.school.pk)
+
+        Student.objects.filter(pk=self.ali.pk).update(school=other, classroom=other_classroom)
+        self.assertEqual(self.snapshot(version)['removed'], ['12345678901'])
+        self.assertEqual(
+            [row[0] for row in json.loads(gzip.decompress(roster.snapshot(other.pk, 0)[2]))['students']],
+            ['12345678901']
+        )
+
+    def test_prune_forces_full_list_for_old_cursors(self):
+        version = roster.current_version(self.school.pk)
+        self.ali.last_name = 'Kaya'
+        self.ali.save()
+        RosterChange.objects.update(created_at=timezone.now() - timedelta(days=40))
+
+        before = RosterChange.objects.filter(school=self.school).count()
+        # Okulun en son kaydı tutulur
+        self.assertEqual(roster.prune(timezone.now() - timedelta(days=30)), before - 1)
+        self.assertEqual(RosterChange.objects.filter(school=self.school).count(), 1)
+
+        # Silinen kayıtların gerisindeki istemci tam liste alır, güncel olan delta
+        self.assertTrue(self.snapshot(version - 1)['full'])
+        latest = roster.current_version(self.school.pk)
+        self.assertFalse(self.snapshot(latest)['full'])
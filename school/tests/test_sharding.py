@@ -0,0 +1,121 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from school import sharding
+from school.models import Attendance, Classroom, School, SMSRetry, Student, StudentDirectory
+from school.sharding import SchoolRouter
+from school.tests import LOCMEM_CACHES
+
+
+@override_settings(SCHOOL_DATABASES={5: 'school_5', 6: 'school_5', 7: 'kampus'})
+class SchoolRouterTests(SimpleTestCase):
+
+    def setUp(self):
+        self.router = SchoolRouter()
+
+    def loaded(self, instance, db):
+        """Veritabanından okunmuş gibi işaretle"""
+        instance._state.adding = False
+        instance._state.db = db
+        return instance
+
+    def test_db_for_school(self):
+        self.assertEqual(sharding.db_for_school(5), 'school_5')
+        self.assertEqual(sharding.db_for_school('7'), 'kampus')
+        self.assertEqual(sharding.db_for_school(8), 'default')
+        self.assertEqual(sharding.db_for_school(None), 'default')
+        self.assertEqual(sharding.databases(), ['default', 'kampus', 'school_5'])
+
+    def test_unsharded_models_stay_on_default(self):
+        for model in (School, StudentDirectory, SMSRetry):
+            with self.subTest(model=model.__name__):
+                self.assertEqual(self.router.db_for_write(model, instance=model()), 'default')
+                self.assertEqual(self.router.db_for_read(model), 'default')
+
+    def test_new_records_go_to_school_database(self):
+        self.assertEqual(self.router.db_for_write(Student, instance=Student(school_id=7)), 'kampus')
+        self.assertEqual(self.router.db_for_write(Classroom, instance=Classroom(school_id=5)), 'school_5')
+        self.assertEqual(self.router.db_for_write(Student, instance=Student(school_id=8)), 'default')
+
+    def test_related_access_from_school(self):
+        school = self.loaded(School(pk=6), 'default')
+        self.assertEqual(self.router.db_for_read(Student, instance=school), 'school_5')
+
+    def test_new_attendance_follows_student(self):
+        student = self.loaded(Student(pk=1, school_id=7), 'kampus')
+        self.assertEqual(self.router.db_for_write(Attendance, instance=Attendance(student=student)), 'kampus')
+
+    def test_loaded_records_stay_in_their_database(self):
+        student = self.loaded(Student(pk=1, school_id=5), 'school_5')
+        self.assertEqual(self.router.db_for_read(Attendance, instance=student), 'school_5')
+        # Sorgu ipucu yoksa Django varsayılanı (using() ile seçilir)
+        self.assertIsNone(self.router.db_for_read(Student))
+
+    def test_allow_migrate(self):
+        self.assertIsNone(self.router.allow_migrate('default', 'auth'))
+        self.assertIsNone(self.router.allow_migrate('other', 'school'))
+        self.assertTrue(self.router.allow_migrate('school_5', 'school'))
+        self.assertFalse(self.router.allow_migrate('school_5', 'auth'))
+        self.assertFalse(self.router.allow_migrate('kampus', 'sessions'))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class DirectoryTests(TestCase):
+
+    def test_everything_on_default_without_queries(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(sharding.db_for_id_numbers(['12345678901', '12345678902']), {
+                'default': ['12345678901', '12345678902'],
+            })
+            self.assertEqual(sharding.db_for_id_numbers([]), {})
+            queryset = Student.objects.all()
+            self.assertIs(sharding.home_filter(queryset, 'default'), queryset)
+
+    def test_directory_lookup(self):
+        StudentDirectory.objects.create(id_number='12345678901', school=School.objects.create(pk=5, name='A', address='-'))
+        with self.settings(SCHOOL_DATABASES={5: 'school_5'}), self.assertNumQueries(1):
+            groups = sharding.db_for_id_numbers(['12345678901', '12345678902'])
+        self.assertEqual(groups, {'school_5': ['12345678901'], 'default': ['12345678902']})
+
+
+    def test_directory_not_written_when_disabled(self):
+        school = School.objects.create(name='A', address='-')
+        classroom = Classroom.objects.create(name='5-A', school=school)
+        student = Student.objects.create(
+            first_name='Ali', last_name='Yılmaz', id_number='12345678901', school=school, classroom=classroom,
+            parent_first_name='Ayşe', parent_last_name='Yılmaz', parent_phone_number='05321234567',
+        )
+        student.id_number = '12345678902'
+        student.save()
+        student.delete()
+        self.assertFalse(StudentDirectory.objects.exists())
+
+    def test_prune_directory(self):
+        school = School.objects.create(pk=5, name='A', address='-')
+        other = School.objects.create(pk=6, name='B', address='-')
+        StudentDirectory.objects.bulk_create([
+            StudentDirectory(id_number='12345678901', school=school),
+            StudentDirectory(id_number='12345678902', school=school),
+            StudentDirectory(id_number='12345678903', school=school),
+            StudentDirectory(id_number='12345678904', school=other),
+        ])
+        # Okulun güncel öğrencisi olmayanlar silinir, diğer okullara dokunulmaz
+        self.assertEqual(sharding.prune_directory(5, {'12345678901'}, batch_size=1), 2)
+        self.assertEqual(
+            sorted(StudentDirectory.objects.values_list('id_number', flat=True)),
+            ['12345678901', '12345678904']
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES, CHECKIN_TOKEN_SCHEDULE=2)
+class PrerenderQRTests(TestCase):
+
+    def test_prerender_covers_school_and_classroom_scopes(self):
+        school = School.objects.create(name='A', address='-')
+        Classroom.objects.create(name='9-A', school=school)
+        out = StringIO()
+        call_command('prerender_qr', base_url='https://ornek.com', formats=['svg'], stdout=out)
+        # Genel + okul + sınıf kapsamı, kapsam başına 2 token
+        self.assertIn('6 QR görüntüsü hazırlandı', out.getvalue())
@@ -0,0 +1,130 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from school import sms_retry
+from school.models import SMSDeadLetter, SMSRetry
+from school.tests import LOCMEM_CACHES
+
+SENT = {'success': True, 'message_id': '1234567', 'error_code': None, 'error': None}
+DOWN = {'success': False, 'error_code': 'connection', 'error': 'API bağlantı hatası'}
+NO_BALANCE = {'success': False, 'error_code': '51', 'error': 'Bakiye yetersiz'}
+BAD_HEADER = {'success': False, 'error_code': '40', 'error': 'Mesaj başlığı tanımlı değil'}
+
+
+class StubProvider:
+    """Sırayla verilen sonuçları döndüren sağlayıcı; sonuçlar bitince gönderim başarılı"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.sent = []
+
+    def send_sms(self, phone_number, message):
+        self.sent.append(phone_number)
+        return self.results.pop(0) if self.results else SENT
+
+
+def due_retry(phone_number='5321234567', **fields):
+    fields.setdefault('next_attempt_at', timezone.now() - timedelta(seconds=1))
+    return SMSRetry.objects.create(phone_number=phone_number, message='Test', **fields)
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES, SMS_RETRY_BASE_DELAY=30, SMS_RETRY_MAX_DELAY=3600,
+    SMS_RETRY_MAX_ATTEMPTS=3, SMS_RETRY_FAILURE_BREAKER=2, SMS_RETRY_LEASE_SECONDS=300,
+)
+class SMSRetryTests(TestCase):
+
+    def test_backoff_bounds(self):
+        for attempts, cap in ((1, 60), (3, 240), (10, 3600)):
+            with self.subTest(attempts=attempts):
+                delays = [sms_retry.backoff_delay(attempts) for _ in range(200)]
+                self.assertGreaterEqual(min(delays), 30)
+                self.assertLessEqual(max(delays), cap)
+
+    def test_enqueue_only_retryable(self):
+        self.assertTrue(sms_retry.is_retryable(DOWN))
+        self.assertTrue(sms_retry.is_retryable(NO_BALANCE))
+        self.assertFalse(sms_retry.is_retryable(BAD_HEADER))
+        self.assertFalse(sms_retry.is_retryable(SENT))
+
+        with self.assertLogs('school.sms_retry', 'INFO'):
+            retry = sms_retry.enqueue('5321234567', 'Test', DOWN)
+        self.assertEqual((retry.attempts, retry.last_error_code), (1, 'connection'))
+        self.assertGreater(retry.next_attempt_at, timezone.now())
+
+    def test_claim_leases_rows_once(self):
+        first, second = due_retry(), due_retry('5321234568')
+        due_retry('5321234569', next_attempt_at=timezone.now() + timedelta(hours=1))
+
+        claimed = sms_retry.claim_due(10)
+        self.assertEqual({retry.pk for retry in claimed}, {first.pk, second.pk})
+        self.assertTrue(all(retry.locked_until > timezone.now() for retry in claimed))
+        # Kilitli kayıtlar ikinci worker'a verilmez
+        self.assertEqual(sms_retry.claim_due(10), [])
+
+        # Kilit süresi dolan kayıt (çöken worker) yeniden kiralanır
+        SMSRetry.objects.filter(pk=first.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual([retry.pk for retry in sms_retry.claim_due(10)], [first.pk])
+
+    def test_claim_respects_batch_size(self):
+        for index in range(3):
+            due_retry(f'532123456{index}')
+        self.assertEqual(len(sms_retry.claim_due(2)), 2)
+        self.assertEqual(len(sms_retry.claim_due(2)), 1)
+
+    def test_failure_rescheduled_then_sent_after_recovery(self):
+        retry = due_retry()
+        provider = StubProvider(DOWN)
+
+        stats = sms_retry.process_due(provider)
+        self.assertEqual(stats, {'sent': 0, 'retried': 1, 'dead': 0, 'deferred': 0})
+        retry.refresh_from_db()
+        self.assertEqual((retry.attempts, retry.claim_token, retry.locked_until), (2, '', None))
+        self.assertGreater(retry.next_attempt_at, timezone.now())
+
+        # Sağlayıcı düzeldi
+        SMSRetry.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        stats = sms_retry.process_due(provider)
+        self.assertEqual(stats['sent'], 1)
+        self.assertFalse(SMSRetry.objects.exists())
+        self.assertEqual(provider.sent, ['5321234567', '5321234567'])
+
+    def test_breaker_defers_rest_of_batch(self):
+        for index in range(5):
+            due_retry(f'532123456{index}')
+        provider = StubProvider(DOWN, DOWN, DOWN)
+
+        with self.assertLogs('school.sms_retry', 'WARNING') as logs:
+            stats = sms_retry.process_due(provider)
+        self.assertEqual(stats, {'sent': 0, 'retried': 2, 'dead': 0, 'deferred': 3})
+        self.assertIn('3 SMS ertelendi', logs.output[0])
+        self.assertEqual(len(provider.sent), 2)
+        # Ertelenenlerin deneme hakkı yanmaz, kilidi bırakılır
+        deferred = SMSRetry.objects.filter(attempts=1)
+        self.assertEqual(deferred.count(), 3)
+        self.assertFalse(deferred.exclude(claim_token='').exists())
+        self.assertFalse(deferred.filter(next_attempt_at__lte=timezone.now()).exists())
+
+    def test_dead_letter_and_replay(self):
+        due_retry(attempts=2)
+        due_retry('5321234568')
+        with self.assertLogs('school.sms_retry', 'ERROR'):
+            stats = sms_retry.process_due(StubProvider(NO_BALANCE, BAD_HEADER))
+        # Son deneme hakkı ve kalıcı hata doğrudan dead-letter'a düşer
+        self.assertEqual(stats['dead'], 2)
+        self.assertFalse(SMSRetry.objects.exists())
+        dead = SMSDeadLetter.objects.order_by('phone_number')
+        self.assertEqual(
+            list(dead.values_list('attempts', 'last_error_code')),
+            [(3, '51'), (2, '40')]
+        )
+
+        self.assertEqual(sms_retry.replay_dead_letters(dead), 2)
+        # Aynı kayıt iki kez kuyruğa alınmaz
+        self.assertEqual(sms_retry.replay_dead_letters(SMSDeadLetter.objects.all()), 0)
+        self.assertEqual(SMSRetry.objects.filter(attempts=0).count(), 2)
+
+        stats = sms_retry.process_due(StubProvider())
+        self.assertEqual(stats['sent'], 2)
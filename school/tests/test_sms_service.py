@@ -0,0 +1,119 @@
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from school.sms_service import SMSProviderPool
+from school.tests.test_sms_retry import DOWN, SENT
+
+NO_BALANCE = {'success': False, 'error_code': '51', 'error': 'Bakiye yetersiz'}
+BAD_NUMBER = {'success': False, 'error_code': '60', 'error': 'Numara hatalı'}
+
+
+class StubProvider:
+    """SMS_PROVIDERS backend'i: verilen sonuçları sırayla döndürür, bitince başarılı"""
+
+    def __init__(self, username='stub', results=()):
+        self.username = username
+        self.results = list(results)
+        self.sent = []
+
+    def send_sms(self, phone_number, message):
+        self.sent.append(phone_number)
+        return self.results.pop(0) if self.results else SENT
+
+
+def provider(name, results=(), weight=1):
+    return {
+        'backend': 'school.tests.test_sms_service.StubProvider',
+        'name': name, 'username': name, 'results': results, 'weight': weight,
+    }
+
+
+@override_settings(SMS_PROVIDER_COOLDOWN=30, SMS_PROVIDER_MAX_COOLDOWN=100)
+class SMSProviderPoolTests(SimpleTestCase):
+
+    def setUp(self):
+        # Ağırlıklı seçim ayar sırasını korusun, saat test tarafından ilerletilsin
+        self.now = 1000.0
+        patches = [
+            mock.patch('school.sms_service.random.uniform', return_value=0),
+            mock.patch('school.sms_service.time.monotonic', side_effect=lambda: self.now),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def pool(self, *configs):
+        pool = SMSProviderPool(list(configs))
+        return pool, [entry['service'] for entry in pool.providers]
+
+    def send(self, pool):
+        return pool.send_sms('5321234567', 'Test')
+
+    def test_failover_and_cooldown(self):
+        pool, (first, second) = self.pool(provider('a', [DOWN]), provider('b'))
+        with self.assertLogs('school.sms_service', 'WARNING'):
+            self.assertTrue(self.send(pool)['success'])
+        self.assertEqual((len(first.sent), len(second.sent)), (1, 1))
+
+        # Devre dışı hesap sağlıklı hesap varken denenmez
+        self.send(pool)
+        self.assertEqual((len(first.sent), len(second.sent)), (1, 2))
+
+        # Süre dolunca tekrar kullanılır ve başarıda sayaç sıfırlanır
+        self.now += 30
+        self.send(pool)
+        self.assertEqual(len(first.sent), 2)
+        self.assertEqual((pool.providers[0]['failures'], pool.providers[0]['disabled_until']), (0, 0.0))
+
+    def test_message_errors_not_failed_over(self):
+        pool, (first, second) = self.pool(provider('a', [BAD_NUMBER]), provider('b'))
+        self.assertEqual(self.send(pool)['error_code'], '60')
+        self.assertEqual(second.sent, [])
+        self.assertEqual(pool.providers[0]['failures'], 0)
+
+    def test_outage_then_recovery(self):
+        pool, (first, second) = self.pool(
+            provider('a', [DOWN, DOWN]), provider('b', [NO_BALANCE, DOWN])
+        )
+        with self.assertLogs('school.sms_service', 'WARNING'):
+            self.assertEqual(self.send(pool)['error_code'], '51')
+
+        # Hiç sağlıklı hesap yokken sadece süresi en önce dolacak hesap denenir
+        self.now += 1
+        with self.assertLogs('school.sms_service', 'WARNING'):
+            self.assertFalse(self.send(pool)['success'])
+        self.assertEqual((len(first.sent), len(second.sent)), (2, 1))
+        # Art arda hatada bekleme süresi katlanır
+        self.assertEqual(pool.providers[0]['disabled_until'], self.now + 60)
+
+        self.now += 30
+        with self.assertLogs('school.sms_service', 'WARNING'):
+            self.assertFalse(self.send(pool)['success'])
+        self.assertEqual((len(first.sent), len(second.sent)), (2, 2))
+
+        # Sağlayıcı düzeldi
+        self.now += 100
+        self.assertTrue(self.send(pool)['success'])
+        self.assertTrue(self.send(pool)['success'])
+        self.assertEqual((len(first.sent), len(second.sent)), (4, 2))
+        self.assertEqual((pool.providers[0]['failures'], pool.providers[0]['disabled_until']), (0, 0.0))
+
+    def test_cooldown_capped(self):
+        pool, _ = self.pool(provider('a', [DOWN] * 4))
+        delays = []
+        with self.assertLogs('school.sms_service', 'WARNING'):
+            for _ in range(4):
+                self.send(pool)
+                delays.append(pool.providers[0]['disabled_until'] - self.now)
+                self.now = pool.providers[0]['disabled_until']
+        self.assertEqual(delays, [30, 60, 100, 100])
+
+    def test_zero_weight_is_standby(self):
+        pool, (standby, primary) = self.pool(provider('yedek', weight=0), provider('a'))
+        self.send(pool)
+        self.assertEqual((standby.sent, len(primary.sent)), ([], 1))
+
+    def test_requires_provider(self):
+        with self.assertRaises(ValueError):
+            SMSProviderPool([])
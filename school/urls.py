@@ -8,11 +8,21 @@ urlpatterns = [
     # QR kod sayfaları
     path('', views.qr_generator, name='teacher_qr'),  # Öğretmen QR paneli
     path('student-checkin/', views.student_checkin, name='student_checkin'),  # Öğrenci giriş-çıkış sayfası
+    path('qr-code.<str:fmt>', views.qr_code, name='qr_code'),  # QR kod görüntüsü (png/svg)
+    path('student-checkin/sw.js', views.checkin_service_worker, name='checkin_service_worker'),  # Çevrimdışı çalışma
+    path('kiosk/', views.kiosk, name='kiosk'),  # Giriş kapısı kiosk ekranı
     path('sms-test/', views.sms_test_page, name='sms_test_page'),  # SMS test sayfası
 
     # API endpoints
     path('attendance-toggle/', views.attendance_toggle, name='attendance_toggle'),  # Giriş/çıkış toggle
+    path('attendance-sync/', views.attendance_sync, name='attendance_sync'),  # Çevrimdışı okutmaların toplu gönderimi
+    path('checkin-token/', views.checkin_token, name='checkin_token'),  # Panel için süreli QR token'ları
+    path('roster/', views.roster_snapshot, name='roster_snapshot'),  # Sürümlü öğrenci listesi (tam/delta)
+    path('kiosk/presence/', views.kiosk_presence, name='kiosk_presence'),  # Bugün içeride olanlar
     path('student-status/<str:id_number>/', views.student_status, name='student_status'),  # Öğrenci durumu
     path('test-sms/', views.test_sms, name='test_sms'),  # SMS test
     path('sms-balance/', views.sms_balance, name='sms_balance'),  # SMS bakiye
+    path('metrics/', views.metrics, name='metrics'),  # SMS metrikleri
+    path('healthz', views.healthz, name='healthz'),  # Canlılık kontrolü
+    path('readyz', views.readyz, name='readyz'),  # Hazırlık kontrolü (DB, cache, NETGSM)
 ]
\ No newline at end of file
@@ -1,33 +1,71 @@
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from django.urls import reverse
+from django.templatetags.static import static
+from django.http import JsonResponse, HttpResponse, HttpResponseNotModified, Http404
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
 from django.conf import settings
+from django.db.models import OuterRef, Subquery
+from django.utils.cache import patch_vary_headers
 from .models import Student, Attendance
 from .sms_service import sms_service
+from . import metrics as sms_metrics
+from .conditional import etag_cached
+from .page_cache import cached_page
+from . import page_cache
+from . import qr
+from . import checkin_tokens
+from . import roster
+from . import api
+from . import health
+from . import sharding
+from .ratelimit import DEVICE_ID_RE, rate_limited
+import gzip
 import json
 import logging
+import math
+import re
+import time
+from datetime import datetime, timezone as dt_timezone
+from urllib.parse import parse_qs, urlencode, urlsplit, urlunsplit
 
 logger = logging.getLogger(__name__)
 
 # Create your views here.
+@cached_page
 def index(request):
     return render(request, 'school/index.html')
 
 def login(request):
     return render(request, 'auth/login.html')
 
+@cached_page
 def qr_generator(request):
     """QR kod oluşturucu sayfası - Öğretmenler için"""
-    return render(request, 'auth/qr.html')
+    return render(request, 'auth/qr.html', {
+        'qr_size': settings.QR_CODE_SIZE,
+        'qr_margin': settings.QR_CODE_MARGIN,
+    })
 
+@cached_page
 def student_checkin(request):
     """Öğrenci giriş-çıkış sayfası - QR kod okutunca açılan sayfa"""
     return render(request, 'auth/student_checkin.html')
 
+@cached_page
+def checkin_service_worker(request):
+    """Giriş-çıkış sayfasının service worker'ı (kapsamı /student-checkin/)"""
+    return render(request, 'auth/checkin_sw.js', {
+        'version': page_cache.cache_version(),
+        'shell_url': reverse('student_checkin'),
+        'static_url': settings.STATIC_URL,
+        'queue_js': static('js/checkin_queue.js'),
+    }, content_type='application/javascript; charset=utf-8')
+
 @csrf_exempt
 @require_http_methods(["POST"])
+@rate_limited('attendance_toggle')
 def attendance_toggle(request):
     """QR kod ile öğrenci giriş/çıkış toggle endpoint'i"""
     try:
@@ -36,28 +74,48 @@ def attendance_toggle(request):
         id_number = data.get('id_number')
         
         if not id_number:
-            return JsonResponse({
+            return api.response(request, {
                 'status': 'error',
                 'message': 'TC kimlik numarası gerekli'
             }, status=400)
         
         # TC kimlik numarası formatını kontrol et
         if not id_number.isdigit() or len(id_number) != 11:
-            return JsonResponse({
+            return api.response(request, {
                 'status': 'error',
                 'message': 'Geçersiz TC kimlik numarası formatı'
             }, status=400)
         
-        # Öğrenciyi TC kimlik numarasından bul
+        # QR token'ı: imza ve zaman penceresiyle doğrulanır (sorgu yapılmaz)
+        scope = None
+        token = data.get('token')
+        if token or settings.CHECKIN_TOKEN_REQUIRED:
+            try:
+                scope = checkin_tokens.verify_token(token)
+            except checkin_tokens.InvalidToken as e:
+                return api.response(request, {
+                    'status': 'error',
+                    'message': str(e),
+                    'code': 'invalid_token'
+                }, status=403)
+        
+        # Öğrenciyi TC kimlik numarasından bul (okulunun veritabanında)
         try:
-            student = Student.objects.get(id_number=id_number, is_active=True)
+            student = Student.objects.using(sharding.db_for_id_number(id_number)).get(id_number=id_number, is_active=True)
         except Student.DoesNotExist:
-            return JsonResponse({
+            return api.response(request, {
                 'status': 'error',
                 'message': 'Bu TC kimlik numarasına ait aktif öğrenci bulunamadı',
                 'id_number': id_number
             }, status=404)
         
+        if scope and not checkin_tokens.scope_matches(scope, student):
+            return api.response(request, {
+                'status': 'error',
+                'message': 'Bu QR kodu öğrencinin okuluna/sınıfına ait değil',
+                'code': 'wrong_scope'
+            }, status=403)
+        
         # Giriş/çıkış toggle işlemi
         attendance = Attendance.toggle_attendance(student)
         
@@ -67,17 +125,16 @@ def attendance_toggle(request):
             try:
                 sms_result = sms_service.send_attendance_notification(student, attendance)
                 if sms_result['success']:
-                    logger.info(f"SMS başarıyla gönderildi: {student.full_name}")
+                    logger.info("SMS başarıyla gönderildi: öğrenci #%s", student.pk)
                 else:
-                    logger.warning(f"SMS gönderim hatası: {sms_result['error']}")
+                    logger.warning("SMS gönderim hatası: %s", sms_result['error'])
             except Exception as e:
-                logger.error(f"SMS gönderim exception: {str(e)}")
+                logger.exception("SMS gönderim exception: %s", e)
                 sms_result = {'success': False, 'error': str(e)}
         
-        # Son durumu kontrol et
-        last_entry = Attendance.get_last_entry(student)
-        current_status = 'içeride' if last_entry and last_entry.entry_type == 'entry' else 'dışarıda'
-        
+        # Son durum: az önce oluşturulan kayıt öğrencinin son kaydıdır
+        current_status = 'içeride' if attendance.entry_type == 'entry' else 'dışarıda'
+
         # Başarılı yanıt
         response_data = {
             'status': 'success',
@@ -102,37 +159,249 @@ def attendance_toggle(request):
             'processed_at': timezone.now().isoformat()
         }
         
-        return JsonResponse(response_data)
+        return api.response(request, response_data)
         
     except json.JSONDecodeError:
-        return JsonResponse({
+        return api.response(request, {
             'status': 'error',
             'message': 'Geçersiz JSON formatı'
         }, status=400)
     
     except Exception as e:
-        return JsonResponse({
+        return api.response(request, {
             'status': 'error',
             'message': f'Sunucu hatası: {str(e)}'
         }, status=500)
 
+# Çevrimdışı okutma kimliği (istemcide crypto.randomUUID ile üretilir)
+CLIENT_ID_RE = re.compile(r'^[A-Za-z0-9_-]{8,36}$')
+
+def _staff_device(request):
+    """
+    İstek personel oturumlu bir cihazdan mı (kiosk)
+
+    Oturum çerezi tek başına yetmez; tarayıcı özel başlığı sadece aynı
+    kaynaktan gönderdiği için X-Device-Id başka sitenin sahte isteğini ayırır.
+    """
+    return (
+        request.user.is_authenticated and request.user.is_staff
+        and bool(DEVICE_ID_RE.match(request.headers.get('X-Device-Id', '')))
+    )
+
+def _check_scan(scan, student, now, staff_device=False):
+    """Tek okutmayı doğrula; (hata mesajı, hata kodu, okutma zamanı) döndürür"""
+    id_number = scan.get('id_number')
+    if not isinstance(id_number, str) or not id_number.isdigit() or len(id_number) != 11:
+        return 'Geçersiz TC kimlik numarası formatı', None, None
+    
+    client_time = scan.get('client_time')
+    if not isinstance(client_time, (int, float)) or isinstance(client_time, bool):
+        return 'Okutma zamanı gerekli', None, None
+    # json.loads NaN/Infinity kabul eder
+    if not math.isfinite(client_time):
+        return 'Okutma zamanı geçersiz', None, None
+    # İstemci saati ileride olabilir; gelecekteki zamanlar şimdiye çekilir
+    scanned_at = min(client_time / 1000, now)
+    if scanned_at < now - settings.ATTENDANCE_SYNC_MAX_AGE:
+        return 'Okutma çok eski, kaydedilmedi', None, None
+    
+    # Token sunucu saatine göre doğrulanır; istemci zamanı değiştirilebildiği için
+    # çevrimdışı bekleme payı sınırlıdır (ATTENDANCE_SYNC_TOKEN_GRACE). Personel
+    # oturumlu kiosk okutmaları ATTENDANCE_SYNC_MAX_AGE boyunca kabul edilir;
+    # uzun kesintide token'sız kalan okutmaları da cihazın oturumu doğrular.
+    token = scan.get('token')
+    scope = None
+    if token or (settings.CHECKIN_TOKEN_REQUIRED and not staff_device):
+        if staff_device:
+            max_age = settings.ATTENDANCE_SYNC_MAX_AGE
+        else:
+            max_age = settings.CHECKIN_TOKEN_MAX_AGE + settings.ATTENDANCE_SYNC_TOKEN_GRACE
+        try:
+            scope = checkin_tokens.verify_token(token, now=now, max_age=max_age)
+        except checkin_tokens.InvalidToken as e:
+            return str(e), 'invalid_token', None
+        # QR kodu okutmadan önce var olamaz (panel bir sonraki kodu önceden alır)
+        if scanned_at < scope['valid_from'] - settings.CHECKIN_TOKEN_PERIOD:
+            return 'Okutma zamanı QR kodunun geçerlilik süresiyle uyuşmuyor', 'invalid_token', None
+    
+    if student is None:
+        return 'Bu TC kimlik numarasına ait aktif öğrenci bulunamadı', None, None
+    if scope and not checkin_tokens.scope_matches(scope, student):
+        return 'Bu QR kodu öğrencinin okuluna/sınıfına ait değil', None, None
+    
+    return None, None, datetime.fromtimestamp(scanned_at, tz=dt_timezone.utc)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+@rate_limited('attendance_sync')
+def attendance_sync(request):
+    """
+    Çevrimdışı biriken okutmaları toplu uygula
+    
+    Okutmalar istemci zamanına göre sıralanıp tek transaction'da işlenir.
+    Her okutmanın sonucu ayrı döner; hatalı olanlar partinin geri kalanını
+    engellemez. Aynı parti tekrar gönderilirse kayıtlar "duplicate" döner.
+    """
+    try:
+        data = json.loads(request.body) if request.body else {}
+        scans = data.get('scans') if isinstance(data, dict) else None
+        
+        if not isinstance(scans, list) or not scans:
+            return api.response(request, {
+                'status': 'error',
+                'message': 'Okutma listesi gerekli'
+            }, status=400)
+        
+        if len(scans) > settings.ATTENDANCE_SYNC_MAX_BATCH:
+            return api.response(request, {
+                'status': 'error',
+                'message': f'Tek istekte en fazla {settings.ATTENDANCE_SYNC_MAX_BATCH} okutma gönderilebilir'
+            }, status=400)
+        
+        # Kimliği geçersiz okutmalar da hata sonucu alır; istemci kuyruğunda kalıp
+        # her senkronizasyonda tekrar gönderilmesin
+        invalid = []
+        checked = []
+        for scan in scans:
+            client_id = scan.get('id') if isinstance(scan, dict) else None
+            if client_id is not None and CLIENT_ID_RE.match(str(client_id)):
+                checked.append(scan)
+            else:
+                invalid.append({
+                    'id': client_id if isinstance(client_id, (str, int)) else None,
+                    'status': 'error',
+                    'message': 'Geçersiz okutma kimliği',
+                    'code': 'invalid_id',
+                })
+        scans = checked
+        
+        # Partideki tüm öğrenciler veritabanı başına tek sorguda
+        students = sharding.students_by_id_number(
+            {scan.get('id_number') for scan in scans if isinstance(scan.get('id_number'), str)},
+            Student.objects.filter(is_active=True).select_related('school', 'classroom')
+        )
+        
+        now = time.time()
+        staff_device = _staff_device(request)
+        results = {}
+        valid = []
+        for scan in scans:
+            student = students.get(scan.get('id_number'))
+            error, code, scanned_at = _check_scan(scan, student, now, staff_device)
+            if error:
+                results[scan['id']] = {'id': scan['id'], 'status': 'error', 'message': error}
+                if code:
+                    # İstemci token hatalı okutmaları silmez, incelemeye ayırır
+                    results[scan['id']]['code'] = code
+            else:
+                valid.append((scan['id'], student, scanned_at))
+        
+        # Okutmalar öğrencinin veritabanında uygulanır; her veritabanı kendi kilidiyle
+        by_db = {}
+        for scan in valid:
+            by_db.setdefault(scan[1]._state.db, []).append(scan)
+        
+        created = {}
+        sms_results = {}
+        for group in by_db.values():
+            group_created = Attendance.apply_scans(group)
+            created.update(group_created)
+            
+            # SMS bildirimleri commit sonrası, kardeşler tek SMS'te
+            if group_created and getattr(settings, 'SMS_ENABLED', True):
+                try:
+                    group_results = sms_service.send_grouped_notifications(list(group_created.values()))
+                    sms_results.update({
+                        client_id: group_results.get(attendance.pk)
+                        for client_id, attendance in group_created.items()
+                    })
+                except Exception as e:
+                    logger.exception("Toplu SMS gönderim exception: %s", e)
+        
+        for client_id, student, _ in valid:
+            attendance = created.get(client_id)
+            if attendance is None:
+                results[client_id] = {'id': client_id, 'status': 'duplicate', 'message': 'Bu okutma daha önce kaydedildi'}
+                continue
+            
+            sms_result = sms_results.get(client_id)
+            results[client_id] = {
+                'id': client_id,
+                'status': 'created',
+                'message': f'İşlem başarılı! {attendance.get_entry_type_display()} kaydedildi.',
+                'entry_type': attendance.entry_type,
+                'entry_type_display': attendance.get_entry_type_display(),
+                'timestamp': attendance.timestamp.isoformat(),
+                'sms_sent': bool(sms_result and sms_result['success']),
+            }
+        
+        logger.info("Çevrimdışı senkronizasyon: %s okutma, %s yeni kayıt", len(scans), len(created))
+        
+        return api.response(request, {
+            'status': 'success',
+            'created': len(created),
+            'results': list(results.values()) + invalid,
+            'processed_at': timezone.now().isoformat()
+        })
+        
+    except json.JSONDecodeError:
+        return api.response(request, {
+            'status': 'error',
+            'message': 'Geçersiz JSON formatı'
+        }, status=400)
+    
+    except Exception as e:
+        logger.exception("Çevrimdışı senkronizasyon hatası: %s", e)
+        return api.response(request, {
+            'status': 'error',
+            'message': f'Sunucu hatası: {str(e)}'
+        }, status=500)
+
+def student_status_etag(request, id_number):
+    """
+    Öğrenci durumunun ETag'i: tek indeksli sorgu (öğrenci + son yoklama id'si)
+
+    Gün değişince bugünün kayıtları sıfırlandığı için tarih de dahil edilir.
+    """
+    if not id_number.isdigit() or len(id_number) != 11:
+        return None
+    
+    last_attendance = Attendance.objects.filter(student=OuterRef('pk')).order_by('-timestamp')
+    students = Student.objects.using(sharding.db_for_id_number(id_number))
+    row = students.filter(id_number=id_number, is_active=True).annotate(
+        last_attendance_id=Subquery(last_attendance.values('pk')[:1])
+    ).values_list(
+        'pk', 'updated_at', 'school__updated_at', 'classroom__updated_at', 'last_attendance_id'
+    ).order_by('pk').first()
+    if row is None:
+        return None
+    
+    pk, updated_at, school_updated_at, classroom_updated_at, last_attendance_id = row
+    changed = max(updated_at, school_updated_at, classroom_updated_at)
+    return f'{pk}-{last_attendance_id or 0}-{timezone.now().date().isoformat()}-{changed.timestamp():.6f}'
+
 @csrf_exempt
 @require_http_methods(["GET"])
+@rate_limited('student_status')
+@etag_cached(student_status_etag)
 def student_status(request, id_number):
     """Öğrencinin mevcut durumunu getir"""
     try:
         # TC kimlik numarası formatını kontrol et
         if not id_number.isdigit() or len(id_number) != 11:
-            return JsonResponse({
+            return api.response(request, {
                 'status': 'error',
                 'message': 'Geçersiz TC kimlik numarası formatı'
             }, status=400)
         
-        # Öğrenciyi bul
+        # Öğrenciyi bul (okul/sınıf adı istendiyse aynı sorguda)
+        students = Student.objects.using(sharding.db_for_id_number(id_number))
+        if api.wants(request, 'student'):
+            students = students.select_related('school', 'classroom')
         try:
-            student = Student.objects.get(id_number=id_number, is_active=True)
+            student = students.get(id_number=id_number, is_active=True)
         except Student.DoesNotExist:
-            return JsonResponse({
+            return api.response(request, {
                 'status': 'error',
                 'message': 'Öğrenci bulunamadı',
                 'id_number': id_number
@@ -150,41 +419,44 @@ def student_status(request, id_number):
             last_action = 'Henüz giriş yapılmamış'
             last_time = None
         
-        # Bugünün giriş/çıkış geçmişi
-        today = timezone.now().date()
-        today_entries = Attendance.objects.filter(
-            student=student, 
-            date=today
-        ).order_by('-timestamp')
-        
-        entries_today = [
-            {
-                'entry_type': entry.entry_type,
-                'entry_type_display': entry.get_entry_type_display(),
-                'timestamp': entry.timestamp.isoformat(),
-            }
-            for entry in today_entries
-        ]
-        
         response_data = {
             'status': 'success',
-            'student': {
-                'id_number': student.id_number,
-                'full_name': student.full_name,
-                'school': student.school.name,
-                'classroom': str(student.classroom),
-            },
             'current_status': current_status,
             'last_action': last_action,
             'last_time': last_time,
-            'entries_today': entries_today,
-            'entries_count_today': len(entries_today)
         }
-        
-        return JsonResponse(response_data)
+
+        if api.wants(request, 'student'):
+            response_data['student'] = {
+                'id_number': student.id_number,
+                'full_name': student.full_name,
+                'school': student.school.name,
+                'classroom': str(student.classroom),
+            }
+
+        # Bugünün giriş/çıkış geçmişi (istenmediyse sorgulanmaz)
+        if api.wants(request, 'entries_today') or api.wants(request, 'entries_count_today'):
+            today = timezone.now().date()
+            today_entries = Attendance.objects.using(student._state.db).filter(
+                student=student,
+                date=today
+            ).order_by('-timestamp')
+
+            entries_today = [
+                {
+                    'entry_type': entry.entry_type,
+                    'entry_type_display': entry.get_entry_type_display(),
+                    'timestamp': entry.timestamp.isoformat(),
+                }
+                for entry in today_entries
+            ]
+            response_data['entries_today'] = entries_today
+            response_data['entries_count_today'] = len(entries_today)
+
+        return api.response(request, response_data)
         
     except Exception as e:
-        return JsonResponse({
+        return api.response(request, {
             'status': 'error',
             'message': f'Sunucu hatası: {str(e)}'
         }, status=500)
@@ -223,13 +495,19 @@ def test_sms(request):
 def sms_balance(request):
     """SMS bakiye sorgulama"""
     try:
-        result = sms_service.netgsm.get_balance()
+        # Önbellekteki son bakiye hemen döner, eskiyse arka planda yenilenir
+        result = sms_service.netgsm.balance.get()
         
         return JsonResponse({
             'status': 'success' if result['success'] else 'error',
             'balance': result.get('balance', 0),
+            'last_known_balance': result.get('last_known_balance'),
             'currency': result.get('currency', 'TL'),
-            'message': result.get('error', 'Bakiye başarıyla sorgulandı')
+            'age_seconds': result.get('age_seconds'),
+            'stale': result.get('stale', True),
+            'low_balance': result.get('low_balance', False),
+            'pending': result.get('pending', False),
+            'message': result.get('error') or 'Bakiye başarıyla sorgulandı'
         })
         
     except Exception as e:
@@ -238,6 +516,217 @@ def sms_balance(request):
             'message': f'Bakiye sorgulama hatası: {str(e)}'
         }, status=500)
 
+@require_http_methods(["GET"])
+def metrics(request):
+    """SMS metrikleri (Prometheus metin formatı, tüm worker'lar toplamı)"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token:
+        if request.headers.get('Authorization') != f'Bearer {token}':
+            return HttpResponse('Yetkisiz erişim\n', status=401, content_type='text/plain')
+    else:
+        # Token tanımlı değilse sadece personel görebilir
+        denied = _staff_only(request, 'Metrikleri görmek için personel girişi gerekli', request.path)
+        if denied:
+            return denied
+    
+    return HttpResponse(
+        sms_metrics.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+@require_http_methods(["GET", "HEAD"])
+def healthz(request):
+    """Canlılık kontrolü: süreç istek karşılıyor (bağımlılıklara bakılmaz)"""
+    response = api.response(request, {'status': 'ok'})
+    response['Cache-Control'] = 'no-store'
+    return response
+
+@require_http_methods(["GET", "HEAD"])
+def readyz(request):
+    """Hazırlık kontrolü: veritabanı, cache ve NETGSM durumu eşikleriyle (kritik hata 503)"""
+    result = health.readiness()
+    response = api.response(request, result, status=503 if result['status'] == 'fail' else 200)
+    response['Cache-Control'] = 'no-store'
+    return response
+
+def _staff_only(request, message, next_url):
+    """Personel girişi yoksa 403 JSON yanıtı (giriş adresiyle), varsa None"""
+    if request.user.is_authenticated and request.user.is_staff:
+        return None
+    return JsonResponse({
+        'status': 'error',
+        'message': message,
+        'login_url': f"{reverse('admin:login')}?next={next_url}"
+    }, status=403)
+
+def _scope_params(request):
+    """?school= / ?classroom= parametreleri; geçersizse ValueError"""
+    school_id = request.GET.get('school', '')
+    classroom_id = request.GET.get('classroom', '')
+    if not (school_id or '0').isdigit() or not (classroom_id or '0').isdigit():
+        raise ValueError('Geçersiz okul veya sınıf')
+    return int(school_id or 0) or None, int(classroom_id or 0) or None
+
+@require_http_methods(["GET"])
+def checkin_token(request):
+    """Öğretmen paneli ve kiosk için sıradaki giriş-çıkış token'ları (sadece yetkili personel)"""
+    forbidden = _staff_only(request, 'QR kodu göstermek için personel girişi gerekli', reverse('teacher_qr'))
+    if forbidden:
+        return forbidden
+
+    try:
+        school_id, classroom_id = _scope_params(request)
+    except ValueError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
+
+    scope = checkin_tokens.scope_for(school_id=school_id, classroom_id=classroom_id)
+    response = JsonResponse({'status': 'success', **checkin_tokens.schedule(scope)})
+    response['Cache-Control'] = 'private, no-store'
+    return response
+
+@cached_page
+def kiosk(request):
+    """Giriş kapısı kiosk ekranı - sürekli okutma için"""
+    return render(request, 'auth/kiosk.html', {
+        'repeat_seconds': settings.KIOSK_REPEAT_SECONDS,
+        'max_in_flight': settings.KIOSK_MAX_IN_FLIGHT,
+        'batch_size': settings.ATTENDANCE_SYNC_MAX_BATCH,
+    })
+
+@require_http_methods(["GET"])
+def roster_snapshot(request):
+    """
+    Okulun aktif öğrenci listesi (sadece yetkili personel)
+    
+    ?school=<id> tam listeyi, ?since=<sürüm> eklenirse o sürümden sonra
+    değişen ve çıkarılan öğrencileri döner. İçerik gzip'li hazırlanır;
+    kiosk TC numaralarını bu listeden yerel olarak doğrular.
+    """
+    forbidden = _staff_only(request, 'Öğrenci listesi için personel girişi gerekli', reverse('kiosk'))
+    if forbidden:
+        return forbidden
+
+    school_id = request.GET.get('school', '')
+    since = request.GET.get('since', '')
+    if not school_id.isdigit() or (since and not since.isdigit()):
+        return JsonResponse({
+            'status': 'error',
+            'message': 'Okul ve sürüm numarası sayı olmalı'
+        }, status=400)
+
+    version, full, content = roster.snapshot(int(school_id), int(since) if since else None)
+
+    etag = f'W/"roster-{school_id}-{version}-{"full" if full else since}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+    elif 'gzip' in request.headers.get('Accept-Encoding', ''):
+        response = HttpResponse(content, content_type='application/json')
+        response['Content-Encoding'] = 'gzip'
+    else:
+        response = HttpResponse(gzip.decompress(content), content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+@require_http_methods(["GET"])
+def kiosk_presence(request):
+    """Bugün içeride olan öğrencilerin TC numaraları (kiosk giriş/çıkış tahmini için)"""
+    forbidden = _staff_only(request, 'Kiosk için personel girişi gerekli', reverse('kiosk'))
+    if forbidden:
+        return forbidden
+
+    try:
+        school_id, classroom_id = _scope_params(request)
+    except ValueError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e)
+        }, status=400)
+
+    today = timezone.localdate()
+    # Okul seçiliyse sadece onun veritabanı, değilse hepsi sorgulanır
+    aliases = [sharding.db_for_school(school_id)] if school_id else sharding.databases()
+    last = {}
+    for alias in aliases:
+        attendances = sharding.home_filter(
+            Attendance.objects.using(alias).filter(date=today), alias, field='student__school_id'
+        )
+        if school_id:
+            attendances = attendances.filter(student__school_id=school_id)
+        if classroom_id:
+            attendances = attendances.filter(student__classroom_id=classroom_id)
+
+        # Zaman sırasıyla gezilir; her öğrencinin son kaydı kalır
+        last.update(attendances.order_by('timestamp').values_list('student__id_number', 'entry_type'))
+    response = api.response(request, {
+        'status': 'success',
+        'date': today.isoformat(),
+        'inside': [id_number for id_number, entry_type in last.items() if entry_type == 'entry'],
+    })
+    response['Cache-Control'] = 'private, no-store'
+    return response
+
+def _int_param(request, name, default, low, high):
+    value = request.GET.get(name, '')
+    if not value:
+        return default
+    if not value.isdigit() or not low <= int(value) <= high:
+        raise ValueError(f'{name} {low}-{high} arasında olmalı')
+    return int(value)
+
+def _checkin_qr_url(request, url):
+    """
+    QR'a kodlanacak giriş-çıkış adresini doğrula ve normalize et
+
+    Sadece bu sitenin /student-checkin/?t=<geçerli token> adresleri kabul
+    edilir; endpoint genel amaçlı QR servisi olarak kullanılamaz ve fazladan
+    sorgu parametreleriyle cache'e yeni kayıt yazdırılamaz.
+    """
+    parts = urlsplit(url)
+    query = parse_qs(parts.query, keep_blank_values=True)
+    if (
+        parts.scheme not in ('http', 'https') or parts.netloc != request.get_host()
+        or parts.path != reverse('student_checkin') or parts.fragment
+        or list(query) != ['t'] or len(query['t']) != 1
+    ):
+        raise ValueError('Geçersiz URL')
+    token = query['t'][0]
+    try:
+        checkin_tokens.verify_token(token)
+    except checkin_tokens.InvalidToken as e:
+        raise ValueError(str(e))
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode({'t': token}), ''))
+
+@require_http_methods(["GET", "HEAD"])
+@rate_limited('qr_code')
+def qr_code(request, fmt):
+    """QR kod görüntüsü (PNG/SVG) - harici servis yerine sunucuda üretilir"""
+    if fmt not in qr.FORMATS:
+        raise Http404
+
+    try:
+        data = _checkin_qr_url(request, request.GET.get('url', ''))
+        size = _int_param(request, 'size', settings.QR_CODE_SIZE, 64, 1024)
+        margin = _int_param(request, 'margin', settings.QR_CODE_MARGIN, 0, 10)
+    except ValueError as error:
+        return JsonResponse({
+            'status': 'error',
+            'message': str(error)
+        }, status=400)
+
+    etag = f'"{qr.image_etag(data, fmt, size, margin)}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(qr.get_image(data, fmt, size, margin), content_type=qr.FORMATS[fmt])
+    response['ETag'] = etag
+    response['Cache-Control'] = f'public, max-age={settings.QR_CODE_CACHE_TIMEOUT}'
+    return response
+
 def logout(request):
     pass
 
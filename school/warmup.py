@@ -0,0 +1,82 @@
+"""
+Worker açılışında ısınma
+PythonAnywhere worker'ları sık yeniden başlatır; URL çözücü, şablon
+derlemesi ve veritabanı bağlantısı normalde ilk istekte hazırlanır ve o
+istek yavaş görünür. WSGI dosyası uygulamayı oluşturduktan sonra warmup()
+çağırarak bu işleri istek gelmeden yapar:
+
+    application = get_wsgi_application()
+    warmup()
+
+Ağır servisler (SMS, Pillow) burada yüklenmez; ilk kullanımda oluşurlar.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.template.loader import get_template
+from django.urls import get_resolver, reverse
+
+logger = logging.getLogger(__name__)
+
+# Sık açılan sayfalar; derlenmiş halleri süreç belleğinde (cached loader) tutulur
+WARMUP_TEMPLATES = (
+    'auth/qr.html',
+    'auth/student_checkin.html',
+    'auth/checkin_sw.js',
+    'auth/kiosk.html',
+)
+
+
+def warmup():
+    """URL'leri, şablonları, veritabanı ve cache bağlantısını hazırla; süreyi (sn) döndür"""
+    if not settings.WARMUP_ENABLED:
+        return None
+
+    started = time.perf_counter()
+    steps = (
+        ('urls', _warm_urls),
+        ('templates', _warm_templates),
+        ('database', _warm_database),
+        ('cache', _warm_cache),
+    )
+    for name, step in steps:
+        try:
+            step()
+        except Exception as e:
+            # Isınma hatası sunucunun açılmasını engellememeli
+            logger.warning("Isınma adımı başarısız (%s): %s", name, e)
+
+    elapsed = time.perf_counter() - started
+    logger.info("Isınma tamamlandı: %.1f ms", elapsed * 1000)
+    return elapsed
+
+
+def _warm_urls():
+    # URL listesini ve view modüllerini yükler, ters çözüm tablosunu doldurur
+    get_resolver().url_patterns
+    reverse('student_checkin')
+
+
+def _warm_templates():
+    for name in WARMUP_TEMPLATES:
+        get_template(name)
+
+
+def _warm_database():
+    # Veritabanı sürücüsü ve bağlantı ayarları (PRAGMA'lar) yüklenir. Bağlantı
+    # kapatılır: uWSGI worker'ları bu süreçten fork edebilir ve SQLite
+    # bağlantısı süreçler arasında paylaşılmamalıdır.
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    finally:
+        connection.close()
+
+
+def _warm_cache():
+    # SQLiteCache bağlantısı fork sonrası süreç kimliğiyle yeniden açılır
+    cache.get('warmup')
@@ -0,0 +1,183 @@
+// Çevrimdışı okutma kuyruğu (IndexedDB)
+// Sayfa ve service worker aynı kuyruğu kullanır. Okutmalar istemci
+// zamanıyla saklanır, bağlantı gelince partiler halinde /attendance-sync/
+// adresine gönderilir. Her okutmanın kimliği olduğu için aynı parti iki
+// kez gönderilse de sunucu bir kez kaydeder. Token'ı kabul edilmeyen okutmalar
+// silinmez, "incelenmeli" deposuna ayrılır (personel oturumuyla yeniden gönderilir).
+const CheckinQueue = {
+    DB_NAME: 'checkin',
+    STORE: 'scans',
+    REVIEW_STORE: 'review',
+    SYNC_URL: '/attendance-sync/',
+    SYNC_TAG: 'checkin-sync',
+    BATCH_SIZE: 200,
+    DEVICE_KEY: 'checkin_device_id',
+
+    flushing: null,
+    device: null,
+
+    newId() {
+        if (self.crypto && self.crypto.randomUUID) {
+            return self.crypto.randomUUID();
+        }
+        return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2, 12)}`;
+    },
+
+    // Sunucudaki cihaz başına istek sınırı için kalıcı kimlik.
+    // Service worker'da localStorage yoktur; orada sadece IP sınırı uygulanır.
+    deviceId() {
+        if (this.device || typeof localStorage === 'undefined') return this.device;
+        try {
+            this.device = localStorage.getItem(this.DEVICE_KEY);
+            if (!this.device) {
+                this.device = this.newId();
+                localStorage.setItem(this.DEVICE_KEY, this.device);
+            }
+        } catch (error) {
+            this.device = this.device || this.newId();
+        }
+        return this.device;
+    },
+
+    headers(extra = {}) {
+        const device = this.deviceId();
+        return device ? { ...extra, 'X-Device-Id': device } : extra;
+    },
+
+    open() {
+        return new Promise((resolve, reject) => {
+            const request = indexedDB.open(this.DB_NAME, 2);
+            request.onupgradeneeded = () => {
+                const db = request.result;
+                if (!db.objectStoreNames.contains(this.STORE)) {
+                    const store = db.createObjectStore(this.STORE, { keyPath: 'id' });
+                    store.createIndex('client_time', 'client_time');
+                }
+                if (!db.objectStoreNames.contains(this.REVIEW_STORE)) {
+                    db.createObjectStore(this.REVIEW_STORE, { keyPath: 'id' });
+                }
+            };
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+    },
+
+    async transaction(mode, work, stores = [this.STORE]) {
+        const db = await this.open();
+        return new Promise((resolve, reject) => {
+            const tx = db.transaction(stores, mode);
+            const request = work(...stores.map(name => tx.objectStore(name)));
+            tx.oncomplete = () => {
+                db.close();
+                resolve(request ? request.result : undefined);
+            };
+            tx.onerror = tx.onabort = () => {
+                db.close();
+                reject(tx.error);
+            };
+        });
+    },
+
+    add(scan) {
+        return this.transaction('readwrite', store => store.put(scan));
+    },
+
+    count() {
+        return this.transaction('readonly', store => store.count());
+    },
+
+    // En eski okutmalar önce
+    oldest(limit) {
+        return this.transaction('readonly', store => store.index('client_time').getAll(null, limit));
+    },
+
+    remove(ids) {
+        return this.transaction('readwrite', store => {
+            ids.forEach(id => store.delete(id));
+        });
+    },
+
+    // Sunucu sonuçlarını uygula: token hatası alanlar incelemeye ayrılır, diğerleri silinir.
+    // Uzun kesintide süresi dolan token'lı okutmalar böylece kaybolmaz.
+    settle(results) {
+        return this.transaction('readwrite', (scans, review) => {
+            results.forEach(result => {
+                if (result.id === null || result.id === undefined) {
+                    return;  // Kimliği okunamayan okutma; kuyrukta karşılığı yok
+                }
+                if (result.status !== 'error' || result.code !== 'invalid_token') {
+                    scans.delete(result.id);
+                    return;
+                }
+                const request = scans.get(result.id);
+                request.onsuccess = () => {
+                    if (request.result) {
+                        review.put({ ...request.result, error: result.message });
+                    }
+                    scans.delete(result.id);
+                };
+            });
+        }, [this.STORE, this.REVIEW_STORE]);
+    },
+
+    reviewCount() {
+        return this.transaction('readonly', review => review.count(), [this.REVIEW_STORE]);
+    },
+
+    discardReview(ids) {
+        return this.transaction('readwrite', review => {
+            ids.forEach(id => review.delete(id));
+        }, [this.REVIEW_STORE]);
+    },
+
+    // İncelenecek okutmaları tekrar gönderim kuyruğuna al (personel oturumlu kiosk açılışı)
+    requeue() {
+        return this.transaction('readwrite', (scans, review) => {
+            const request = review.getAll();
+            request.onsuccess = () => {
+                request.result.forEach(({ error, ...scan }) => scans.put(scan));
+                review.clear();
+            };
+        }, [this.STORE, this.REVIEW_STORE]);
+    },
+
+    // Kuyruğu boşalt; okutma kimliği -> sunucu sonucu döner.
+    // Bağlantı yoksa hata fırlatır (service worker sync'i daha sonra tekrar dener).
+    flush() {
+        if (this.flushing) return this.flushing;
+
+        this.flushing = (async () => {
+            const results = {};
+            try {
+                for (;;) {
+                    const batch = await this.oldest(this.BATCH_SIZE);
+                    if (batch.length === 0) break;
+
+                    const response = await fetch(this.SYNC_URL, {
+                        method: 'POST',
+                        headers: this.headers({ 'Content-Type': 'application/json' }),
+                        credentials: 'same-origin',
+                        body: JSON.stringify({ scans: batch })
+                    });
+                    if (!response.ok) {
+                        const error = new Error(`Senkronizasyon hatası: ${response.status}`);
+                        // İstek sınırında sunucunun bildirdiği süre beklenir
+                        error.retryAfter = Number(response.headers.get('Retry-After')) || null;
+                        throw error;
+                    }
+
+                    // Kaydedilen, daha önce kaydedilmiş ve kalıcı hatalı okutmalar kuyruktan çıkar
+                    const data = await response.json();
+                    data.results.forEach(result => { results[result.id] = result; });
+                    await this.settle(data.results);
+
+                    if (data.results.length === 0) break;
+                }
+            } finally {
+                this.flushing = null;
+            }
+            return results;
+        })();
+        return this.flushing;
+    }
+};
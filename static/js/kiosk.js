@@ -0,0 +1,366 @@
+class GateKiosk {
+    constructor() {
+        this.app = document.getElementById('kioskApp');
+        this.input = document.getElementById('kioskInput');
+        this.result = document.getElementById('kioskResult');
+        this.action = document.getElementById('kioskAction');
+        this.name = document.getElementById('kioskName');
+        this.detail = document.getElementById('kioskDetail');
+        this.recentList = document.getElementById('kioskRecent');
+        this.status = document.getElementById('kioskStatus');
+
+        this.repeatMs = Number(this.app.dataset.repeatSeconds) * 1000;
+        this.maxInFlight = Number(this.app.dataset.maxInFlight);
+        this.batchSize = Number(this.app.dataset.batchSize);
+
+        // TC -> [ad soyad, sınıf] ve sunucudaki sürümü; bugün içeride olanlar; son okutma zamanları
+        this.schoolId = new URLSearchParams(window.location.search).get('school');
+        this.roster = new Map();
+        this.rosterVersion = null;
+        this.inside = new Set();
+        this.lastScan = new Map();
+
+        // Sunucuya gönderilmeyi bekleyen okutmalar ve yerel kayıt sözleri
+        this.pending = [];
+        this.inFlight = 0;
+        this.saved = new Map();
+        this.rows = new Map();
+        this.retryTimer = null;
+
+        // Süreli token'lar (öğretmen paneliyle aynı uç nokta)
+        this.tokens = [];
+        this.clockOffset = 0;
+
+        this.initEventListeners();
+        this.init();
+    }
+
+    scopeQuery() {
+        // Kiosk adresindeki okul/sınıf kapsamı (?school=1)
+        const params = new URLSearchParams(window.location.search);
+        const scope = new URLSearchParams();
+        ['school', 'classroom'].forEach(name => {
+            if (params.get(name)) scope.set(name, params.get(name));
+        });
+        return scope.toString();
+    }
+
+    async getJson(url) {
+        const response = await fetch(`${url}?${this.scopeQuery()}`, { credentials: 'same-origin' });
+        const data = await response.json();
+        if (data.status !== 'success') {
+            const error = new Error(data.message || 'Sunucu hatası');
+            error.loginUrl = data.login_url;
+            throw error;
+        }
+        return data;
+    }
+
+    async init() {
+        if (!/^\d+$/.test(this.schoolId || '')) {
+            this.show('kiosk-error', 'Okul seçilmedi', '', 'Kiosk adresine ?school=<okul no> ekleyin');
+            return;
+        }
+        this.restoreRoster();
+
+        try {
+            await Promise.all([this.loadRoster(), this.loadPresence(), this.loadTokens()]);
+        } catch (error) {
+            this.show('kiosk-error', error.message, '', '');
+            if (error.loginUrl) {
+                const link = document.createElement('a');
+                link.href = error.loginUrl;
+                link.textContent = 'Giriş yap';
+                this.detail.appendChild(link);
+            }
+            return;
+        }
+
+        this.input.disabled = false;
+        this.input.focus();
+        this.show('', 'Hazır', '', `${this.roster.size} öğrenci yüklendi`);
+        this.updateStatus();
+
+        // Liste arada delta ile yenilenir (okutma sırasında beklenmez), saatte bir tamamı alınır
+        setInterval(() => this.loadRoster().catch(() => {}), 60 * 1000);
+        setInterval(() => this.loadRoster(true).catch(() => {}), 60 * 60 * 1000);
+        setInterval(() => this.refreshPresence(), 5 * 60 * 1000);
+
+        // Önceki oturumdan kalan ve token'ı reddedilip incelemeye ayrılan okutmalar
+        // (personel oturumuyla ATTENDANCE_SYNC_MAX_AGE boyunca kabul edilir)
+        await CheckinQueue.requeue().catch(() => {});
+        this.retry();
+    }
+
+    initEventListeners() {
+        this.input.addEventListener('input', () => {
+            this.input.value = this.input.value.replace(/[^0-9]/g, '');
+            if (this.input.value.length === 11) {
+                const idNumber = this.input.value;
+                this.input.value = '';
+                this.handleScan(idNumber);
+            }
+        });
+
+        // Kiosk ekranında odak hep girişte kalır (kart okuyucu klavye gibi yazar)
+        document.addEventListener('click', () => this.input.focus());
+        window.addEventListener('online', () => this.retry());
+    }
+
+    rosterKey() {
+        return `kiosk_roster_${this.schoolId}`;
+    }
+
+    restoreRoster() {
+        // Önceki oturumun listesi: açılışta sadece değişiklikler istenir
+        try {
+            const saved = JSON.parse(localStorage.getItem(this.rosterKey()));
+            if (saved) {
+                this.rosterVersion = saved.version;
+                this.roster = new Map(saved.students.map(([idNumber, fullName, classroom]) => [idNumber, [fullName, classroom]]));
+            }
+        } catch (error) {
+            this.rosterVersion = null;
+        }
+    }
+
+    async loadRoster(full = false) {
+        const params = new URLSearchParams({ school: this.schoolId });
+        if (!full && this.rosterVersion !== null) {
+            params.set('since', this.rosterVersion);
+        }
+
+        // Yanıt gzip'li gelir, tarayıcı açar
+        const response = await fetch(`${this.app.dataset.rosterUrl}?${params}`, { credentials: 'same-origin' });
+        const data = await response.json();
+        if (!response.ok) {
+            const error = new Error(data.message || 'Öğrenci listesi alınamadı');
+            error.loginUrl = data.login_url;
+            throw error;
+        }
+
+        const roster = data.full ? new Map() : this.roster;
+        data.students.forEach(([idNumber, fullName, classroom]) => roster.set(idNumber, [fullName, classroom]));
+        data.removed.forEach(idNumber => roster.delete(idNumber));
+        this.roster = roster;
+        this.rosterVersion = data.version;
+
+        try {
+            localStorage.setItem(this.rosterKey(), JSON.stringify({
+                version: data.version,
+                students: [...roster].map(([idNumber, [fullName, classroom]]) => [idNumber, fullName, classroom])
+            }));
+        } catch (error) {
+            // Depolama doluysa liste sadece bellekte tutulur
+        }
+    }
+
+    async loadPresence() {
+        const data = await this.getJson(this.app.dataset.presenceUrl);
+        this.inside = new Set(data.inside);
+    }
+
+    async refreshPresence() {
+        // Gönderilmemiş okutma varken yerel tahmin korunur
+        if (this.pending.length === 0 && this.inFlight === 0) {
+            await this.loadPresence().catch(() => {});
+        }
+    }
+
+    async loadTokens() {
+        const data = await this.getJson(this.app.dataset.tokenUrl);
+        this.clockOffset = data.server_time * 1000 - Date.now();
+        const known = new Set(this.tokens.map(item => item.token));
+        this.tokens = this.tokens.concat(data.tokens.filter(item => !known.has(item.token)));
+    }
+
+    currentToken() {
+        const now = (Date.now() + this.clockOffset) / 1000;
+        // Bağlantı uzun süre kesilirse son token saklanır: kapsamı (okul/sınıf)
+        // taşımaya devam eder, kiosk okutmalarını sunucu personel oturumuyla
+        // ATTENDANCE_SYNC_MAX_AGE boyunca kabul eder
+        const last = this.tokens[this.tokens.length - 1];
+        this.tokens = this.tokens.filter(item => item.expires_at > now);
+        if (this.tokens.length < 2) {
+            this.loadTokens().catch(() => {});
+        }
+        const current = this.tokens.find(item => item.valid_from <= now);
+        if (current) return current.token;
+        return last && last.valid_from <= now ? last.token : null;
+    }
+
+    handleScan(idNumber) {
+        const student = this.roster.get(idNumber);
+        if (!student) {
+            this.show('kiosk-error', 'Bulunamadı', idNumber, 'Bu TC numarasına ait aktif öğrenci yok');
+            return;
+        }
+
+        const [fullName, classroom] = student;
+        const now = Date.now();
+        const last = this.lastScan.get(idNumber);
+        if (last && now - last < this.repeatMs) {
+            this.show('kiosk-warning', 'Az önce okutuldu', fullName, classroom);
+            return;
+        }
+        this.lastScan.set(idNumber, now);
+
+        // Sonuç sunucuyu beklemeden gösterilir
+        const entryType = this.inside.has(idNumber) ? 'exit' : 'entry';
+        this.setInside(idNumber, entryType);
+        this.show(`kiosk-${entryType}`, entryType === 'entry' ? 'GİRİŞ' : 'ÇIKIŞ', fullName, classroom);
+
+        const scan = {
+            id: CheckinQueue.newId(),
+            id_number: idNumber,
+            token: this.currentToken(),
+            client_time: now
+        };
+        // Bağlantı koparsa ya da sayfa kapanırsa okutma kaybolmasın
+        this.saved.set(scan.id, CheckinQueue.add(scan).catch(() => {}));
+        this.addRecent(scan, fullName, entryType);
+
+        this.pending.push(scan);
+        this.pump();
+    }
+
+    setInside(idNumber, entryType) {
+        if (entryType === 'entry') {
+            this.inside.add(idNumber);
+        } else {
+            this.inside.delete(idNumber);
+        }
+    }
+
+    pump() {
+        // İstek yolda değilse okutma hemen gönderilir; yoldayken gelenler birikip
+        // yanıt dönünce tek istekte (en fazla ATTENDANCE_SYNC_MAX_BATCH) gider.
+        // Ek paralel istek sadece dolu bir parti beklerken açılır.
+        while (
+            this.inFlight < this.maxInFlight && this.pending.length > 0
+            && (this.inFlight === 0 || this.pending.length >= this.batchSize)
+        ) {
+            const batch = this.pending.splice(0, this.batchSize);
+            this.inFlight++;
+            this.submit(batch).finally(() => {
+                this.inFlight--;
+                this.updateStatus();
+                this.pump();
+            });
+        }
+        this.updateStatus();
+    }
+
+    async submit(batch) {
+        try {
+            const response = await fetch(this.app.dataset.syncUrl, {
+                method: 'POST',
+                headers: CheckinQueue.headers({ 'Content-Type': 'application/json' }),
+                credentials: 'same-origin',
+                body: JSON.stringify({ scans: batch })
+            });
+            if (!response.ok) {
+                const error = new Error(`Senkronizasyon hatası: ${response.status}`);
+                error.retryAfter = Number(response.headers.get('Retry-After')) || null;
+                throw error;
+            }
+
+            const data = await response.json();
+            data.results.forEach(result => this.reconcile(result));
+
+            const ids = batch.map(scan => scan.id);
+            await Promise.all(ids.map(id => this.saved.get(id)));
+            await CheckinQueue.settle(data.results);
+            ids.forEach(id => this.saved.delete(id));
+        } catch (error) {
+            // Okutmalar IndexedDB'de kalır; bağlantı gelince toplu gönderilir
+            console.warn('Kiosk submit postponed:', error);
+            this.scheduleRetry(error.retryAfter);
+        }
+    }
+
+    reconcile(result) {
+        const row = this.rows.get(result.id);
+        if (!row) return;
+
+        if (result.status === 'error') {
+            // Tahmin geri alınır
+            this.setInside(row.idNumber, row.entryType === 'entry' ? 'exit' : 'entry');
+            row.element.className = 'failed';
+            row.element.title = result.message;
+            row.state.textContent = 'Hata';
+            return;
+        }
+
+        if (result.status === 'created' && result.entry_type !== row.entryType) {
+            // Sunucu farklı karar verdiyse (başka kapıdan okutma vb.) düzeltilir
+            this.setInside(row.idNumber, result.entry_type);
+            row.state.textContent = result.entry_type_display;
+        }
+        row.element.className = '';
+    }
+
+    scheduleRetry(retryAfter = null) {
+        if (this.retryTimer) return;
+        // İstek sınırına takıldıysa sunucunun bildirdiği süre beklenir
+        this.retryTimer = setTimeout(() => {
+            this.retryTimer = null;
+            this.retry();
+        }, Math.max(10, retryAfter || 0) * 1000);
+    }
+
+    async retry() {
+        try {
+            const results = await CheckinQueue.flush();
+            Object.values(results).forEach(result => this.reconcile(result));
+        } catch (error) {
+            this.scheduleRetry(error.retryAfter);
+        }
+        this.updateStatus();
+    }
+
+    addRecent(scan, fullName, entryType) {
+        const element = document.createElement('li');
+        element.className = 'pending';
+
+        const name = document.createElement('span');
+        name.textContent = `${new Date(scan.client_time).toLocaleTimeString('tr-TR')} ${fullName}`;
+        const state = document.createElement('span');
+        state.textContent = entryType === 'entry' ? 'Giriş' : 'Çıkış';
+
+        element.appendChild(name);
+        element.appendChild(state);
+        this.recentList.prepend(element);
+        this.rows.set(scan.id, { element, state, idNumber: scan.id_number, entryType });
+
+        // Liste kısa tutulur
+        while (this.recentList.children.length > 20) {
+            this.recentList.lastChild.remove();
+        }
+        if (this.rows.size > 200) {
+            this.rows.delete(this.rows.keys().next().value);
+        }
+    }
+
+    show(className, action, name, detail) {
+        this.result.className = `kiosk-result ${className}`;
+        this.action.textContent = action;
+        this.name.textContent = name;
+        this.detail.textContent = detail;
+    }
+
+    async updateStatus() {
+        const queued = await CheckinQueue.count().catch(() => 0);
+        const review = await CheckinQueue.reviewCount().catch(() => 0);
+        const parts = [`${this.roster.size} öğrenci`, `${this.inside.size} içeride`];
+        if (queued > 0) parts.push(`${queued} okutma gönderilmeyi bekliyor`);
+        if (review > 0) parts.push(`${review} okutma incelenmeli`);
+        this.status.textContent = parts.join(' · ');
+    }
+}
+
+// Sayfa yüklendiğinde kiosk'u başlat
+document.addEventListener('DOMContentLoaded', function() {
+    new GateKiosk();
+    console.log('Gate kiosk initialized');
+});
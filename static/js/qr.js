@@ -0,0 +1,161 @@
+class TeacherQRPanel {
+    constructor() {
+        this.qrUrl = null;
+        this.qrCodeDiv = document.getElementById('qrcode');
+        this.qrUrlSpan = document.getElementById('qrUrl');
+
+        // Sunucudan alınan sıradaki token'lar ve sunucu saatiyle fark (ms)
+        this.tokens = [];
+        this.clockOffset = 0;
+        this.rotateTimer = null;
+        this.loadingSchedule = null;
+
+        this.generateQRCode();
+    }
+
+    now() {
+        return (Date.now() + this.clockOffset) / 1000;
+    }
+
+    scopeParams() {
+        // Okul/sınıf kapsamı panel adresinden alınır (?school=1 veya ?classroom=3)
+        const params = new URLSearchParams(window.location.search);
+        const scope = new URLSearchParams();
+        ['school', 'classroom'].forEach(name => {
+            if (params.get(name)) scope.set(name, params.get(name));
+        });
+        return scope;
+    }
+
+    async loadSchedule() {
+        // Aynı anda tek istek
+        if (this.loadingSchedule) return this.loadingSchedule;
+
+        this.loadingSchedule = (async () => {
+            try {
+                const response = await fetch(`${this.qrCodeDiv.dataset.tokenSrc}?${this.scopeParams()}`, {
+                    credentials: 'same-origin'
+                });
+                const data = await response.json();
+
+                if (data.status !== 'success') {
+                    this.showMessage(data.message || 'QR kod alınamadı!', data.login_url);
+                    return false;
+                }
+
+                this.clockOffset = data.server_time * 1000 - Date.now();
+                const known = new Set(this.tokens.map(item => item.token));
+                this.tokens = this.tokens.concat(data.tokens.filter(item => !known.has(item.token)));
+                return true;
+            } catch (error) {
+                console.error('Token schedule error:', error);
+                return false;
+            } finally {
+                this.loadingSchedule = null;
+            }
+        })();
+        return this.loadingSchedule;
+    }
+
+    async generateQRCode() {
+        clearTimeout(this.rotateTimer);
+
+        const now = this.now();
+        this.tokens = this.tokens.filter(item => item.expires_at > now);
+
+        if (this.tokens.length === 0 && !(await this.loadSchedule())) {
+            // Bağlantı sorunu: kısa süre sonra tekrar dene
+            this.rotateTimer = setTimeout(() => this.generateQRCode(), 5000);
+            return;
+        }
+
+        const current = this.tokens.find(item => item.valid_from <= this.now()) || this.tokens[0];
+
+        // Giriş-çıkış sayfasının URL'ini oluştur
+        const baseUrl = window.location.origin;
+        this.qrUrl = `${baseUrl}/student-checkin/?t=${encodeURIComponent(current.token)}`;
+
+        // QR kod oluştur
+        this.createQRCode(this.qrUrl);
+
+        // URL bilgisini güncelle
+        this.qrUrlSpan.textContent = this.qrUrl;
+
+        // Sıradaki token bitmeden yenilerini al ve resmini önceden yükle
+        const upcoming = this.tokens.filter(item => item.valid_from > current.valid_from);
+        if (upcoming.length < 2) {
+            this.loadSchedule();
+        }
+        if (upcoming.length > 0) {
+            new Image().src = this.imageUrl(`${baseUrl}/student-checkin/?t=${encodeURIComponent(upcoming[0].token)}`);
+        }
+
+        const delay = Math.max(current.expires_at - this.now(), 1) * 1000;
+        this.rotateTimer = setTimeout(() => this.generateQRCode(), delay);
+    }
+
+    imageUrl(url) {
+        // QR kod sunucuda üretilir (harici servise bağımlılık yok)
+        const { src, size, margin } = this.qrCodeDiv.dataset;
+        const query = new URLSearchParams({ url, size, margin });
+        return `${src}?${query}`;
+    }
+
+    showMessage(message, loginUrl) {
+        this.qrCodeDiv.innerHTML = '';
+        const p = document.createElement('p');
+        p.className = 'text-danger';
+        p.style.fontSize = '12px';
+        p.textContent = message;
+        this.qrCodeDiv.appendChild(p);
+
+        if (loginUrl) {
+            const link = document.createElement('a');
+            link.href = loginUrl;
+            link.textContent = 'Giriş yap';
+            this.qrCodeDiv.appendChild(link);
+        }
+    }
+
+    createQRCode(url) {
+        // İlk yüklemede mesaj göster; token değişiminde eski kod yenisi gelene kadar kalır
+        if (!this.qrCodeDiv.querySelector('img')) {
+            this.qrCodeDiv.innerHTML = '<p class="text-muted" style="font-size: 12px; margin: 20px 0;">QR kod oluşturuluyor...</p>';
+        }
+
+        try {
+            // QR kod resmini oluştur
+            const img = document.createElement('img');
+            img.src = this.imageUrl(url);
+            img.alt = 'QR Code';
+            img.style.border = 'none';
+            img.style.borderRadius = '8px';
+            img.style.width = '160px';
+            img.style.height = '160px';
+            img.style.objectFit = 'contain';
+            img.style.backgroundColor = 'white';
+
+            // Yüklenme başarılı
+            img.onload = () => {
+                this.qrCodeDiv.innerHTML = '';
+                this.qrCodeDiv.appendChild(img);
+            };
+
+            // Yüklenme hatası
+            img.onerror = () => {
+                console.error('QR Code image loading error');
+                this.qrCodeDiv.innerHTML = '<p class="text-danger" style="font-size: 12px;">QR kod oluşturulamadı!</p>';
+            };
+
+        } catch (error) {
+            console.error('QR Code generation error:', error);
+            this.qrCodeDiv.innerHTML = '<p class="text-danger" style="font-size: 12px;">QR kod oluşturulamadı!</p>';
+        }
+    }
+}
+
+// Sayfa yüklendiğinde QR Panel'i başlat
+document.addEventListener('DOMContentLoaded', function() {
+    new TeacherQRPanel();
+    console.log('Teacher QR Panel initialized');
+});
@@ -0,0 +1,421 @@
+class StudentCheckin {
+    constructor() {
+        this.currentStudent = null;
+        this.lastStatus = null;
+        this.checkinToken = null;
+        this.storedIdNumber = localStorage.getItem('student_id_number');
+
+        this.initElements();
+        this.initEventListeners();
+
+        // URL'den TC kimlik numarası al (QR koddan gelen)
+        this.checkUrlParams();
+
+        // Çevrimdışı çalışma: service worker ve okutma kuyruğu
+        this.initOffline();
+
+        // Eğer localStorage'da TC varsa otomatik kontrol et
+        if (this.storedIdNumber) {
+            this.studentIdInput.value = this.storedIdNumber;
+            this.checkStudentStatus();
+        }
+    }
+
+    initElements() {
+        // Input section
+        this.idInputSection = document.getElementById('idInputSection');
+        this.studentIdInput = document.getElementById('studentIdInput');
+        this.checkStatusBtn = document.getElementById('checkStatusBtn');
+        this.idInputError = document.getElementById('idInputError');
+        this.loading = document.getElementById('loading');
+
+        // Status section
+        this.statusSection = document.getElementById('statusSection');
+        this.studentName = document.getElementById('studentName');
+        this.studentId = document.getElementById('studentId');
+        this.studentSchool = document.getElementById('studentSchool');
+        this.studentClassroom = document.getElementById('studentClassroom');
+        this.currentStatus = document.getElementById('currentStatus');
+        this.statusText = document.getElementById('statusText');
+        this.lastActionText = document.getElementById('lastActionText');
+
+        // Action buttons
+        this.toggleAttendanceBtn = document.getElementById('toggleAttendanceBtn');
+        this.toggleIcon = document.getElementById('toggleIcon');
+        this.toggleText = document.getElementById('toggleText');
+        this.changeIdBtn = document.getElementById('changeIdBtn');
+
+        // History
+        this.historySection = document.getElementById('historySection');
+        this.historyList = document.getElementById('historyList');
+
+        // Sync status
+        this.app = document.getElementById('checkinApp');
+        this.syncStatus = document.getElementById('syncStatus');
+        this.syncText = document.getElementById('syncText');
+
+        // Messages
+        this.errorMessage = document.getElementById('errorMessage');
+        this.errorText = document.getElementById('errorText');
+        this.successMessage = document.getElementById('successMessage');
+        this.successText = document.getElementById('successText');
+    }
+
+    initEventListeners() {
+        // Input validation
+        this.studentIdInput.addEventListener('input', (e) => {
+            e.target.value = e.target.value.replace(/[^0-9]/g, '');
+            this.validateIdNumber();
+        });
+
+        this.studentIdInput.addEventListener('keypress', (e) => {
+            if (e.key === 'Enter') {
+                this.checkStudentStatus();
+            }
+        });
+
+        // Buttons
+        this.checkStatusBtn.addEventListener('click', () => this.checkStudentStatus());
+        this.toggleAttendanceBtn.addEventListener('click', () => this.toggleAttendance());
+        this.changeIdBtn.addEventListener('click', () => this.showIdInput());
+    }
+
+    initOffline() {
+        if ('serviceWorker' in navigator) {
+            navigator.serviceWorker.register(this.app.dataset.swUrl, { scope: this.app.dataset.scope })
+                .then(registration => {
+                    // Sayfanın CSS/JS dosyaları (CDN dahil) çevrimdışı için önbelleğe alınsın
+                    const urls = [...document.querySelectorAll('link[rel="stylesheet"], script[src]')]
+                        .map(element => element.href || element.src);
+                    const worker = registration.active || registration.installing || registration.waiting;
+                    if (worker) worker.postMessage({ type: 'precache', urls });
+                })
+                .catch(error => console.error('Service worker registration error:', error));
+
+            // Arka planda gönderilen okutmalar
+            navigator.serviceWorker.addEventListener('message', event => {
+                if (event.data && event.data.type === 'checkin-synced') {
+                    this.updateSyncStatus();
+                }
+            });
+        }
+
+        window.addEventListener('online', () => this.syncQueue());
+        // Background Sync desteklemeyen tarayıcılar için
+        setInterval(() => this.syncQueue(), 30000);
+        this.syncQueue();
+    }
+
+    async syncQueue() {
+        let results = null;
+        try {
+            if (navigator.onLine !== false && await CheckinQueue.count() > 0) {
+                results = await CheckinQueue.flush();
+            }
+        } catch (error) {
+            console.warn('Offline queue sync postponed:', error);
+        }
+        this.updateSyncStatus();
+        return results;
+    }
+
+    async requestBackgroundSync() {
+        try {
+            const registration = await navigator.serviceWorker.ready;
+            if (registration.sync) {
+                await registration.sync.register(CheckinQueue.SYNC_TAG);
+            }
+        } catch (error) {
+            // Desteklenmiyorsa online olayı ve periyodik deneme yeterli
+        }
+    }
+
+    async updateSyncStatus() {
+        const pending = await CheckinQueue.count().catch(() => 0);
+        const review = await CheckinQueue.reviewCount().catch(() => 0);
+        const parts = [];
+        if (pending > 0) parts.push(`${pending} işlem bağlantı bekliyor, otomatik gönderilecek.`);
+        // QR kodunun süresi dolduğu için kabul edilmeyenler cihazda saklanır
+        if (review > 0) parts.push(`${review} işlem kabul edilmedi, okul yönetimine gösterin.`);
+        this.syncStatus.style.display = parts.length > 0 ? 'block' : 'none';
+        this.syncText.textContent = parts.join(' ');
+    }
+
+    checkUrlParams() {
+        const urlParams = new URLSearchParams(window.location.search);
+        const idFromUrl = urlParams.get('id_number');
+
+        // Öğretmen panelindeki QR kodun taşıdığı süreli token
+        this.checkinToken = urlParams.get('t');
+
+        if (idFromUrl && /^\d{11}$/.test(idFromUrl)) {
+            this.studentIdInput.value = idFromUrl;
+            localStorage.setItem('student_id_number', idFromUrl);
+            this.checkStudentStatus();
+        }
+    }
+
+    validateIdNumber() {
+        const idNumber = this.studentIdInput.value.trim();
+        const isValid = /^\d{11}$/.test(idNumber);
+
+        if (idNumber.length > 0 && !isValid) {
+            this.showInputError('TC kimlik numarası 11 haneli olmalıdır.');
+            return false;
+        } else {
+            this.clearInputError();
+            return isValid;
+        }
+    }
+
+    showInputError(message) {
+        this.studentIdInput.classList.add('is-invalid');
+        this.idInputError.textContent = message;
+    }
+
+    clearInputError() {
+        this.studentIdInput.classList.remove('is-invalid');
+        this.idInputError.textContent = '';
+    }
+
+    showError(message) {
+        this.errorText.textContent = message;
+        this.errorMessage.style.display = 'block';
+        this.successMessage.style.display = 'none';
+    }
+
+    showSuccess(message) {
+        this.successText.textContent = message;
+        this.successMessage.style.display = 'block';
+        this.errorMessage.style.display = 'none';
+    }
+
+    hideMessages() {
+        this.errorMessage.style.display = 'none';
+        this.successMessage.style.display = 'none';
+    }
+
+    showLoading(show = true) {
+        this.loading.style.display = show ? 'block' : 'none';
+        this.checkStatusBtn.disabled = show;
+        this.toggleAttendanceBtn.disabled = show;
+    }
+
+    async checkStudentStatus() {
+        const idNumber = this.studentIdInput.value.trim();
+
+        if (!this.validateIdNumber() || idNumber.length !== 11) {
+            this.showInputError('Geçerli bir TC kimlik numarası girin (11 hane).');
+            return;
+        }
+
+        this.hideMessages();
+        this.showLoading(true);
+
+        try {
+            const response = await fetch(`/student-status/${idNumber}/`, { headers: CheckinQueue.headers() });
+            const data = await response.json();
+
+            if (data.status === 'success') {
+                // LocalStorage'a kaydet (son durum çevrimdışı gösterim için)
+                localStorage.setItem('student_id_number', idNumber);
+                localStorage.setItem('student_status', JSON.stringify(data));
+                this.lastStatus = data;
+
+                // Öğrenci bilgilerini göster
+                this.currentStudent = data.student;
+                this.displayStudentInfo(data);
+                this.showStatusSection();
+
+            } else {
+                this.showError(data.message || 'Öğrenci bulunamadı');
+                this.showIdInput();
+            }
+
+        } catch (error) {
+            console.error('Student status check error:', error);
+            this.showOfflineStatus(idNumber);
+        } finally {
+            this.showLoading(false);
+        }
+    }
+
+    showOfflineStatus(idNumber) {
+        // Bağlantı yok: son bilinen durum (yoksa bilinmiyor) gösterilir, işlem kuyruğa alınabilir
+        let data = null;
+        try {
+            data = JSON.parse(localStorage.getItem('student_status'));
+        } catch (error) {
+            data = null;
+        }
+        if (!data || !data.student || data.student.id_number !== idNumber) {
+            data = {
+                student: { id_number: idNumber, full_name: 'Çevrimdışı', school: '-', classroom: '-' },
+                current_status: null,
+                last_action: 'Bağlantı gelince güncellenecek',
+                entries_today: []
+            };
+        }
+
+        this.currentStudent = data.student;
+        this.lastStatus = data;
+        this.displayStudentInfo(data);
+        this.showStatusSection();
+        this.showError('Bağlantı yok. İşlemleriniz kaydedilip bağlantı gelince gönderilecek.');
+    }
+
+    applyOfflineToggle() {
+        // Sunucu yanıtı gelene kadar tahmini yeni durum gösterilir
+        const data = this.lastStatus;
+        if (!data || !data.current_status) return;
+
+        const entryType = data.current_status === 'içeride' ? 'exit' : 'entry';
+        const timestamp = new Date().toISOString();
+        this.lastStatus = {
+            ...data,
+            current_status: entryType === 'entry' ? 'içeride' : 'dışarıda',
+            last_action: entryType === 'entry' ? 'Giriş' : 'Çıkış',
+            last_time: timestamp,
+            entries_today: [
+                { entry_type: entryType, entry_type_display: entryType === 'entry' ? 'Giriş' : 'Çıkış', timestamp },
+                ...(data.entries_today || [])
+            ]
+        };
+        this.displayStudentInfo(this.lastStatus);
+    }
+
+    displayStudentInfo(data) {
+        this.studentName.textContent = data.student.full_name;
+        this.studentId.textContent = data.student.id_number;
+        this.studentSchool.textContent = data.student.school;
+        this.studentClassroom.textContent = data.student.classroom;
+
+        // Mevcut durumu göster
+        this.statusText.textContent = data.current_status === 'içeride' ? 'İçeride' : 'Dışarıda';
+        this.lastActionText.textContent = data.last_time ? 
+            `Son işlem: ${data.last_action} (${new Date(data.last_time).toLocaleString('tr-TR')})` :
+            data.last_action;
+
+        // Durum rengini ayarla
+        this.currentStatus.className = 'status-info ' + 
+            (data.current_status === 'içeride' ? 'status-inside' : 'status-outside');
+
+        // Durum bilinmiyorsa (çevrimdışı, önceki kayıt yok) sunucu giriş/çıkışı belirler
+        if (!data.current_status) {
+            this.statusText.textContent = 'Bilinmiyor';
+            this.currentStatus.className = 'status-info';
+            this.toggleIcon.className = 'fas fa-exchange-alt me-2';
+            this.toggleText.textContent = 'Giriş/Çıkış Kaydet';
+            this.toggleAttendanceBtn.className = 'action-button';
+        } else if (data.current_status === 'içeride') {
+            this.toggleIcon.className = 'fas fa-sign-out-alt me-2';
+            this.toggleText.textContent = 'Çıkış Yap';
+            this.toggleAttendanceBtn.className = 'action-button btn-exit';
+        } else {
+            this.toggleIcon.className = 'fas fa-sign-in-alt me-2';
+            this.toggleText.textContent = 'Giriş Yap';
+            this.toggleAttendanceBtn.className = 'action-button btn-entry';
+        }
+
+        // Bugünün geçmişini göster
+        this.displayHistory(data.entries_today);
+    }
+
+    displayHistory(entries) {
+        this.historyList.innerHTML = '';
+
+        if (entries.length === 0) {
+            this.historyList.innerHTML = '<p class="text-muted">Bugün henüz giriş/çıkış yapılmamış.</p>';
+            return;
+        }
+
+        entries.forEach(entry => {
+            const div = document.createElement('div');
+            div.className = 'history-item';
+
+            const action = document.createElement('span');
+            action.className = entry.entry_type === 'entry' ? 'history-entry' : 'history-exit';
+            action.textContent = entry.entry_type_display;
+
+            const time = document.createElement('span');
+            time.className = 'text-muted';
+            time.textContent = new Date(entry.timestamp).toLocaleTimeString('tr-TR');
+
+            div.appendChild(action);
+            div.appendChild(time);
+            this.historyList.appendChild(div);
+        });
+    }
+
+    async toggleAttendance() {
+        if (!this.currentStudent) return;
+
+        this.hideMessages();
+        this.showLoading(true);
+
+        // Okutma önce kuyruğa yazılır; bağlantı varsa hemen gönderilir
+        const scan = {
+            id: CheckinQueue.newId(),
+            id_number: this.currentStudent.id_number,
+            token: this.checkinToken,
+            client_time: Date.now()
+        };
+
+        try {
+            await CheckinQueue.add(scan);
+
+            const results = await this.syncQueue();
+            const result = results && results[scan.id];
+
+            if (!result) {
+                // Bağlantı gelince service worker gönderir (sayfa kapansa bile)
+                this.requestBackgroundSync();
+                this.applyOfflineToggle();
+                this.showSuccess('Bağlantı yok: işlem kaydedildi, bağlantı gelince gönderilecek.');
+            } else if (result.status === 'error') {
+                // Hata hemen gösterildi; incelemeye ayrılması gerekmez
+                await CheckinQueue.discardReview([scan.id]).catch(() => {});
+                this.updateSyncStatus();
+                this.showError(result.message || 'İşlem sırasında hata oluştu');
+            } else {
+                this.showSuccess(result.message);
+
+                // Durumu güncelle - biraz bekle ki kullanıcı mesajı görsün
+                setTimeout(() => {
+                    this.checkStudentStatus();
+                }, 1500);
+            }
+
+        } catch (error) {
+            console.error('Attendance toggle error:', error);
+            this.showError('İşlem kaydedilemedi. Lütfen tekrar deneyin.');
+        } finally {
+            this.showLoading(false);
+        }
+    }
+
+    showStatusSection() {
+        this.idInputSection.style.display = 'none';
+        this.statusSection.style.display = 'block';
+    }
+
+    showIdInput() {
+        this.statusSection.style.display = 'none';
+        this.idInputSection.style.display = 'block';
+        this.studentIdInput.focus();
+        this.hideMessages();
+    }
+
+    getCsrfToken() {
+        const cookie = document.cookie
+            .split('; ')
+            .find(row => row.startsWith('csrftoken='));
+        return cookie ? cookie.split('=')[1] : '';
+    }
+}
+
+// Sayfa yüklendiğinde sistemi başlat
+document.addEventListener('DOMContentLoaded', function() {
+    const checkin = new StudentCheckin();
+    console.log('Student Check-in system initialized');
+});
@@ -0,0 +1,87 @@
+// Giriş-çıkış sayfası service worker'ı (sürüm {{ version }})
+// Sayfa iskeleti ve statik dosyalar önbellekten açılır; okutmalar
+// CheckinQueue'da birikir ve bağlantı gelince toplu gönderilir.
+importScripts('{{ queue_js }}');
+
+const CACHE_NAME = 'checkin-{{ version }}';
+const SHELL_URL = '{{ shell_url }}';
+const STATIC_PREFIX = '{{ static_url }}';
+const PRECACHE = [SHELL_URL, '{{ queue_js }}'];
+
+async function precache(urls) {
+    const cache = await caches.open(CACHE_NAME);
+    await Promise.all(urls.map(async url => {
+        if (await cache.match(url)) return;
+        // CDN dosyaları opak yanıt olarak saklanır
+        const crossOrigin = new URL(url, self.location.href).origin !== self.location.origin;
+        const response = await fetch(url, crossOrigin ? { mode: 'no-cors' } : {});
+        if (response.ok || response.type === 'opaque') {
+            await cache.put(url, response);
+        }
+    }));
+}
+
+async function fromCache(event, key, ignoreSearch) {
+    const cache = await caches.open(CACHE_NAME);
+    const cached = await cache.match(key, { ignoreSearch });
+    const network = fetch(event.request).then(response => {
+        if (response.ok || response.type === 'opaque') {
+            cache.put(key, response.clone());
+        }
+        return response;
+    });
+
+    if (cached) {
+        // Önbellekteki kopya hemen döner, arka planda güncellenir
+        event.waitUntil(network.catch(() => {}));
+        return cached;
+    }
+    return network;
+}
+
+async function notifyClients(results) {
+    const clients = await self.clients.matchAll({ includeUncontrolled: true });
+    clients.forEach(client => client.postMessage({ type: 'checkin-synced', results }));
+}
+
+self.addEventListener('install', event => {
+    event.waitUntil(precache(PRECACHE).then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil((async () => {
+        const names = await caches.keys();
+        await Promise.all(
+            names.filter(name => name.startsWith('checkin-') && name !== CACHE_NAME).map(name => caches.delete(name))
+        );
+        await self.clients.claim();
+    })());
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+
+    const url = new URL(request.url);
+    if (request.mode === 'navigate' && url.pathname === SHELL_URL) {
+        // QR koddaki token sorgu parametresidir; tüm adresler aynı iskeleti kullanır
+        event.respondWith(fromCache(event, SHELL_URL, true));
+    } else if (url.origin !== self.location.origin || url.pathname.startsWith(STATIC_PREFIX)) {
+        event.respondWith(fromCache(event, request, false));
+    }
+    // API istekleri (student-status vb.) doğrudan ağa gider
+});
+
+self.addEventListener('message', event => {
+    // Sayfa kendi CSS/JS adreslerini bildirir (CDN dahil)
+    if (event.data && event.data.type === 'precache') {
+        event.waitUntil(precache(event.data.urls).catch(() => {}));
+    }
+});
+
+self.addEventListener('sync', event => {
+    if (event.tag === CheckinQueue.SYNC_TAG) {
+        // Hata fırlatırsa tarayıcı daha sonra tekrar dener
+        event.waitUntil(CheckinQueue.flush().then(notifyClients));
+    }
+});
@@ -13,4 +13,8 @@ if path not in sys.path:
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'core.settings')
 
 from django.core.wsgi import get_wsgi_application
-application = get_wsgi_application()
\ No newline at end of file
+application = get_wsgi_application()
+
+# URL'ler, şablonlar ve veritabanı ilk istekten önce hazırlanır
+from school.warmup import warmup
+warmup()